@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from blog.admin_filters import AutocompleteFilter
+from blog.pagination import EstimatedCountAdminMixin
 from .models import User, Follow, Profile, UserBlock
 
 
@@ -10,10 +12,11 @@ class ProfileInline(admin.StackedInline):
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(EstimatedCountAdminMixin, BaseUserAdmin):
     list_display = ("phone", "username", "full_name", "author", "is_active", "is_staff")
     list_filter = ("is_active", "is_staff", "author", "gender")
-    search_fields = ("phone", "username", "full_name", "email")
+    # Prefix searches, served by the UPPER(...) text_pattern_ops indexes.
+    search_fields = ("^phone", "^username", "^full_name", "^email")
     ordering = ("-id",)
 
     fieldsets = (
@@ -35,15 +38,20 @@ class UserAdmin(BaseUserAdmin):
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ('from_user', 'to_user', 'created_at')
-    list_filter = ('from_user', 'to_user', 'created_at')
-    search_fields = ('from_user__username', 'to_user__username')
+    list_filter = (('from_user', AutocompleteFilter), ('to_user', AutocompleteFilter), 'created_at')
+    list_select_related = ('from_user', 'to_user')
+    autocomplete_fields = ('from_user', 'to_user')
+    search_fields = ('^from_user__username', '^to_user__username')
     ordering = ('-created_at',)
 
 
 @admin.register(UserBlock)
-class UserBlockAdmin(admin.ModelAdmin):
+class UserBlockAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ("user", "blocked_user", "created_at")
-    search_fields = ("user__username", "blocked_user__username")
+    list_filter = (("user", AutocompleteFilter), ("blocked_user", AutocompleteFilter))
+    list_select_related = ("user", "blocked_user")
+    autocomplete_fields = ("user", "blocked_user")
+    search_fields = ("^user__username", "^blocked_user__username")
     ordering = ("-created_at",)
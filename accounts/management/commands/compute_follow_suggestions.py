@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from accounts.suggestions import compute_suggestions
+
+
+class Command(BaseCommand):
+    help = "Rebuild friends-of-friends follow suggestions in chunks of followers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=50, help="Suggestions kept per user.")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Followers ranked per statement.")
+        parser.add_argument("--workers", type=int, default=1)
+
+    def handle(self, *args, **options):
+        written = compute_suggestions(options["limit"], options["chunk_size"], options["workers"])
+        self.stdout.write(f"{written} suggestions written")
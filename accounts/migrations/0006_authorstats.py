@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_userblock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_views', models.PositiveBigIntegerField(default=0)),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('dislikes', models.PositiveIntegerField(default=0)),
+                ('approved_comments', models.PositiveIntegerField(default=0)),
+                ('followers', models.PositiveIntegerField(default=0)),
+                ('posts_draft', models.PositiveIntegerField(default=0)),
+                ('posts_published', models.PositiveIntegerField(default=0)),
+                ('posts_private', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Author stats',
+                'verbose_name_plural': 'Author stats',
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Admin prefix searches compile to UPPER("col"::text) LIKE UPPER('term%');
+# these expression indexes serve them on PostgreSQL.
+INDEXES = [
+    ('accounts_user_phone_upper_like', 'phone'),
+    ('accounts_user_username_upper_like', 'username'),
+    ('accounts_user_full_name_upper_like', 'full_name'),
+    ('accounts_user_email_upper_like', 'email'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('accounts', 'User')._meta.db_table)
+    for name, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+            f'ON {table} ((UPPER({schema_editor.quote_name(column)}::text)) text_pattern_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0006_authorstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
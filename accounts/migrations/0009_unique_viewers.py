@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_follow_lists_and_suggestions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='unique_viewers',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
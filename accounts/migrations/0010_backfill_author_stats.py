@@ -0,0 +1,53 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_author_stats(apps, schema_editor):
+    """Create the stats rows of users that predate AuthorStats, from grouped aggregates."""
+    User = apps.get_model('accounts', 'User')
+    AuthorStats = apps.get_model('accounts', 'AuthorStats')
+    Follow = apps.get_model('accounts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    PostLike = apps.get_model('posts', 'PostLike')
+    Comment = apps.get_model('comments', 'Comment')
+
+    missing = set(User.objects.filter(stats__isnull=True).values_list('pk', flat=True))
+    if not missing:
+        return
+    stats = {user_id: {} for user_id in missing}
+
+    def add(rows, field):
+        for user_id, total in rows:
+            if user_id in stats:
+                stats[user_id][field] = total or 0
+
+    posts = Post.objects.filter(user__isnull=False).values_list('user_id').order_by()
+    add(posts.annotate(total=Sum('views_count')), 'total_views')
+    for status in ('draft', 'published', 'private'):
+        add(posts.filter(status=status).annotate(total=Count('pk')), f'posts_{status}')
+    votes = PostLike.objects.values_list('post__user_id').order_by()
+    add(votes.filter(value='like').annotate(total=Count('pk')), 'likes')
+    add(votes.filter(value='dislike').annotate(total=Count('pk')), 'dislikes')
+    add(
+        Comment.objects.filter(is_approved=True).values_list('post__user_id').order_by().annotate(total=Count('pk')),
+        'approved_comments',
+    )
+    add(Follow.objects.values_list('to_user_id').order_by().annotate(total=Count('pk')), 'followers')
+
+    AuthorStats.objects.bulk_create(
+        [AuthorStats(user_id=user_id, **fields) for user_id, fields in stats.items()],
+        batch_size=1000, ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_unique_viewers'),
+        ('posts', '0010_description_derivatives'),
+        ('comments', '0006_thread_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_author_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# /search/suggest/ returns the first usernames in UPPER("username") COLLATE "C"
+# order. A C-collation expression index serves that ORDER BY as well as the
+# admin's UPPER("username"::text) LIKE UPPER('term%') range scan, so it
+# replaces the text_pattern_ops index from 0007.
+INDEX = 'accounts_user_username_upper_c'
+REPLACED = 'accounts_user_username_upper_like'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('accounts', 'User')._meta.db_table)
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX} '
+        f'ON {table} ((UPPER({schema_editor.quote_name("username")}::text)) COLLATE "C")'
+    )
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {REPLACED}')
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('accounts', 'User')._meta.db_table)
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {REPLACED} '
+        f'ON {table} ((UPPER({schema_editor.quote_name("username")}::text)) text_pattern_ops)'
+    )
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0010_backfill_author_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,4 +1,7 @@
+from django.apps import apps
 from django.db import models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import AbstractBaseUser, AbstractUser, PermissionsMixin
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from .managers import UserManager
@@ -54,11 +57,34 @@ class Follow(models.Model):
         verbose_name_plural = "Follows"
         ordering = ['-created_at']
         unique_together = ['from_user', 'to_user']
+        indexes = [
+            models.Index(fields=['to_user', '-created_at', '-id'], name='follow_followers_idx'),
+            models.Index(fields=['from_user', '-created_at', '-id'], name='follow_following_idx'),
+        ]
 
     def __str__(self):
         return f"{self.from_user.username} → {self.to_user.username}"
 
 
+class FollowSuggestion(models.Model):
+    """Friends-of-friends candidates, rebuilt in batch by compute_follow_suggestions."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='follow_suggestions', db_index=False)
+    suggested = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    mutuals = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'suggested'], name='unique_follow_suggestion'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-mutuals', 'suggested'], name='follow_suggestion_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"Suggestion({self.user_id}->{self.suggested_id})"
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     bio = models.TextField(blank=True, null=True)
@@ -82,3 +108,62 @@ class UserBlock(models.Model):
 
     def __str__(self):
         return f"{self.user.username} blocked {self.blocked_user.username}"
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    total_views = models.PositiveBigIntegerField(default=0)
+    unique_viewers = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    dislikes = models.PositiveIntegerField(default=0)
+    approved_comments = models.PositiveIntegerField(default=0)
+    followers = models.PositiveIntegerField(default=0)
+    posts_draft = models.PositiveIntegerField(default=0)
+    posts_published = models.PositiveIntegerField(default=0)
+    posts_private = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Author stats"
+        verbose_name_plural = "Author stats"
+
+    def __str__(self):
+        return f"Stats({self.user_id})"
+
+    @classmethod
+    def bump(cls, user_id, rebuild=True, **deltas):
+        if user_id is None:
+            return
+        updates = {
+            field: Greatest(F(field) + delta, 0) if delta < 0 else F(field) + delta
+            for field, delta in deltas.items() if delta
+        }
+        if updates and not cls.objects.filter(user_id=user_id).update(**updates) and rebuild:
+            cls.rebuild(user_id)
+
+    @classmethod
+    def for_user(cls, user_id):
+        return cls.objects.filter(user_id=user_id).first() or cls.rebuild(user_id)
+
+    @classmethod
+    def rebuild(cls, user_id):
+        Post = apps.get_model("posts", "Post")
+        PostLike = apps.get_model("posts", "PostLike")
+        Comment = apps.get_model("comments", "Comment")
+
+        posts = Post.objects.filter(user_id=user_id).order_by()
+        by_status = dict(posts.values_list("status").annotate(total=Count("pk")))
+        votes = PostLike.objects.filter(post__user_id=user_id).aggregate(
+            likes=Count("pk", filter=Q(value="like")),
+            dislikes=Count("pk", filter=Q(value="dislike")),
+        )
+        stats, _ = cls.objects.update_or_create(user_id=user_id, defaults={
+            "total_views": posts.aggregate(total=Sum("views_count"))["total"] or 0,
+            "likes": votes["likes"],
+            "dislikes": votes["dislikes"],
+            "approved_comments": Comment.objects.filter(post__user_id=user_id, is_approved=True).count(),
+            "followers": Follow.objects.filter(to_user_id=user_id).count(),
+            "posts_draft": by_status.get("draft", 0),
+            "posts_published": by_status.get("published", 0),
+            "posts_private": by_status.get("private", 0),
+        })
+        return stats
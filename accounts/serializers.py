@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import User, Follow, Profile
+from .models import User, Follow, FollowSuggestion, Profile, AuthorStats
 import re
 
 class UserRegisterSerializer(serializers.ModelSerializer):
@@ -25,7 +25,35 @@ class FollowSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class AuthorStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuthorStats
+        exclude = ["user"]
+
+
+class PublicAuthorStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuthorStats
+        fields = ["total_views", "unique_viewers", "likes", "followers", "posts_published"]
+
+
 class ProfileSerializer(serializers.ModelSerializer):
+    stats = PublicAuthorStatsSerializer(source="user.stats", read_only=True)
+
     class Meta:
         model = Profile
-        fields = ["bio", "avatar", "location", "website"]
\ No newline at end of file
+        fields = ["bio", "avatar", "location", "website", "stats"]
+
+class FollowListSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    full_name = serializers.CharField()
+    followed_at = serializers.DateTimeField(source='created_at')
+
+
+class FollowSuggestionSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='suggested.username')
+    full_name = serializers.CharField(source='suggested.full_name')
+
+    class Meta:
+        model = FollowSuggestion
+        fields = ['username', 'full_name', 'mutuals']
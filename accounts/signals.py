@@ -1,8 +1,18 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import User, Profile
+from .models import User, Profile, Follow, AuthorStats
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+        AuthorStats.objects.create(user=instance)
+
+@receiver(post_save, sender=Follow)
+def update_author_stats_on_follow(sender, instance, created, **kwargs):
+    if created:
+        AuthorStats.bump(instance.to_user_id, followers=1)
+
+@receiver(post_delete, sender=Follow)
+def update_author_stats_on_unfollow(sender, instance, **kwargs):
+    AuthorStats.bump(instance.to_user_id, rebuild=False, followers=-1)
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Follow, FollowSuggestion, User, UserBlock
+
+# One INSERT ... SELECT per chunk of followers: the two-hop join, grouping and
+# ranking stay in the database, so memory here is bounded by the chunk bounds.
+RANK_SQL = """
+INSERT INTO {suggestion} (user_id, suggested_id, mutuals, computed_at)
+SELECT user_id, suggested_id, mutuals, %s FROM (
+    SELECT f1.from_user_id AS user_id, f2.to_user_id AS suggested_id, COUNT(*) AS mutuals,
+           ROW_NUMBER() OVER (
+               PARTITION BY f1.from_user_id ORDER BY COUNT(*) DESC, f2.to_user_id
+           ) AS position
+    FROM {follow} f1
+    JOIN {follow} f2 ON f2.from_user_id = f1.to_user_id
+    JOIN {user} candidate ON candidate.id = f2.to_user_id AND candidate.is_active
+    WHERE f1.from_user_id > %s AND f1.from_user_id <= %s
+      AND f2.to_user_id <> f1.from_user_id
+      AND NOT EXISTS (
+          SELECT 1 FROM {follow} f3 WHERE f3.from_user_id = f1.from_user_id AND f3.to_user_id = f2.to_user_id
+      )
+      AND NOT EXISTS (
+          SELECT 1 FROM {block} b
+          WHERE (b.user_id = f1.from_user_id AND b.blocked_user_id = f2.to_user_id)
+             OR (b.user_id = f2.to_user_id AND b.blocked_user_id = f1.from_user_id)
+      )
+    GROUP BY f1.from_user_id, f2.to_user_id
+) ranked
+WHERE position <= %s
+"""
+
+
+def chunk_bounds(chunk_size):
+    """``(lo, hi]`` ranges of follower ids holding at most ``chunk_size`` followers each."""
+    lo = 0
+    while True:
+        ids = list(
+            Follow.objects.filter(from_user_id__gt=lo).order_by('from_user_id')
+            .values_list('from_user_id', flat=True).distinct()[:chunk_size]
+        )
+        if not ids:
+            return
+        yield lo, ids[-1]
+        lo = ids[-1]
+
+
+def rank_chunk(lo, hi, limit, computed_at):
+    """Replace the suggestions of users with ids in ``(lo, hi]``; returns the rows written."""
+    qn = connection.ops.quote_name
+    sql = RANK_SQL.format(
+        suggestion=qn(FollowSuggestion._meta.db_table),
+        follow=qn(Follow._meta.db_table),
+        user=qn(User._meta.db_table),
+        block=qn(UserBlock._meta.db_table),
+    )
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user_id__gt=lo, user_id__lte=hi).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [connection.ops.adapt_datetimefield_value(computed_at), lo, hi, limit])
+            return cursor.rowcount
+
+
+def compute_suggestions(limit=50, chunk_size=1000, workers=1):
+    """
+    Rebuild every user's top ``limit`` friends-of-friends suggestions, ranked
+    by how many of the people they follow already follow the candidate.
+    """
+    computed_at = timezone.now()
+
+    def run(bounds):
+        try:
+            return rank_chunk(*bounds, limit, computed_at)
+        finally:
+            if workers > 1:
+                connection.close()
+
+    chunks = list(chunk_bounds(chunk_size))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            written = sum(pool.map(run, chunks))
+    else:
+        written = sum(map(run, chunks))
+    # Users who no longer follow anyone past the last chunk keep nothing.
+    FollowSuggestion.objects.filter(user_id__gt=chunks[-1][1] if chunks else 0).delete()
+    return written
@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from notifications import views as notification_views
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
@@ -7,7 +8,14 @@ urlpatterns = [
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('register/', views.UserRegisterView.as_view(), name='login_register'),
     path("me/profile/", views.MyProfileView.as_view(), name="my-profile"),
+    path("me/stats/", views.MyStatsView.as_view(), name="my-stats"),
+    path("me/notifications/", notification_views.MyNotificationsView.as_view(), name="my-notifications"),
+    path("me/notifications/unread/", notification_views.UnreadCountView.as_view(), name="my-notifications-unread"),
+    path("me/notifications/read/", notification_views.MarkReadView.as_view(), name="my-notifications-read"),
+    path("me/suggestions/", views.FollowSuggestionsView.as_view(), name="my-follow-suggestions"),
     path("<str:username>/profile/", views.ProfileView.as_view(), name="public-profile"),
     path("<str:username>/block/", views.BlockUserView.as_view(), name="user-block"),
+    path("<str:username>/followers/", views.FollowersView.as_view(), name="user-followers"),
+    path("<str:username>/following/", views.FollowingView.as_view(), name="user-following"),
 
 ]
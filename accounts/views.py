@@ -2,14 +2,19 @@ from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import UserRegisterSerializer, FollowSerializer, ProfileSerializer
+from .serializers import (
+    UserRegisterSerializer, FollowSerializer, FollowListSerializer, FollowSuggestionSerializer, ProfileSerializer,
+    AuthorStatsSerializer,
+)
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
-from .models import Follow, User, Profile, UserBlock
+from django.db.models import F
+from rest_framework.pagination import CursorPagination
+from .models import Follow, FollowSuggestion, User, Profile, UserBlock, AuthorStats
 from rest_framework.throttling import ScopedRateThrottle
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework.generics import RetrieveUpdateAPIView, RetrieveAPIView
-from drf_spectacular.utils import extend_schema, OpenApiExample, extend_schema_view
+from rest_framework.generics import ListAPIView, RetrieveUpdateAPIView, RetrieveAPIView
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter, extend_schema_view
 from drf_spectacular.types import OpenApiTypes
 
 
@@ -110,6 +115,15 @@ class MyProfileView(RetrieveUpdateAPIView):
         return self.request.user.profile
 
 
+@extend_schema(summary="My author statistics", tags=["social"])
+class MyStatsView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = AuthorStatsSerializer
+
+    def get_object(self):
+        return AuthorStats.for_user(self.request.user.pk)
+
+
 class ProfileView(RetrieveAPIView):
     permission_classes = [AllowAny]
     serializer_class = ProfileSerializer
@@ -119,7 +133,7 @@ class ProfileView(RetrieveAPIView):
 
     def get_object(self):
         username = self.kwargs[self.lookup_url_kwarg]
-        return get_object_or_404(Profile, user__username=username)
+        return get_object_or_404(Profile.objects.select_related("user__stats"), user__username=username)
 
 
 @extend_schema_view(
@@ -149,4 +163,69 @@ class BlockUserView(APIView):
     def delete(self, request, username):
         target = get_object_or_404(User, username=username)
         UserBlock.objects.filter(user=request.user, blocked_user=target).delete()
-        return Response({"message": f"Unblocked {username}"}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response({"message": f"Unblocked {username}"}, status=status.HTTP_200_OK)
+
+
+class FollowCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 20
+
+
+class FollowListView(ListAPIView):
+    permission_classes = [AllowAny]
+    serializer_class = FollowListSerializer
+    pagination_class = FollowCursorPagination
+    # Follow column that points at the profile owner, and the one listed.
+    owner_field = None
+    listed_field = None
+
+    def get_queryset(self):
+        user = get_object_or_404(User.objects.only("pk"), username=self.kwargs["username"])
+        # Plain rows with the listed user's columns joined in: no Follow or
+        # User instances, one query per page.
+        return Follow.objects.filter(**{self.owner_field: user}).values(
+            "id", "created_at",
+            username=F(f"{self.listed_field}__username"),
+            full_name=F(f"{self.listed_field}__full_name"),
+        )
+
+
+@extend_schema(summary="Users following this user (newest first, cursor paginated)", tags=["social"])
+class FollowersView(FollowListView):
+    owner_field = "to_user"
+    listed_field = "from_user"
+
+
+@extend_schema(summary="Users this user follows (newest first, cursor paginated)", tags=["social"])
+class FollowingView(FollowListView):
+    owner_field = "from_user"
+    listed_field = "to_user"
+
+
+@extend_schema(
+    summary="Who to follow (friends of friends, precomputed)",
+    tags=["social"],
+    parameters=[OpenApiParameter("limit", int, description="At most 50.")],
+)
+class FollowSuggestionsView(ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = FollowSuggestionSerializer
+    pagination_class = None
+    max_limit = 50
+
+    def get_queryset(self):
+        try:
+            limit = min(max(int(self.request.query_params.get("limit", 10)), 1), self.max_limit)
+        except ValueError:
+            limit = 10
+        user = self.request.user
+        # Follows and blocks made since the last batch run are filtered out here.
+        return (
+            FollowSuggestion.objects.filter(user=user)
+            .exclude(suggested__followers__from_user=user)
+            .exclude(suggested__blocking__blocked_user=user)
+            .exclude(suggested__blocked_by__user=user)
+            .select_related("suggested")
+            .only("mutuals", "suggested__username", "suggested__full_name")
+            .order_by("-mutuals", "suggested_id")[:limit]
+        )
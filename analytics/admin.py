@@ -0,0 +1,14 @@
+from django.contrib import admin
+from .models import ActivityBucket, RollupWatermark
+
+
+@admin.register(ActivityBucket)
+class ActivityBucketAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'object_id', 'granularity', 'bucket_start', 'likes', 'comments', 'follows', 'views')
+    list_filter = ('scope', 'granularity')
+    ordering = ('-bucket_start',)
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('source', 'position', 'updated_at')
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.rollups import SOURCES, rebuild_source, run_source, run_uniques, run_views
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll up likes, comments, follows and buffered views past each watermark into hourly/daily buckets, "
+        "and merge each closed day's unique viewers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source", action="append", choices=[*SOURCES, "views", "uniques"],
+            help="Only process this source (repeatable). Defaults to all of them.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--rebuild", action="store_true",
+            help="Recount the row sources from scratch in parallel chunks (views and uniques cannot be rebuilt).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=50000)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--interval", type=int, default=0,
+            help="Keep running, processing new rows every N seconds.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["source"] or [*SOURCES, "views", "uniques"]
+        if options["rebuild"]:
+            if {"views", "uniques"} & set(names) and options["source"]:
+                raise CommandError("Views and unique viewers are buffered in Redis and cannot be rebuilt.")
+            for name in names:
+                if name in SOURCES:
+                    total = rebuild_source(SOURCES[name], options["chunk_size"], options["workers"])
+                    self.stdout.write(f"{name}: rebuilt from {total} rows")
+            return
+
+        while True:
+            for name in names:
+                if name == "views":
+                    total = run_views()
+                elif name == "uniques":
+                    total = run_uniques()
+                else:
+                    total = run_source(SOURCES[name], options["batch_size"])
+                if total or options["verbosity"] > 1:
+                    self.stdout.write(f"{name}: {total} new")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ActivityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('post', 'Post'), ('category', 'Category'), ('author', 'Author')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('follows', models.PositiveIntegerField(default=0)),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Activity bucket',
+                'verbose_name_plural': 'Activity buckets',
+                'constraints': [models.UniqueConstraint(fields=('scope', 'object_id', 'granularity', 'bucket_start'), name='unique_activity_bucket')],
+            },
+        ),
+    ]
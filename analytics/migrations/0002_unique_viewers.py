@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitybucket',
+            name='unique_viewers',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ViewerSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('post', 'Post'), ('author', 'Author')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('registers', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'object_id'), name='unique_viewer_sketch')],
+            },
+        ),
+    ]
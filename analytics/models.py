@@ -0,0 +1,66 @@
+from django.db import models
+
+
+class ActivityBucket(models.Model):
+    SCOPE_CHOICES = [
+        ('post', 'Post'),
+        ('category', 'Category'),
+        ('author', 'Author'),
+    ]
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    likes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    follows = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    # Approximate distinct viewers; only day buckets carry it.
+    unique_viewers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Activity bucket'
+        verbose_name_plural = 'Activity buckets'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'object_id', 'granularity', 'bucket_start'], name='unique_activity_bucket'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.object_id} {self.granularity} {self.bucket_start:%Y-%m-%d %H:00}"
+
+
+class RollupWatermark(models.Model):
+    source = models.CharField(max_length=20, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.position}"
+
+
+class ViewerSketch(models.Model):
+    """All-time HyperLogLog of a post's or author's viewers, as dumped by Redis (at most 12 KB)."""
+    SCOPE_CHOICES = [
+        ('post', 'Post'),
+        ('author', 'Author'),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    registers = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'object_id'], name='unique_viewer_sketch')
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.object_id} viewers"
@@ -0,0 +1,400 @@
+import datetime
+import hashlib
+import hmac
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import ActivityBucket, RollupWatermark, ViewerSketch
+
+UTC = datetime.timezone.utc
+
+# Rows younger than this are left for the next run, so transactions that were
+# still open when the batch boundary was chosen get a chance to commit first.
+SETTLE_SECONDS = 60
+
+VIEWS_KEY_PREFIX = 'analytics:views:'
+VIEWS_KEY_TTL = 7 * 24 * 3600
+HOUR_FORMAT = '%Y%m%d%H'
+
+# Daily HyperLogLogs of viewer ids per post and author, the ids touched each
+# day, and the days waiting for run_uniques.
+UNIQUES_KEY = 'analytics:uv:{day}:{scope}:{object_id}'
+UNIQUES_TOUCHED_KEY = 'analytics:uv:{day}:{scope}s'
+UNIQUES_DAYS_KEY = 'analytics:uv:days'
+UNIQUES_MERGE_KEY = 'analytics:uv:merge:{scope}:{object_id}'
+UNIQUES_KEY_TTL = 8 * 24 * 3600
+DAY_FORMAT = '%Y%m%d'
+
+
+class RowSource:
+    """A table whose rows are counted into one ActivityBucket metric."""
+
+    def __init__(self, name, model, column, scope, filters=None):
+        self.name = name
+        self.model = model
+        self.column = column
+        self.scope = scope
+        self.filters = filters or {}
+
+    @property
+    def metric(self):
+        return self.name
+
+    def queryset(self):
+        return apps.get_model(self.model)._default_manager.filter(**self.filters)
+
+    def increments(self, lo, hi):
+        rows = (
+            self.queryset()
+            .filter(pk__gt=lo, pk__lte=hi)
+            .annotate(hour=TruncHour('created_at', tzinfo=UTC))
+            .values(self.column, 'hour')
+            .annotate(total=Count('pk'))
+            .order_by()
+        )
+        counts = Counter()
+        for row in rows:
+            counts[(self.scope, row[self.column], row['hour'])] += row['total']
+        if self.scope == 'post':
+            counts = expand_post_counts(counts)
+        return counts
+
+
+SOURCES = {
+    source.name: source for source in (
+        RowSource('likes', 'posts.PostLike', 'post_id', 'post', {'value': 'like'}),
+        RowSource('comments', 'comments.Comment', 'post_id', 'post'),
+        RowSource('follows', 'accounts.Follow', 'to_user_id', 'author'),
+    )
+}
+
+
+def expand_post_counts(counts):
+    """Add the category and author buckets implied by per-post counts."""
+    Post = apps.get_model('posts', 'Post')
+    post_ids = {object_id for scope, object_id, _ in counts if scope == 'post'}
+    categories = {}
+    for post_id, category_id in Post.categories.through.objects.filter(post_id__in=post_ids).values_list(
+        'post_id', 'category_id'
+    ):
+        categories.setdefault(post_id, []).append(category_id)
+    authors = dict(Post.objects.filter(pk__in=post_ids, user__isnull=False).values_list('pk', 'user_id'))
+
+    expanded = Counter(counts)
+    for (scope, post_id, hour), total in counts.items():
+        if scope != 'post':
+            continue
+        for category_id in categories.get(post_id, ()):
+            expanded[('category', category_id, hour)] += total
+        if post_id in authors:
+            expanded[('author', authors[post_id], hour)] += total
+    return expanded
+
+
+def apply_increments(metric, counts):
+    """
+    Add hourly counts to the hour and day buckets of ``metric``. The upsert
+    increments in place, so concurrent writers never lose each other's counts.
+    """
+    totals = Counter()
+    for (scope, object_id, hour), total in counts.items():
+        totals[(scope, object_id, 'hour', hour)] += total
+        totals[(scope, object_id, 'day', hour.replace(hour=0))] += total
+    upsert_buckets(metric, totals)
+
+
+def upsert_buckets(metric, totals, replace=False):
+    """
+    Write ``{(scope, object_id, granularity, bucket_start): value}`` into
+    ``metric``, adding to the stored value unless ``replace``.
+    """
+    if not totals:
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(ActivityBucket._meta.db_table)
+    column = qn(metric)
+    metrics = ('likes', 'comments', 'follows', 'views', 'unique_viewers')
+    value = f"EXCLUDED.{column}" if replace else f"{table}.{column} + EXCLUDED.{column}"
+    sql = (
+        f"INSERT INTO {table} (scope, object_id, granularity, bucket_start, {', '.join(map(qn, metrics))}) "
+        f"VALUES (%s, %s, %s, %s, {', '.join(['%s'] * len(metrics))}) "
+        f"ON CONFLICT (scope, object_id, granularity, bucket_start) "
+        f"DO UPDATE SET {column} = {value}"
+    )
+    # Sorted keys give concurrent backfill chunks a consistent lock order.
+    params = [
+        (scope, object_id, granularity, connection.ops.adapt_datetimefield_value(bucket_start),
+         *(total if name == metric else 0 for name in metrics))
+        for (scope, object_id, granularity, bucket_start), total in sorted(totals.items())
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def lock_watermark(name):
+    RollupWatermark.objects.get_or_create(source=name)
+    return RollupWatermark.objects.select_for_update().get(source=name)
+
+
+def process_batch(source, batch_size=5000):
+    """
+    Roll up at most ``batch_size`` rows past the watermark. Counts and the new
+    watermark commit together, so an interrupted run is simply repeated.
+    Returns the number of rows processed.
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=SETTLE_SECONDS)
+    with transaction.atomic():
+        mark = lock_watermark(source.name)
+        pending = source.queryset().filter(pk__gt=mark.position, created_at__lt=cutoff).order_by('pk')
+        boundary = list(pending.values_list('pk', flat=True)[batch_size - 1:batch_size])
+        hi = boundary[0] if boundary else pending.aggregate(hi=Max('pk'))['hi']
+        if hi is None:
+            return 0
+        counts = source.increments(mark.position, hi)
+        apply_increments(source.metric, counts)
+        mark.position = hi
+        mark.save(update_fields=['position', 'updated_at'])
+    return sum(total for (scope, _, _), total in counts.items() if scope == source.scope)
+
+
+def run_source(source, batch_size=5000):
+    processed = 0
+    while True:
+        batch = process_batch(source, batch_size)
+        if not batch:
+            return processed
+        processed += batch
+
+
+def rebuild_source(source, chunk_size=50000, workers=4):
+    """
+    Recount ``source`` from scratch. The metric is zeroed and the watermark
+    moved to the current maximum id in one transaction; the id range below it
+    is then counted in parallel chunks. Re-running after a failure restarts
+    the rebuild from zero, so it is idempotent as well.
+    """
+    with transaction.atomic():
+        mark = lock_watermark(source.name)
+        hi = source.queryset().aggregate(hi=Max('pk'))['hi'] or 0
+        ActivityBucket.objects.filter(**{f'{source.metric}__gt': 0}).update(**{source.metric: 0})
+        mark.position = max(mark.position, hi)
+        mark.save(update_fields=['position', 'updated_at'])
+
+    def count_chunk(lo):
+        try:
+            with transaction.atomic():
+                counts = source.increments(lo, min(lo + chunk_size, hi))
+                apply_increments(source.metric, counts)
+            return sum(total for (scope, _, _), total in counts.items() if scope == source.scope)
+        finally:
+            if workers > 1:
+                connection.close()
+
+    chunks = range(0, hi, chunk_size)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return sum(pool.map(count_chunk, chunks))
+    return sum(map(count_chunk, chunks))
+
+
+def views_key(moment):
+    return VIEWS_KEY_PREFIX + moment.astimezone(UTC).strftime(HOUR_FORMAT)
+
+
+def viewer_id(request):
+    """
+    The user id, or a keyed hash of the client's address and headers for
+    anonymous viewers. The address is the one throttling uses: behind
+    ``NUM_PROXIES`` proxies, the X-Forwarded-For entry the nearest trusted one added.
+    """
+    from rest_framework.throttling import BaseThrottle
+
+    if request.user.is_authenticated:
+        return f'u{request.user.pk}'
+    headers = (request.META.get(name, '') for name in ('HTTP_USER_AGENT', 'HTTP_ACCEPT_LANGUAGE'))
+    raw = '|'.join((BaseThrottle().get_ident(request), *headers))
+    return 'a' + hmac.new(settings.SECRET_KEY.encode(), raw.encode(), hashlib.sha256).hexdigest()[:20]
+
+
+def record_view(post_id, author_id=None, viewer=None):
+    """
+    Buffer a post view in the current hour's Redis hash until the next rollup,
+    and add ``viewer`` to the day's post and author HyperLogLogs.
+    """
+    from django_redis import get_redis_connection
+
+    conn = get_redis_connection("default")
+    now = timezone.now()
+    key = views_key(now)
+    pipe = conn.pipeline()
+    pipe.hincrby(key, post_id, 1)
+    pipe.expire(key, VIEWS_KEY_TTL)
+    if viewer:
+        day = now.astimezone(UTC).strftime(DAY_FORMAT)
+        pipe.sadd(UNIQUES_DAYS_KEY, day)
+        for scope, object_id in (('post', post_id), ('author', author_id)):
+            if object_id is None:
+                continue
+            key = UNIQUES_KEY.format(day=day, scope=scope, object_id=object_id)
+            touched = UNIQUES_TOUCHED_KEY.format(day=day, scope=scope)
+            pipe.pfadd(key, viewer)
+            pipe.sadd(touched, object_id)
+            pipe.expire(key, UNIQUES_KEY_TTL)
+            pipe.expire(touched, UNIQUES_KEY_TTL)
+    pipe.execute()
+
+
+def add_view_totals(counts):
+    """Add rolled-up views to ``Post.views_count`` and the authors' ``AuthorStats.total_views``."""
+    Post = apps.get_model('posts', 'Post')
+    AuthorStats = apps.get_model('accounts', 'AuthorStats')
+
+    totals = {'post': Counter(), 'author': Counter()}
+    for (scope, object_id, _), total in counts.items():
+        if scope in totals:
+            totals[scope][object_id] += total
+    Post.objects.bulk_update(
+        [Post(pk=post_id, views_count=F('views_count') + total) for post_id, total in totals['post'].items()],
+        ['views_count'], batch_size=1000,
+    )
+    # Authors without a stats row yet get these views when it is built from views_count.
+    AuthorStats.objects.bulk_update(
+        [AuthorStats(user_id=user_id, total_views=F('total_views') + total) for user_id, total in totals['author'].items()],
+        ['total_views'], batch_size=1000,
+    )
+
+
+def run_views():
+    """
+    Move the buffered view counts of every closed hour into the buckets and
+    the post and author totals. The watermark holds the last hour rolled up,
+    so a hash left behind by a crash between commit and delete is discarded
+    instead of being counted twice.
+    """
+    from django_redis import get_redis_connection
+
+    conn = get_redis_connection("default")
+    open_hour = int(views_key(timezone.now() - datetime.timedelta(seconds=SETTLE_SECONDS))[len(VIEWS_KEY_PREFIX):])
+    hours = sorted(
+        (int(key[len(VIEWS_KEY_PREFIX):]), key)
+        for key in (k.decode() for k in conn.scan_iter(VIEWS_KEY_PREFIX + '*'))
+    )
+    processed = 0
+    for hour_id, key in hours:
+        if hour_id >= open_hour:
+            break
+        with transaction.atomic():
+            mark = lock_watermark('views')
+            if hour_id > mark.position:
+                hour = datetime.datetime.strptime(str(hour_id), HOUR_FORMAT).replace(tzinfo=UTC)
+                counts = Counter({
+                    ('post', int(post_id), hour): int(total) for post_id, total in conn.hgetall(key).items()
+                })
+                expanded = expand_post_counts(counts)
+                apply_increments('views', expanded)
+                add_view_totals(expanded)
+                mark.position = hour_id
+                mark.save(update_fields=['position', 'updated_at'])
+                processed += sum(counts.values())
+        conn.delete(key)
+    return processed
+
+
+def merge_uniques(conn, scope, day, day_start, object_ids):
+    """
+    Union one day's HyperLogLogs of ``object_ids`` into their all-time
+    sketches, store the day's distinct count in the day bucket and the all-time
+    count on the post or author. Every write replaces, so a batch that is
+    merged twice after a crash ends up the same.
+    """
+    Post = apps.get_model('posts', 'Post')
+    User = apps.get_model('accounts', 'User')
+    AuthorStats = apps.get_model('accounts', 'AuthorStats')
+
+    sketches = dict(
+        ViewerSketch.objects.filter(scope=scope, object_id__in=object_ids).values_list('object_id', 'registers')
+    )
+    pipe = conn.pipeline()
+    for object_id in object_ids:
+        key = UNIQUES_KEY.format(day=day, scope=scope, object_id=object_id)
+        merged = UNIQUES_MERGE_KEY.format(scope=scope, object_id=object_id)
+        pipe.pfcount(key)
+        if object_id in sketches:
+            pipe.set(merged, bytes(sketches[object_id]), ex=600)
+        else:
+            pipe.delete(merged)
+        pipe.pfmerge(merged, merged, key)
+        pipe.pfcount(merged)
+        pipe.get(merged)
+        pipe.delete(merged)
+    results = pipe.execute()
+
+    day_counts, totals, registers = {}, {}, {}
+    for index, object_id in enumerate(object_ids):
+        day_count, _, _, total, dump, _ = results[index * 6:index * 6 + 6]
+        day_counts[(scope, object_id, 'day', day_start)] = day_count
+        totals[object_id] = total
+        registers[object_id] = dump
+
+    with transaction.atomic():
+        upsert_buckets('unique_viewers', day_counts, replace=True)
+        ViewerSketch.objects.bulk_create(
+            [ViewerSketch(scope=scope, object_id=object_id, registers=dump) for object_id, dump in registers.items()],
+            update_conflicts=True, unique_fields=['scope', 'object_id'], update_fields=['registers', 'updated_at'],
+        )
+        if scope == 'post':
+            Post.objects.bulk_update(
+                [Post(pk=object_id, unique_viewers=total) for object_id, total in totals.items()], ['unique_viewers']
+            )
+        else:
+            # Authors deleted since their posts were viewed are skipped.
+            users = set(User.objects.filter(pk__in=totals).values_list('pk', flat=True))
+            totals = {user_id: total for user_id, total in totals.items() if user_id in users}
+            missing = users - set(AuthorStats.objects.filter(user_id__in=users).values_list('user_id', flat=True))
+            for user_id in missing:
+                AuthorStats.rebuild(user_id)
+            AuthorStats.objects.bulk_update(
+                [AuthorStats(user_id=user_id, unique_viewers=total) for user_id, total in totals.items()],
+                ['unique_viewers'],
+            )
+
+    touched = UNIQUES_TOUCHED_KEY.format(day=day, scope=scope)
+    pipe = conn.pipeline()
+    pipe.delete(*(UNIQUES_KEY.format(day=day, scope=scope, object_id=object_id) for object_id in object_ids))
+    pipe.srem(touched, *object_ids)
+    pipe.execute()
+
+
+def run_uniques(batch_size=500):
+    """
+    Fold the viewer HyperLogLogs of every closed day into the day buckets and
+    the all-time post/author counts, ``batch_size`` objects at a time.
+    Returns the number of posts and authors merged.
+    """
+    from django_redis import get_redis_connection
+
+    conn = get_redis_connection("default")
+    open_day = (timezone.now() - datetime.timedelta(seconds=SETTLE_SECONDS)).astimezone(UTC).strftime(DAY_FORMAT)
+    merged = 0
+    for day in sorted(member.decode() for member in conn.smembers(UNIQUES_DAYS_KEY)):
+        if day >= open_day:
+            break
+        day_start = datetime.datetime.strptime(day, DAY_FORMAT).replace(tzinfo=UTC)
+        for scope in ('post', 'author'):
+            touched = UNIQUES_TOUCHED_KEY.format(day=day, scope=scope)
+            while True:
+                object_ids = [int(member) for member in conn.srandmember(touched, batch_size)]
+                if not object_ids:
+                    break
+                merge_uniques(conn, scope, day, day_start, object_ids)
+                merged += len(object_ids)
+        conn.srem(UNIQUES_DAYS_KEY, day)
+    return merged
@@ -0,0 +1,21 @@
+from rest_framework import serializers
+from .models import ActivityBucket
+
+
+class SeriesQuerySerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(choices=ActivityBucket.GRANULARITY_CHOICES, default='day')
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+
+class BucketSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ActivityBucket
+        fields = ['bucket_start', 'likes', 'comments', 'follows', 'views', 'unique_viewers']
+
+
+class SeriesSerializer(serializers.Serializer):
+    granularity = serializers.CharField()
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    series = BucketSerializer(many=True)
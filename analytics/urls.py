@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("me/series/", views.MySeriesView.as_view(), name="my-series"),
+    path("posts/<slug:slug>/series/", views.PostSeriesView.as_view(), name="post-series"),
+    path("categories/<slug:slug>/series/", views.CategorySeriesView.as_view(), name="category-series"),
+]
@@ -0,0 +1,92 @@
+import datetime
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_spectacular.utils import extend_schema
+from posts.models import Post, Category
+from posts.permissions import IsOwnerOrStaff
+from .models import ActivityBucket
+from .serializers import SeriesQuerySerializer, SeriesSerializer
+
+UTC = datetime.timezone.utc
+
+STEPS = {'hour': datetime.timedelta(hours=1), 'day': datetime.timedelta(days=1)}
+DEFAULT_POINTS = {'hour': 48, 'day': 30}
+MAX_POINTS = {'hour': 31 * 24, 'day': 366}
+METRICS = ('likes', 'comments', 'follows', 'views', 'unique_viewers')
+
+
+def truncate(moment, granularity):
+    moment = moment.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == 'day' else moment
+
+
+# Zero-filled hourly or daily activity series served from the rollup buckets.
+class SeriesView(APIView):
+    scope = None
+    queryset = None
+    lookup_field = 'slug'
+
+    def get_object_id(self):
+        # Author series belong to the requesting user; post and category series are looked up by slug.
+        if self.scope == 'author':
+            return self.request.user.pk
+        obj = get_object_or_404(self.queryset.all(), **{self.lookup_field: self.kwargs[self.lookup_field]})
+        self.check_object_permissions(self.request, obj)
+        return obj.pk
+
+    def get_range(self, params):
+        granularity = params['granularity']
+        step = STEPS[granularity]
+        end = truncate(params.get('end') or timezone.now(), granularity)
+        start = truncate(params['start'], granularity) if 'start' in params else end - step * (DEFAULT_POINTS[granularity] - 1)
+        if start > end:
+            raise ValidationError({'start': 'start must not be after end.'})
+        if (end - start) // step >= MAX_POINTS[granularity]:
+            raise ValidationError({'start': f'At most {MAX_POINTS[granularity]} {granularity} buckets per request.'})
+        return granularity, start, end
+
+    @extend_schema(parameters=[SeriesQuerySerializer], responses={200: SeriesSerializer})
+    def get(self, request, *args, **kwargs):
+        query = SeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        granularity, start, end = self.get_range(query.validated_data)
+
+        buckets = {
+            row['bucket_start']: row
+            for row in ActivityBucket.objects.filter(
+                scope=self.scope, object_id=self.get_object_id(), granularity=granularity,
+                bucket_start__gte=start, bucket_start__lte=end,
+            ).values('bucket_start', *METRICS)
+        }
+        series = []
+        bucket_start = start
+        while bucket_start <= end:
+            series.append(buckets.get(bucket_start) or {'bucket_start': bucket_start, **dict.fromkeys(METRICS, 0)})
+            bucket_start += STEPS[granularity]
+
+        data = {'granularity': granularity, 'start': start, 'end': end, 'series': series}
+        return Response(SeriesSerializer(data).data)
+
+
+@extend_schema(summary="Activity series of one of my posts (owner/staff)", tags=["analytics"])
+class PostSeriesView(SeriesView):
+    permission_classes = [IsAuthenticated, IsOwnerOrStaff]
+    scope = 'post'
+    queryset = Post.objects.only('pk', 'user_id')
+
+
+@extend_schema(summary="Activity series of a category (public)", tags=["analytics"])
+class CategorySeriesView(SeriesView):
+    permission_classes = [AllowAny]
+    scope = 'category'
+    queryset = Category.objects.only('pk')
+
+
+@extend_schema(summary="Activity series across my posts, including new followers", tags=["analytics"])
+class MySeriesView(SeriesView):
+    permission_classes = [IsAuthenticated]
+    scope = 'author'
@@ -0,0 +1,41 @@
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.utils import get_last_value_from_parameters
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.utils.translation import gettext_lazy as _
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Foreign key filter rendered as an admin autocomplete box instead of one
+    link per related row. The related model's admin needs ``search_fields``.
+
+        list_filter = (('user', AutocompleteFilter),)
+    """
+    template = 'admin/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = get_last_value_from_parameters(params, self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site, attrs={'data-allow-clear': 'true'}),
+            to_field_name=field.target_field.name,
+            required=False,
+        )
+        # Filters on one page share a single copy of the select2 assets.
+        self.media = forms.Media() if getattr(request, '_autocomplete_media', False) else form_field.widget.media
+        request._autocomplete_media = True
+        self.rendered_widget = form_field.widget.render(self.lookup_kwarg, self.lookup_val)
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        self.query_string = changelist.get_query_string(remove=[self.lookup_kwarg])
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': self.query_string,
+            'display': _('All'),
+        }
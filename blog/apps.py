@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_save
+
+
+class BlogConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'blog'
+
+    def ready(self):
+        from django.db import connection
+        from . import checks
+        from .partitioning import ensure_all_partitions, get_specs, guard_partitions
+
+        post_migrate.connect(ensure_all_partitions, sender=self)
+        if connection.vendor == 'postgresql':
+            for spec in get_specs():
+                if spec.strategy == 'range':
+                    pre_save.connect(guard_partitions, sender=spec.label, dispatch_uid=f'guard_partitions:{spec.label}')
@@ -0,0 +1,360 @@
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connections
+from django.http import HttpResponse, HttpResponseNotModified
+from django.test import RequestFactory
+from django.utils.cache import patch_cache_control, patch_response_headers, patch_vary_headers
+from django.utils.http import parse_etags, parse_http_date_safe
+from .compression import precompress, select_variant
+
+SKIPPED_HEADERS = {'content-length', 'content-encoding', 'set-cookie'}
+# XFetch weight: above 1 refreshes earlier, below 1 later.
+EARLY_BETA = 1.0
+# Waiters poll for the rebuilt entry with a doubling delay, from LOCK_POLL up to LOCK_POLL_MAX.
+LOCK_POLL = 0.005
+LOCK_POLL_MAX = 0.1
+# What a shared entry may depend on: the URL, content negotiation and the client address (throttling).
+SHARED_META = (
+    'HTTP_ACCEPT', 'HTTP_ACCEPT_ENCODING', 'HTTP_HOST', 'HTTP_X_FORWARDED_HOST', 'HTTP_X_FORWARDED_PROTO',
+    'HTTP_X_FORWARDED_FOR', 'REMOTE_ADDR', 'SERVER_NAME', 'SERVER_PORT',
+)
+# Entry headers that describe the shared body, not a personalized one.
+SHARED_ONLY_HEADERS = {'ETag', 'Last-Modified', 'Cache-Control', 'Expires'}
+
+refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+
+
+def response_cache_key(request, key_prefix):
+    raw = '|'.join((request.build_absolute_uri(), request.META.get('HTTP_ACCEPT', '')))
+    return f'{key_prefix}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def build_entry(response):
+    return {
+        'status': response.status_code,
+        'headers': [(k, v) for k, v in response.items() if k.lower() not in SKIPPED_HEADERS],
+        'bodies': precompress(response.content),
+    }
+
+
+def not_modified(request, headers):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    etag = headers.get('ETag')
+    if if_none_match:
+        return bool(etag) and etag.removeprefix('W/') in {
+            tag.removeprefix('W/') for tag in parse_etags(if_none_match)
+        }
+    # If-Modified-Since only counts without If-None-Match (RFC 9110 13.1.3).
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    last_modified = parse_http_date_safe(headers.get('Last-Modified', ''))
+    return None not in (if_modified_since, last_modified) and last_modified <= if_modified_since
+
+
+def entry_response(request, entry):
+    headers = dict(entry['headers'])
+    if not_modified(request, headers):
+        response = HttpResponseNotModified()
+        for key in ('ETag', 'Last-Modified'):
+            if key in headers:
+                response[key] = headers[key]
+        return response
+
+    encoding, body = select_variant(request, entry['bodies'])
+    response = HttpResponse(body, status=entry['status'])
+    for key, value in entry['headers']:
+        response[key] = value
+    if len(entry['bodies']) > 1:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if encoding != 'identity':
+        response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(body))
+    return response
+
+
+def private_response(response):
+    patch_vary_headers(response, ('Authorization',))
+    patch_cache_control(response, private=True)
+    return response
+
+
+def personalized_response(entry, user, personalize):
+    """The shared JSON entry with ``personalize(user, data)`` applied; None if it cannot be personalized."""
+    from .renderers import FastJSONRenderer
+
+    headers = dict(entry['headers'])
+    if not headers.get('Content-Type', '').startswith('application/json'):
+        return None
+    data = personalize(user, json.loads(entry['bodies']['identity']))
+    if data is None:
+        return None
+    response = HttpResponse(FastJSONRenderer().render(data), status=entry['status'])
+    for key, value in entry['headers']:
+        if key not in SHARED_ONLY_HEADERS:
+            response[key] = value
+    # Revalidated every time, so a changed vote shows up at once.
+    patch_cache_control(response, no_cache=True)
+    return private_response(response)
+
+
+def authenticate(request):
+    """
+    The user the request's credentials belong to (AnonymousUser when they name
+    nobody), or None when they are invalid.
+    """
+    from rest_framework.exceptions import APIException
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    try:
+        return Request(request, authenticators=authenticators).user
+    except APIException:
+        return None
+
+
+def shared_request(request):
+    """A credential-free copy of ``request``, to build the entry every caller shares."""
+    meta = {key: request.META[key] for key in SHARED_META if key in request.META}
+    return RequestFactory().generic(request.method, request.get_full_path(), secure=request.is_secure(), **meta)
+
+
+def is_cacheable(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.has_header('Set-Cookie')
+        and 'private' not in response.get('Cache-Control', '')
+    )
+
+
+class CacheStats:
+    """
+    Per-process outcome counters, added to one Redis hash per key prefix every
+    FLUSH_INTERVAL seconds. The hashes live outside the ``mbapi:`` prefix, so
+    cache busting leaves them alone.
+    """
+    KEY = 'cache:stats:{}'
+    FLUSH_INTERVAL = 5
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.flushed_at = time.monotonic()
+
+    @property
+    def conn(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+
+    def incr(self, prefix, outcome):
+        with self.lock:
+            self.pending[prefix, outcome] += 1
+            if time.monotonic() - self.flushed_at < self.FLUSH_INTERVAL:
+                return
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.flushed_at = time.monotonic()
+        if not pending:
+            return
+        pipe = self.conn.pipeline()
+        for (prefix, outcome), count in pending.items():
+            pipe.hincrby(self.KEY.format(prefix), outcome, count)
+        pipe.execute()
+
+    def read(self):
+        stats = {}
+        for key in self.conn.scan_iter(self.KEY.format('*')):
+            prefix = key.decode()[len(self.KEY.format('')):]
+            stats[prefix] = {field.decode(): int(value) for field, value in self.conn.hgetall(key).items()}
+        return stats
+
+    def reset(self):
+        with self.lock:
+            self.pending.clear()
+        for key in self.conn.scan_iter(self.KEY.format('*')):
+            self.conn.delete(key)
+
+
+stats = CacheStats()
+
+
+def acquire_lock(key):
+    token = uuid.uuid4().hex
+    return token if cache.add(f'{key}:lock', token, settings.CACHE_LOCK_TIMEOUT) else None
+
+
+def release_lock(key, token):
+    if cache.get(f'{key}:lock') == token:
+        cache.delete(f'{key}:lock')
+
+
+def wait_for_entry(key):
+    """Poll for the entry another request is building; None if it gives up or fails."""
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    delay = LOCK_POLL
+    while time.monotonic() < deadline:
+        time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+        delay = min(delay * 2, LOCK_POLL_MAX)
+        entry = caches['responses'].get(key)
+        if entry is not None:
+            return entry
+        if cache.get(f'{key}:lock') is None:
+            # Released without storing anything (e.g. the response was not cacheable).
+            return caches['responses'].get(key)
+    return None
+
+
+def needs_refresh(entry, now=None):
+    """
+    True once the entry is stale, and with rising probability shortly before
+    (XFetch): entries that took longer to build are refreshed earlier.
+    """
+    now = time.time() if now is None else now
+    return now - entry['delta'] * EARLY_BETA * math.log(1.0 - random.random()) >= entry['expires']
+
+
+def compute_entry(view, request, args, kwargs, key, timeout):
+    """Run the view and store its response; returns ``(response, entry)``, entry None when not cacheable."""
+    started = time.monotonic()
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    if not is_cacheable(response):
+        return response, None
+    patch_response_headers(response, timeout)
+    patch_cache_control(response, stale_while_revalidate=settings.CACHE_STALE_TTL)
+    patch_vary_headers(response, ('Authorization',))
+    entry = build_entry(response)
+    entry['expires'] = time.time() + timeout
+    entry['delta'] = time.monotonic() - started
+    # Kept past its freshness so it can be served while being refreshed.
+    caches['responses'].set(key, entry, timeout + settings.CACHE_STALE_TTL)
+    return response, entry
+
+
+def refresh_entry(view, request, args, kwargs, key, timeout, token):
+    """Rebuild the entry in a refresher thread; ``request`` is a fresh copy, not the one being served."""
+    try:
+        compute_entry(view, request, args, kwargs, key, timeout)
+    finally:
+        release_lock(key, token)
+        connections.close_all()
+
+
+def read_entry(key):
+    entry = caches['responses'].get(key)
+    if entry is not None and 'expires' not in entry:
+        # Stored before stampede protection; treat as expired.
+        entry = {**entry, 'expires': 0, 'delta': 0}
+    return entry
+
+
+def lookup(view, request, args, kwargs, key, timeout):
+    """``(outcome, entry, response)``; entry is None (and response set) when the response was not cacheable."""
+    entry = read_entry(key)
+    if entry is not None and time.time() >= entry['expires']:
+        # L1 may hold an expired copy for up to L1_TTL after another process
+        # refreshed L2; check L2 before treating it as stale.
+        caches['responses'].forget(key)
+        entry = read_entry(key)
+
+    if entry is None:
+        token = acquire_lock(key)
+        outcome = 'miss'
+        if token is None:
+            entry = wait_for_entry(key)
+            outcome = 'wait' if entry is not None else 'wait_timeout'
+        if entry is None:
+            try:
+                response, entry = compute_entry(view, request, args, kwargs, key, timeout)
+            finally:
+                if token is not None:
+                    release_lock(key, token)
+            if entry is None:
+                return outcome, None, response
+    elif needs_refresh(entry):
+        outcome = 'stale' if time.time() >= entry['expires'] else 'early'
+        token = acquire_lock(key)
+        if token is not None:
+            # Another process may have refreshed it since our copy was read.
+            caches['responses'].forget(key)
+            current = read_entry(key)
+            if current is not None and current['expires'] > entry['expires'] and not needs_refresh(current):
+                release_lock(key, token)
+                return 'hit', current, None
+            refresher.submit(refresh_entry, view, shared_request(request), args, kwargs, key, timeout, token)
+        else:
+            # Another request is refreshing it; pick up its result from L2.
+            caches['responses'].forget(key)
+    else:
+        outcome = 'hit'
+    return outcome, entry, None
+
+
+def cache_response(timeout=None, key_prefix='response', personalize=None, public=False):
+    """
+    Like ``cache_page``, but the cache entry holds the rendered body together
+    with its gzip/brotli variants, so hits never compress. Entries go through
+    the two-tier ``responses`` cache, so hot pages are served from memory.
+
+    Only one request rebuilds a missing or expiring entry (a short lock in the
+    cache); others wait for it, or get the stale entry while it is refreshed in
+    a background thread. Outcomes are sent as ``X-Cache`` and counted in
+    ``stats``.
+
+    Entries are always built as an anonymous request. ``public`` views answer
+    everyone the same, so authenticated requests are served the entry as is.
+    Otherwise a request whose credentials resolve to a user gets the entry
+    passed through ``personalize(user, data)`` (JSON only; it returns None
+    when it cannot fill in the user's fields), or bypasses the cache when the
+    view has no ``personalize``. Credentials that resolve to nobody are served
+    from the cache; invalid ones go to the view, which rejects them.
+    """
+    timeout = settings.CACHE_TTL if timeout is None else timeout
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            user = None
+            if request.META.get('HTTP_AUTHORIZATION') and not public:
+                user = authenticate(request)
+                if user is None or (user.is_authenticated and personalize is None):
+                    return private_response(view(request, *args, **kwargs))
+                if not user.is_authenticated:
+                    user = None
+
+            source = request if user is None else shared_request(request)
+            key = response_cache_key(request, key_prefix)
+            outcome, entry, response = lookup(view, source, args, kwargs, key, timeout)
+            if entry is None:
+                if user is None or response.status_code != 200:
+                    return response
+                return private_response(view(request, *args, **kwargs))
+
+            stats.incr(key_prefix, outcome)
+            if user is None:
+                response = entry_response(request, entry)
+            else:
+                response = personalized_response(entry, user, personalize)
+                if response is None:
+                    return private_response(view(request, *args, **kwargs))
+            response['X-Cache'] = outcome.upper()
+            return response
+        return wrapped
+    return decorator
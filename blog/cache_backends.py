@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+GENERATION_KEY = 'cache:generation'
+
+# Shared by every thread of the process, like LocMemCache's storage.
+_stores = {}
+_locks = {}
+
+
+class LocalStore:
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.generation = None
+        self.checked_at = float('-inf')
+
+
+class TwoTierCache(BaseCache):
+    """
+    A bounded in-process LRU (L1) in front of another cache alias (L2).
+
+    Values are kept in L1 as the objects themselves, so L1 hits skip both the
+    network round trip and unpickling. Writes go to both tiers. L1 entries live
+    at most ``L1_TTL`` seconds and are dropped in every process when the
+    generation in Redis is bumped with ``invalidate()``; each process reads
+    the generation at most once per ``CHECK_INTERVAL`` seconds.
+
+    OPTIONS: ``L2`` (alias, default ``"default"``), ``MAX_ENTRIES``,
+    ``L1_TTL``, ``CHECK_INTERVAL``.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.l2_alias = options.get('L2', 'default')
+        self.l1_ttl = options.get('L1_TTL', 30)
+        self.check_interval = options.get('CHECK_INTERVAL', 1)
+        self.store = _stores.setdefault(name, LocalStore())
+        self.lock = _locks.setdefault(name, threading.Lock())
+
+    @property
+    def l2(self):
+        return caches[self.l2_alias]
+
+    @property
+    def conn(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection(self.l2_alias)
+
+    def local_key(self, key, version):
+        return key, self.version if version is None else version
+
+    def sync(self):
+        """Drop L1 if another process bumped the generation since the last check."""
+        now = time.monotonic()
+        if now - self.store.checked_at < self.check_interval:
+            return self.store.generation
+        generation = self.conn.get(GENERATION_KEY)
+        with self.lock:
+            self.store.checked_at = now
+            if generation != self.store.generation:
+                self.store.entries.clear()
+                self.store.generation = generation
+        return generation
+
+    def remember(self, key, version, value, timeout, generation):
+        ttl = self.l1_ttl if timeout is None else min(timeout, self.l1_ttl)
+        if ttl <= 0:
+            return
+        local_key = self.local_key(key, version)
+        with self.lock:
+            entries = self.store.entries
+            entries[local_key] = (time.monotonic() + ttl, generation, value)
+            entries.move_to_end(local_key)
+            while len(entries) > self._max_entries:
+                entries.popitem(last=False)
+
+    def forget(self, key, version=None):
+        """Drop the L1 copy only, so the next read goes to L2."""
+        with self.lock:
+            self.store.entries.pop(self.local_key(key, version), None)
+
+    def get(self, key, default=None, version=None):
+        generation = self.sync()
+        local_key = self.local_key(key, version)
+        with self.lock:
+            item = self.store.entries.get(local_key)
+            if item is not None:
+                expires, item_generation, value = item
+                if expires > time.monotonic() and item_generation == self.store.generation:
+                    self.store.entries.move_to_end(local_key)
+                    return value
+                del self.store.entries[local_key]
+
+        sentinel = object()
+        value = self.l2.get(key, sentinel, version=version)
+        if value is sentinel:
+            return default
+        self.remember(key, version, value, None, generation)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        generation = self.sync()
+        self.l2.set(key, value, timeout, version=version)
+        self.remember(key, version, value, self.l2_timeout(timeout), generation)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        generation = self.sync()
+        if not self.l2.add(key, value, timeout, version=version):
+            return False
+        self.remember(key, version, value, self.l2_timeout(timeout), generation)
+        return True
+
+    def l2_timeout(self, timeout):
+        return self.l2.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.forget(key, version)
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.forget(key, version)
+        return self.l2.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        sentinel = object()
+        return self.get(key, sentinel, version=version) is not sentinel
+
+    def incr(self, key, delta=1, version=None):
+        self.forget(key, version)
+        return self.l2.incr(key, delta, version=version)
+
+    def invalidate(self):
+        """Drop L1 here now and in every other process within CHECK_INTERVAL."""
+        self.conn.incr(GENERATION_KEY)
+        with self.lock:
+            self.store.entries.clear()
+            self.store.checked_at = float('-inf')
+
+    def clear(self):
+        self.l2.clear()
+        self.invalidate()
@@ -0,0 +1,18 @@
+from django.core.checks import Warning, register
+
+
+@register('schema', deploy=True)
+def check_schema_drift(app_configs, **kwargs):
+    from .schema import schema_drift
+
+    drifted = schema_drift()
+    if not drifted:
+        return []
+    return [
+        Warning(
+            'docs/openapi.%s does not match the schema generated from the live views.' % fmt,
+            hint='Run "manage.py build_schema" and commit the result.',
+            id='blog.W001',
+        )
+        for fmt in drifted
+    ]
@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import fields, relations, serializers
+from rest_framework.response import Response
+
+
+class CompiledSerializer:
+    """
+    Read-only counterpart of ``serializer_class`` that builds dicts straight
+    from ``QuerySet.values()`` rows. Fields that cannot be compiled
+    generically need a ``compile_<name>`` method.
+    """
+    serializer_class = None
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        serializer = self.serializer_class(context=self.context)
+        self.model = serializer.Meta.model
+        self.columns = []
+        self.many_related = {}
+        self.plan = []
+        for name, field in serializer.fields.items():
+            compile_method = getattr(self, f'compile_{name}', None)
+            getter = compile_method(field) if compile_method else self.compile_field(name, field)
+            self.plan.append((name, getter))
+        self.pk = self.model._meta.pk.attname
+        if self.many_related and self.pk not in self.columns:
+            self.columns.append(self.pk)
+
+    def compile_field(self, name, field):
+        column = field.source.replace('.', '__')
+
+        if isinstance(field, relations.ManyRelatedField) and isinstance(
+            field.child_relation, relations.PrimaryKeyRelatedField
+        ):
+            self.many_related[column] = self.model._meta.get_field(column)
+            return lambda row: row[column]
+
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            convert = None
+        elif isinstance(field, (
+            fields.SerializerMethodField, relations.RelatedField, relations.ManyRelatedField, serializers.BaseSerializer,
+        )):
+            raise ImproperlyConfigured(
+                f'{type(self).__name__} cannot compile field {name!r}; define compile_{name}().'
+            )
+        elif isinstance(field, fields.FileField):
+            convert = self.file_converter(column, field)
+        elif isinstance(field, fields.CharField):
+            convert = str
+        elif isinstance(field, fields.IntegerField):
+            convert = int
+        else:
+            convert = field.to_representation
+
+        self.columns.append(column)
+        if convert is None:
+            return lambda row: row[column]
+        return lambda row: None if row[column] is None else convert(row[column])
+
+    def file_converter(self, column, field):
+        storage = self.model._meta.get_field(column).storage
+        use_url = getattr(field, 'use_url', True)
+        request = self.context.get('request')
+
+        def convert(name):
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return convert
+
+    def values(self, queryset):
+        return queryset.values(*self.columns)
+
+    def prepare(self, rows):
+        if not self.many_related:
+            return
+        ids = [row[self.pk] for row in rows]
+        for column, m2m in self.many_related.items():
+            source, target = m2m.m2m_field_name(), m2m.m2m_reverse_field_name()
+            related = {pk: [] for pk in ids}
+            pairs = (
+                m2m.remote_field.through.objects
+                .filter(**{f'{source}__in': ids})
+                .order_by(target)
+                .values_list(source, target)
+            )
+            for pk, related_pk in pairs:
+                related[pk].append(related_pk)
+            for row in rows:
+                row[column] = related[row[self.pk]]
+
+    def represent(self, row):
+        return {name: getter(row) for name, getter in self.plan}
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        self.prepare(rows)
+        return [self.represent(row) for row in rows]
+
+
+class CompiledListMixin:
+    """
+    Serves ``list()`` through ``compiled_serializer_class`` when
+    ``settings.FAST_RENDERING`` is on.
+    """
+    compiled_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not (getattr(settings, 'FAST_RENDERING', False) and self.compiled_serializer_class):
+            return super().list(request, *args, **kwargs)
+
+        compiled = self.compiled_serializer_class(context=self.get_serializer_context())
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.to_representation(page))
+        return Response(compiled.to_representation(queryset))
@@ -0,0 +1,105 @@
+import gzip
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# Per-request compression favours speed; precompressed variants are built once
+# and cached, so they can afford the best ratio.
+FAST_LEVELS = {'gzip': 6, 'br': 5}
+BEST_LEVELS = {'gzip': 9, 'br': 11}
+
+
+def parse_accept_encoding(header):
+    codings = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def negotiate(header, available=ENCODINGS):
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get('*', 0.0)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = codings.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body, encoding, best=False):
+    level = (BEST_LEVELS if best else FAST_LEVELS)[encoding]
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def precompress(body):
+    variants = {'identity': body}
+    if len(body) < settings.COMPRESSION_MIN_SIZE:
+        return variants
+    for encoding in ENCODINGS:
+        compressed = compress(body, encoding, best=True)
+        if len(compressed) < len(body):
+            variants[encoding] = compressed
+    return variants
+
+
+def select_variant(request, variants):
+    available = tuple(encoding for encoding in ENCODINGS if encoding in variants)
+    encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), available)
+    if encoding is None:
+        return 'identity', variants['identity']
+    return encoding, variants[encoding]
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    gzip/brotli response compression with Accept-Encoding negotiation.
+
+    Responses below COMPRESSION_MIN_SIZE, streaming responses and responses
+    that already carry a Content-Encoding (e.g. precompressed cache hits) are
+    passed through untouched.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
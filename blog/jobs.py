@@ -0,0 +1,9 @@
+from jobs.queue import job
+
+
+@job(dedup_key='blog.ensure_partitions')
+def ensure_partitions():
+    from . import partitioning
+
+    for spec in partitioning.get_specs():
+        partitioning.ensure_partitions(spec)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from blog.schema import generate_schema, render_schema, schema_drift, write_schema_files
+
+
+class Command(BaseCommand):
+    help = "Generate and validate the OpenAPI schema and write docs/openapi.json and docs/openapi.yaml."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Only compare the checked-in files with the live views; exit non-zero on drift.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drifted = schema_drift()
+            if drifted:
+                raise CommandError("Schema drift in: " + ", ".join(f"docs/openapi.{fmt}" for fmt in drifted))
+            self.stdout.write("Schema files are up to date.")
+            return
+
+        write_schema_files(render_schema(generate_schema()))
+        self.stdout.write(self.style.SUCCESS("Wrote docs/openapi.json and docs/openapi.yaml"))
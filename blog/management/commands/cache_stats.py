@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import stats
+
+OUTCOMES = ("hit", "early", "stale", "miss", "wait", "wait_timeout")
+
+
+class Command(BaseCommand):
+    help = "Show response cache outcomes (hit/early/stale/miss/lock-wait) per cache key prefix."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Clear the counters after printing them.")
+
+    def handle(self, *args, **options):
+        counters = stats.read()
+        if not counters:
+            self.stdout.write("No cache activity recorded.")
+        for prefix, counts in sorted(counters.items()):
+            total = sum(counts.values())
+            served = total - counts.get("miss", 0) - counts.get("wait_timeout", 0)
+            self.stdout.write(f"{prefix}: {total} requests, {served / total:.1%} served from cache")
+            for outcome in OUTCOMES:
+                self.stdout.write(f"  {outcome:<13}{counts.get(outcome, 0)}")
+        if options["reset"]:
+            stats.reset()
@@ -0,0 +1,54 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog import partitioning
+
+
+class Command(BaseCommand):
+    help = "Manage PostgreSQL partitions of the tables in settings.PARTITIONING."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "action", choices=["status", "convert", "ensure", "detach", "drop-old"],
+            help="status: list partitions; convert: partition a plain table online; "
+                 "ensure: pre-create future range partitions; detach: detach old range partitions; "
+                 "drop-old: drop the pre-conversion copy.",
+        )
+        parser.add_argument("--model", action="append", help="Model label, e.g. posts.PostLike (repeatable).")
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--older-than", type=int, help="Months to keep when detaching.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning requires PostgreSQL.")
+        try:
+            specs = partitioning.get_specs(options["model"])
+        except ImproperlyConfigured as exc:
+            raise CommandError(exc)
+
+        action = options["action"]
+        for spec in specs:
+            if action == "status":
+                self.stdout.write(f"{spec.label} ({spec.strategy} on {spec.key}):")
+                for name, bound, rows in partitioning.list_partitions(spec):
+                    self.stdout.write(f"  {name}  {bound}  ~{max(rows, 0)} rows")
+            elif action == "convert":
+                try:
+                    converted = partitioning.convert(spec, options["batch_size"], progress=self.progress)
+                except ImproperlyConfigured as exc:
+                    raise CommandError(exc)
+                message = "converted" if converted else "already partitioned"
+                self.stdout.write(self.style.SUCCESS(f"{spec.label}: {message}"))
+            elif action == "ensure":
+                partitioning.ensure_partitions(spec)
+            elif action == "detach":
+                if options["older_than"] is None:
+                    raise CommandError("detach needs --older-than MONTHS.")
+                for name in partitioning.detach_partitions(spec, options["older_than"]):
+                    self.stdout.write(f"{spec.label}: detached {name}")
+            elif action == "drop-old":
+                partitioning.drop_old(spec)
+
+    def progress(self, spec, step, done, total):
+        self.stdout.write(f"{spec.label}: {step} ids up to {done}/{total}")
@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import django
+from django.apps import config
+
+ready_ms = {}
+create = config.AppConfig.create.__func__
+
+def timed_create(cls, entry):
+    app_config = create(cls, entry)
+    ready = app_config.ready
+
+    def timed_ready():
+        began = time.perf_counter()
+        ready()
+        ready_ms[app_config.label] = (time.perf_counter() - began) * 1000
+
+    app_config.ready = timed_ready
+    return app_config
+
+config.AppConfig.create = classmethod(timed_create)
+django.setup()
+setup_ms = (time.perf_counter() - start) * 1000
+urls_ms = None
+if sys.argv[1] == "1":
+    import importlib
+    from django.conf import settings
+    began = time.perf_counter()
+    importlib.import_module(settings.ROOT_URLCONF)
+    urls_ms = (time.perf_counter() - began) * 1000
+print(json.dumps({"setup_ms": setup_ms, "urls_ms": urls_ms, "ready_ms": ready_ms}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Profile cold start in a fresh interpreter: import time per module/package and AppConfig.ready() cost."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=25, help="Number of modules/packages to list.")
+        parser.add_argument(
+            "--no-urls", action="store_true",
+            help="Stop after django.setup() instead of also importing ROOT_URLCONF (what a worker's first request does).",
+        )
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "blog.settings")}
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE, "0" if options["no_urls"] else "1"],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode:
+            raise CommandError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "probe failed")
+
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        modules = self.parse_importtime(proc.stderr)
+        limit = options["limit"]
+
+        self.stdout.write(f"django.setup(): {result['setup_ms']:.1f} ms")
+        if result["urls_ms"] is not None:
+            self.stdout.write(f"import {settings.ROOT_URLCONF}: {result['urls_ms']:.1f} ms")
+        self.stdout.write(f"total import time: {sum(m[1] for m in modules) / 1000:.1f} ms in {len(modules)} modules")
+
+        self.stdout.write("\nAppConfig.ready() (ms):")
+        for label, ms in sorted(result["ready_ms"].items(), key=lambda item: -item[1]):
+            self.stdout.write(f"  {ms:8.2f}  {label}")
+
+        packages = Counter()
+        for name, self_us, _ in modules:
+            packages[name.split(".")[0]] += self_us
+        self.stdout.write("\nSelf import time by top-level package (ms):")
+        for name, self_us in packages.most_common(limit):
+            self.stdout.write(f"  {self_us / 1000:8.2f}  {name}")
+
+        self.stdout.write("\nSlowest modules by cumulative import time (ms):")
+        for name, _, cumulative_us in sorted(modules, key=lambda m: -m[2])[:limit]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.2f}  {name}")
+
+    def parse_importtime(self, stderr):
+        modules = []
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+        return modules
@@ -0,0 +1,119 @@
+import json
+from django.conf import settings
+from django.contrib import messages
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for ``queryset`` on PostgreSQL: ``reltuples`` for an
+    unfiltered table, the EXPLAIN estimate otherwise. None when unavailable.
+    """
+    if not hasattr(queryset, 'query'):
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where and not queryset.query.distinct:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            # -1 means the table was never analyzed.
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedPage(Page):
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the planner estimate once it reaches
+    settings.ESTIMATED_COUNT_THRESHOLD and counts exactly below it.
+
+    Estimated pages fetch one extra row to tell whether a next page exists,
+    so navigation stays correct even when the estimate is off.
+    """
+    is_estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= settings.ESTIMATED_COUNT_THRESHOLD:
+            self.is_estimated = True
+            return estimate
+        return Paginator.count.func(self)
+
+    def validate_number(self, number):
+        if not self.count or not self.is_estimated:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_estimated:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return EstimatedPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_estimate': self.page.paginator.is_estimated,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {'type': 'boolean', 'example': False}
+        return response_schema
+
+
+class EstimatedCountAdminMixin:
+    paginator = EstimatedCountPaginator
+    # The "N of M" total runs a second unfiltered COUNT(*).
+    show_full_result_count = False
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is not None and getattr(changelist.paginator, 'is_estimated', False):
+            messages.info(request, f'The total of {changelist.result_count:,} is an estimate.')
+        return response
@@ -0,0 +1,417 @@
+"""
+Declarative PostgreSQL partitioning for the fast-growing tables listed in
+settings.PARTITIONING.
+
+``convert`` turns a plain table into a partitioned one online: a partitioned
+shadow table is created next to it, a trigger mirrors writes into the shadow,
+existing rows are copied in small batches, the shadow is checked against the
+table in batches, and the two tables are swapped under a short ACCESS
+EXCLUSIVE lock that only renames. The original is kept as ``<table>_old``
+until ``drop_old`` is run.
+"""
+import datetime
+import re
+import time
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.utils import timezone
+
+SHADOW_SUFFIX = '_partitioned'
+OLD_SUFFIX = '_old'
+# How often each process re-reads where its range partitions end.
+COVERAGE_CHECK_INTERVAL = 3600
+# Per process: table -> (checked at, end of the last monthly partition).
+_coverage = {}
+
+
+class Spec:
+    def __init__(self, label, strategy, key, partitions=16, months_ahead=3):
+        if strategy not in ('hash', 'range'):
+            raise ImproperlyConfigured(f'PARTITIONING[{label!r}]: strategy must be "hash" or "range".')
+        self.label = label
+        self.table = apps.get_model(label)._meta.db_table
+        self.strategy = strategy
+        self.key = key
+        self.partitions = partitions
+        self.months_ahead = months_ahead
+
+    @property
+    def shadow(self):
+        return self.table + SHADOW_SUFFIX
+
+    @property
+    def old(self):
+        return self.table + OLD_SUFFIX
+
+
+def get_specs(labels=None):
+    config = getattr(settings, 'PARTITIONING', {})
+    labels = labels or list(config)
+    unknown = set(labels) - set(config)
+    if unknown:
+        raise ImproperlyConfigured(f'Not in settings.PARTITIONING: {", ".join(sorted(unknown))}')
+    return [Spec(label, **config[label]) for label in labels]
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+def month_start(moment):
+    return moment.astimezone(datetime.timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(moment, months):
+    month = moment.month - 1 + months
+    return moment.replace(year=moment.year + month // 12, month=month % 12 + 1)
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s", [table]
+    )
+    return cursor.fetchone() is not None
+
+
+def table_exists(cursor, table):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [table])
+    return cursor.fetchone()[0]
+
+
+def create_range_partitions(cursor, spec, table, first_month, last_month):
+    month = first_month
+    while month <= last_month:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {qn(f'{spec.table}_{month:%Y%m}')} PARTITION OF {qn(table)} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [month, add_months(month, 1)],
+        )
+        month = add_months(month, 1)
+
+
+def drop_incoming_foreign_keys(cursor, spec):
+    """
+    Drop the database constraints of foreign keys that point at ``spec.table``:
+    a partitioned table can only be referenced through keys that include the
+    partition key. Only ForeignKeys declared with ``db_constraint=False`` are
+    dropped (Django still cascades their deletes); their migrations leave the
+    constraints in place until a table is actually converted.
+    """
+    unconstrained = {
+        (field.model._meta.db_table, field.column)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if field.remote_field and field.related_model._meta.db_table == spec.table and not field.db_constraint
+    }
+    cursor.execute(
+        "SELECT c.conrelid::regclass::text, c.conname, a.attname FROM pg_constraint c "
+        "JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1] "
+        "WHERE c.confrelid = %s::regclass AND c.contype = 'f'",
+        [spec.table],
+    )
+    incoming = cursor.fetchall()
+    blocking = [f'{table}.{column}' for table, _, column in incoming if (table, column) not in unconstrained]
+    if blocking:
+        raise ImproperlyConfigured(
+            f'{spec.table} is referenced by foreign keys ({", ".join(blocking)}); partitioned tables can '
+            'only be referenced through keys that include the partition key, so declare those ForeignKeys '
+            'with db_constraint=False first.'
+        )
+    for table, constraint, _ in incoming:
+        cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(constraint)}")
+
+
+def create_shadow(cursor, spec):
+    """Create the partitioned copy of ``spec.table`` with its partitions, keys and indexes."""
+    table, shadow = spec.table, spec.shadow
+    drop_incoming_foreign_keys(cursor, spec)
+
+    cursor.execute(
+        f"CREATE TABLE {qn(shadow)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING IDENTITY "
+        f"INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY {spec.strategy.upper()} ({qn(spec.key)})"
+    )
+    cursor.execute(f"ALTER TABLE {qn(shadow)} ADD PRIMARY KEY (id, {qn(spec.key)})")
+
+    if spec.strategy == 'hash':
+        for remainder in range(spec.partitions):
+            cursor.execute(
+                f"CREATE TABLE {qn(f'{table}_h{remainder:02d}')} PARTITION OF {qn(shadow)} "
+                f"FOR VALUES WITH (MODULUS {spec.partitions}, REMAINDER {remainder})"
+            )
+    else:
+        cursor.execute(f"SELECT min({qn(spec.key)}) FROM {qn(table)}")
+        oldest = cursor.fetchone()[0] or timezone.now()
+        now = month_start(timezone.now())
+        # No DEFAULT partition: it would block DETACH ... CONCURRENTLY. Future
+        # months are kept ahead by ensure_partitions() instead, with
+        # guard_partitions() as the safety net.
+        create_range_partitions(cursor, spec, shadow, month_start(oldest), add_months(now, spec.months_ahead))
+
+    # Indexes, unique constraints and outgoing foreign keys, under temporary names.
+    cursor.execute(
+        "SELECT c.relname, pg_get_indexdef(i.indexrelid), con.conname, pg_get_constraintdef(con.oid) "
+        "FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "LEFT JOIN pg_constraint con ON con.conindid = i.indexrelid AND con.conrelid = i.indrelid "
+        "WHERE i.indrelid = %s::regclass AND NOT i.indisprimary",
+        [table],
+    )
+    for index, indexdef, constraint, constraintdef in cursor.fetchall():
+        if constraint:
+            cursor.execute(f"ALTER TABLE {qn(shadow)} ADD CONSTRAINT {qn(constraint + '_p')} {constraintdef}")
+        else:
+            indexdef = indexdef.replace(f"INDEX {index} ON", f"INDEX {qn(index + '_p')} ON", 1)
+            cursor.execute(re.sub(rf" ON (ONLY )?(\S+\.)?{re.escape(table)} ", rf" ON \g<2>{shadow} ", indexdef, count=1))
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    for constraint, constraintdef in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE {qn(shadow)} ADD CONSTRAINT {qn(constraint + '_p')} {constraintdef}")
+
+
+def columns(cursor, table):
+    cursor.execute(
+        "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped "
+        "ORDER BY attnum",
+        [table],
+    )
+    return [qn(name) for (name,) in cursor.fetchall()]
+
+
+def upsert(spec, cursor):
+    """``ON CONFLICT`` clause that overwrites the shadow's copy of a row with the given one."""
+    updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in columns(cursor, spec.table))
+    return f"ON CONFLICT (id, {qn(spec.key)}) DO UPDATE SET {updates}"
+
+
+def install_mirror(cursor, spec):
+    # An upsert rather than DELETE + INSERT: a DELETE cannot see a row that an
+    # uncommitted copy batch is inserting, while ON CONFLICT waits for it.
+    function, key = qn(f'{spec.table}_mirror'), qn(spec.key)
+    cursor.execute(f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.{key} IS DISTINCT FROM NEW.{key}) THEN
+                DELETE FROM {qn(spec.shadow)} WHERE id = OLD.id AND {key} = OLD.{key};
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {qn(spec.shadow)} SELECT (NEW).* {upsert(spec, cursor)};
+            END IF;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql
+    """)
+    cursor.execute(
+        f"CREATE TRIGGER {function} AFTER INSERT OR UPDATE OR DELETE ON {qn(spec.table)} "
+        f"FOR EACH ROW EXECUTE FUNCTION {function}()"
+    )
+
+
+def id_batches(spec, batch_size):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT coalesce(max(id), 0) FROM {qn(spec.table)}")
+        last = cursor.fetchone()[0]
+    for lo in range(0, last, batch_size):
+        yield lo, min(lo + batch_size, last), last
+
+
+def copy_rows(spec, batch_size, progress=None):
+    """
+    Copy rows that existed before the mirror trigger, one short transaction
+    per batch. The source rows are locked FOR SHARE, so an UPDATE or DELETE of
+    one waits until its copy is committed and its trigger then sees the copy;
+    rows the trigger already wrote are newer and are skipped.
+    """
+    for lo, hi, last in id_batches(spec, batch_size):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {qn(spec.shadow)} SELECT * FROM ("
+                f"SELECT * FROM {qn(spec.table)} WHERE id > %s AND id <= %s FOR SHARE"
+                f") AS batch ON CONFLICT DO NOTHING",
+                [lo, hi],
+            )
+        if progress:
+            progress(spec, 'copied', hi, last)
+
+
+def reconcile(spec, batch_size, progress=None):
+    """
+    Make the shadow match the table batch by batch, before the swap and without
+    blocking writes: drop rows the table no longer has and rewrite any that
+    differ. Returns the number of rows fixed; it should be 0.
+    """
+    key = qn(spec.key)
+    fixed = 0
+    for lo, hi, last in id_batches(spec, batch_size):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {qn(spec.shadow)} s WHERE s.id > %s AND s.id <= %s AND NOT EXISTS "
+                f"(SELECT 1 FROM {qn(spec.table)} t WHERE t.id = s.id AND t.{key} = s.{key})",
+                [lo, hi],
+            )
+            fixed += cursor.rowcount
+            cursor.execute(
+                f"INSERT INTO {qn(spec.shadow)} SELECT * FROM ("
+                f"SELECT t.* FROM {qn(spec.table)} t WHERE t.id > %s AND t.id <= %s AND NOT EXISTS "
+                f"(SELECT 1 FROM {qn(spec.shadow)} s WHERE s.id = t.id AND s.{key} = t.{key} "
+                f"AND ROW(s.*) IS NOT DISTINCT FROM ROW(t.*)) FOR SHARE OF t"
+                f") AS batch {upsert(spec, cursor)}",
+                [lo, hi],
+            )
+            fixed += cursor.rowcount
+        if progress:
+            progress(spec, 'checked', hi, last)
+    return fixed
+
+
+def swap(cursor, spec):
+    table, shadow, old = spec.table, spec.shadow, spec.old
+    # The trigger has kept the shadow in step since reconcile(); nothing is
+    # scanned under the lock.
+    cursor.execute(f"LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE")
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id'), pg_get_serial_sequence(%s, 'id')", [table, shadow])
+    old_sequence, new_sequence = cursor.fetchone()
+    cursor.execute(
+        f"SELECT setval(%s, greatest((SELECT last_value FROM {old_sequence}), "
+        f"(SELECT coalesce(max(id), 1) FROM {qn(table)})))",
+        [new_sequence],
+    )
+    cursor.execute(f"DROP TRIGGER {qn(f'{table}_mirror')} ON {qn(table)}")
+    cursor.execute(f"DROP FUNCTION {qn(f'{table}_mirror')}()")
+
+    cursor.execute(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE i.indrelid = %s::regclass",
+        [table],
+    )
+    for (index,) in cursor.fetchall():
+        cursor.execute(f"ALTER INDEX {qn(index)} RENAME TO {qn(index + OLD_SUFFIX)}")
+    cursor.execute(
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'", [table]
+    )
+    for (constraint,) in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME CONSTRAINT {qn(constraint)} TO {qn(constraint + OLD_SUFFIX)}")
+    cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(old)}")
+
+    cursor.execute(f"ALTER TABLE {qn(shadow)} RENAME TO {qn(table)}")
+    cursor.execute(f"ALTER INDEX {qn(shadow + '_pkey')} RENAME TO {qn(table + '_pkey')}")
+    cursor.execute(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE i.indrelid = %s::regclass AND c.relname LIKE '%%\\_p'",
+        [table],
+    )
+    for (index,) in cursor.fetchall():
+        cursor.execute(f"ALTER INDEX {qn(index)} RENAME TO {qn(index[:-2])}")
+    cursor.execute(
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f' AND conname LIKE '%%\\_p'",
+        [table],
+    )
+    for (constraint,) in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME CONSTRAINT {qn(constraint)} TO {qn(constraint[:-2])}")
+
+
+def convert(spec, batch_size=10000, progress=None):
+    with connection.cursor() as cursor:
+        if is_partitioned(cursor, spec.table):
+            return False
+        if not table_exists(cursor, spec.shadow):
+            with transaction.atomic():
+                create_shadow(cursor, spec)
+                install_mirror(cursor, spec)
+    copy_rows(spec, batch_size, progress)
+    reconcile(spec, batch_size, progress)
+    with transaction.atomic(), connection.cursor() as cursor:
+        swap(cursor, spec)
+    return True
+
+
+def ensure_partitions(spec, since=None):
+    """
+    Pre-create the next ``months_ahead`` monthly partitions of a range-partitioned
+    table, and every month back to ``since`` when given.
+    """
+    if spec.strategy != 'range':
+        return
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor, spec.table):
+            return
+        now = month_start(timezone.now())
+        first = min(month_start(since), now) if since else now
+        create_range_partitions(cursor, spec, spec.table, first, add_months(now, spec.months_ahead))
+
+
+def partitions_end(spec):
+    """End of the last monthly partition of ``spec.table``; None while it is not range partitioned."""
+    months = [
+        datetime.datetime.strptime(name[len(spec.table) + 1:], '%Y%m').replace(tzinfo=datetime.timezone.utc)
+        for name, _, _ in list_partitions(spec)
+        if name[len(spec.table) + 1:].isdigit()
+    ]
+    return add_months(max(months), 1) if months else None
+
+
+def guard_partitions(sender, instance, **kwargs):
+    """
+    pre_save hook on range-partitioned models: once less than a month of
+    partitions is left (the scheduled ``partitions ensure`` has stopped
+    running), queue the ensure_partitions job before inserts start failing.
+    """
+    from . import jobs
+
+    for spec in get_specs():
+        if spec.strategy != 'range' or spec.label != sender._meta.label:
+            continue
+        checked_at, end = _coverage.get(spec.table, (None, None))
+        if checked_at is None or time.monotonic() - checked_at > COVERAGE_CHECK_INTERVAL:
+            end = partitions_end(spec)
+            _coverage[spec.table] = (time.monotonic(), end)
+        moment = getattr(instance, spec.key) or timezone.now()
+        if end is not None and moment >= add_months(end, -1):
+            jobs.ensure_partitions.delay()
+            # Re-read once the job has had time to run.
+            _coverage.pop(spec.table)
+
+
+def list_partitions(spec):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass ORDER BY c.relname",
+            [spec.table],
+        )
+        return cursor.fetchall()
+
+
+def detach_partitions(spec, older_than_months):
+    """
+    Detach monthly partitions that end before the cutoff. They stay in the
+    database as plain tables for archiving; dropping them is left to the operator.
+    """
+    if spec.strategy != 'range':
+        return []
+    cutoff = add_months(month_start(timezone.now()), -older_than_months)
+    detached = []
+    for name, _, _ in list_partitions(spec):
+        suffix = name[len(spec.table) + 1:]
+        if not suffix.isdigit():
+            continue
+        month = datetime.datetime.strptime(suffix, '%Y%m').replace(tzinfo=datetime.timezone.utc)
+        if add_months(month, 1) <= cutoff:
+            with connection.cursor() as cursor:
+                cursor.execute(f"ALTER TABLE {qn(spec.table)} DETACH PARTITION {qn(name)} CONCURRENTLY")
+            detached.append(name)
+    return detached
+
+
+def drop_old(spec):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {qn(spec.old)}")
+
+
+def ensure_all_partitions(**kwargs):
+    """post_migrate hook: keep future range partitions ahead after every migrate."""
+    if connection.vendor != 'postgresql':
+        return
+    for spec in get_specs():
+        ensure_partitions(spec)
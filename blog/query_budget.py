@@ -0,0 +1,107 @@
+"""
+Helpers for the per-endpoint query budget tests (blog/tests.py).
+
+``measure`` runs one request and counts its SQL queries and cache calls.
+``unpaginated`` lifts every paginator's page size so that a list returns
+its whole result set, which makes per-row queries show up as growth between
+two data scales.
+"""
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import BasePagination
+
+CACHE_METHODS = (
+    'get', 'set', 'add', 'delete', 'touch', 'incr', 'decr', 'has_key',
+    'get_many', 'set_many', 'delete_many', 'get_or_set',
+)
+
+
+class Budget:
+    def __init__(self, queries, cache_ops=None):
+        self.queries = queries
+        self.cache_ops = cache_ops
+
+    def __repr__(self):
+        return f'Budget(queries={self.queries}, cache_ops={self.cache_ops})'
+
+
+class CacheOpCounter:
+    """
+    Counts calls on every configured cache alias. Calls a cache makes on
+    another one (TwoTierCache going to Redis) count once, as the outer call.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.depth = 0
+        self.stack = ExitStack()
+
+    def wrap(self, method):
+        def counted(*args, **kwargs):
+            if not self.depth:
+                self.count += 1
+            self.depth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.depth -= 1
+        return counted
+
+    def __enter__(self):
+        for alias in caches:
+            backend = caches[alias]
+            for name in CACHE_METHODS:
+                if hasattr(backend, name):
+                    self.stack.enter_context(mock.patch.object(backend, name, self.wrap(getattr(backend, name))))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stack.close()
+
+
+class Measurement:
+    def __init__(self, status, queries, cache_ops, sql):
+        self.status = status
+        self.queries = queries
+        self.cache_ops = cache_ops
+        self.sql = sql
+
+
+def measure(client, url):
+    with CaptureQueriesContext(connection) as queries, CacheOpCounter() as cache_ops:
+        response = client.get(url)
+    return Measurement(
+        response.status_code, len(queries), cache_ops.count, [query['sql'] for query in queries.captured_queries]
+    )
+
+
+def pagination_classes():
+    found, stack = [], [BasePagination]
+    while stack:
+        cls = stack.pop()
+        stack.extend(cls.__subclasses__())
+        if 'page_size' in vars(cls):
+            found.append(cls)
+    return found
+
+
+@contextmanager
+def unpaginated(page_size=10000):
+    with ExitStack() as stack:
+        for cls in pagination_classes():
+            stack.enter_context(mock.patch.object(cls, 'page_size', page_size))
+        yield
+
+
+def format_report(rows):
+    """Plain-text table of ``(url name, auth, scale, measurement, budget)`` rows."""
+    lines = [f'{"endpoint":<32} {"auth":<10} {"scale":>6} {"status":>6} {"queries":>8} {"budget":>7} {"cache":>6} {"budget":>7}']
+    for name, auth, scale, measurement, budget in rows:
+        lines.append(
+            f'{name:<32} {auth:<10} {scale:>6} {measurement.status:>6} {measurement.queries:>8} '
+            f'{budget.queries:>7} {measurement.cache_ops:>6} {"-" if budget.cache_ops is None else budget.cache_ops:>7}'
+        )
+    return '\n'.join(lines)
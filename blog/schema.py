@@ -0,0 +1,91 @@
+import hashlib
+import json
+import threading
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from .compression import precompress
+
+DOCS_DIR = settings.BASE_DIR / 'docs'
+
+SCHEMA_FORMATS = {
+    'json': ('openapi.json', 'drf_spectacular.renderers.OpenApiJsonRenderer', 'application/vnd.oai.openapi+json'),
+    'yaml': ('openapi.yaml', 'drf_spectacular.renderers.OpenApiYamlRenderer', 'application/vnd.oai.openapi'),
+}
+
+_documents = None
+_lock = threading.Lock()
+
+
+def generate_schema():
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.validation import validate_schema
+
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    validate_schema(schema)
+    return schema
+
+
+def render_schema(schema):
+    return {
+        fmt: import_string(renderer)().render(schema, renderer_context={})
+        for fmt, (_, renderer, _) in SCHEMA_FORMATS.items()
+    }
+
+
+def read_schema_files():
+    bodies = {}
+    for fmt, (filename, _, _) in SCHEMA_FORMATS.items():
+        path = DOCS_DIR / filename
+        if not path.exists():
+            raise ImproperlyConfigured(f'{path} is missing; run "manage.py build_schema".')
+        bodies[fmt] = path.read_bytes()
+    return bodies
+
+
+def write_schema_files(bodies):
+    for fmt, (filename, _, _) in SCHEMA_FORMATS.items():
+        (DOCS_DIR / filename).write_bytes(bodies[fmt])
+
+
+def schema_drift():
+    """Return the formats whose checked-in file no longer matches the live views."""
+    live = render_schema(generate_schema())
+    stored = read_schema_files()
+    drifted = []
+    try:
+        json_matches = json.loads(stored['json']) == json.loads(live['json'])
+    except ValueError:
+        json_matches = False
+    if not json_matches:
+        drifted.append('json')
+    if stored['yaml'] != live['yaml']:
+        drifted.append('yaml')
+    return drifted
+
+
+def build_document(fmt, body):
+    etag = 'W/"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    return {
+        'status': 200,
+        'headers': [('Content-Type', SCHEMA_FORMATS[fmt][2]), ('ETag', etag)],
+        'bodies': precompress(body),
+    }
+
+
+def get_schema_documents():
+    """
+    Schema documents built once per process. "cached" SCHEMA_MODE generates
+    and validates the schema on first use; otherwise the files written by
+    build_schema are served.
+    """
+    global _documents
+    if _documents is None:
+        with _lock:
+            if _documents is None:
+                if settings.SCHEMA_MODE == 'cached':
+                    bodies = render_schema(generate_schema())
+                else:
+                    bodies = read_schema_files()
+                _documents = {fmt: build_document(fmt, body) for fmt, body in bodies.items()}
+    return _documents
@@ -0,0 +1,349 @@
+"""
+Deterministic, production-shaped sample data for reproducing performance
+problems locally (``manage.py seed_scale``).
+
+Rows are generated lazily and streamed into the database: ``COPY ... FROM
+STDIN`` on PostgreSQL, batched INSERTs elsewhere. Signals don't
+fire, so the rows and counters they maintain (Profile, AuthorStats,
+Category.posts_count) are computed while generating and loaded alongside.
+Each table draws from its own random stream, so a seed and scale always
+produce the same rows on an empty database. Memory stays flat with scale:
+tables that hang off posts replay the posts stream rather than keeping the
+posts, and per-user counters live in one array per column.
+"""
+import datetime
+import io
+import itertools
+import random
+from array import array
+from collections import Counter
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from accounts.models import AuthorStats, Follow, Profile, User
+from blog import partitioning
+from comments.models import Comment
+from posts.models import VOTE_FIELDS, Category, Post, PostLike
+from posts.content import DERIVED_FIELDS, derive
+
+# Per unit of scale.
+USERS = 10000
+# Means of the heavy-tailed per-row distributions.
+FOLLOWS_PER_USER = 20
+POSTS_PER_AUTHOR = 10
+LIKES_PER_POST = 8
+COMMENTS_PER_POST = 4
+VIEWS_PER_POST = 200
+# Pareto shape; lower is more skewed (a few hot posts and very popular users).
+TAIL = 1.4
+AUTHOR_SHARE = 0.2
+REPLY_SHARE = 0.4
+CATEGORIES = 30
+STATUS_WEIGHTS = {'published': 80, 'draft': 15, 'private': 5}
+DISLIKE_SHARE = 0.15
+APPROVED_SHARE = 0.95
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et dolore '
+    'magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo '
+    'consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla pariatur'
+).split()
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if value is True or value is False:
+        return 't' if value else 'f'
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    value = str(value)
+    if any(char in value for char in '\\\t\n\r'):
+        value = value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return value
+
+
+class CopyStream(io.RawIOBase):
+    """File-like view of ``rows`` in COPY text format, read by psycopg in chunks."""
+
+    def __init__(self, rows):
+        self.lines = ('\t'.join(map(copy_value, row)).encode() + b'\n' for row in rows)
+        self.buffer = b''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.buffer += line
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+def load(model, fields, rows, batch_size=5000):
+    """Stream ``rows`` (tuples in ``fields`` order) into ``model``'s table. Returns the row count."""
+    table = model._meta.db_table
+    model_fields = [model._meta.get_field(name) for name in fields]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in model_fields)
+    counted = Counter()
+
+    def counting(rows):
+        for row in rows:
+            counted['rows'] += 1
+            yield row
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.copy_expert(
+                f'COPY {connection.ops.quote_name(table)} ({columns}) FROM STDIN', CopyStream(counting(rows))
+            )
+        else:
+            # Plain INSERTs rather than bulk_create(): auto_now_add would overwrite created_at.
+            sql = f'INSERT INTO {connection.ops.quote_name(table)} ({columns}) VALUES ({", ".join(["%s"] * len(fields))})'
+            rows = counting(rows)
+            while batch := list(itertools.islice(rows, batch_size)):
+                cursor.executemany(sql, [
+                    [field.get_db_prep_save(value, connection) for field, value in zip(model_fields, row)]
+                    for row in batch
+                ])
+    return counted['rows']
+
+
+class Seeder:
+    def __init__(self, scale=1.0, seed=0, days=365, until=None, password='password'):
+        self.seed = seed
+        self.users_count = max(int(USERS * scale), 10)
+        self.until = until or datetime.datetime.now(datetime.timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.since = self.until - datetime.timedelta(days=days)
+        # One hash for every seeded user instead of one PBKDF2 run each.
+        self.password = make_password(password, salt=f'seed{seed}')
+
+    def rng(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def skewed(self, rng, mean, cap=None):
+        count = int(mean * (TAIL - 1) / TAIL * rng.paretovariate(TAIL))
+        return count if cap is None else min(count, cap)
+
+    def moment(self, rng):
+        return self.since + datetime.timedelta(seconds=rng.uniform(0, (self.until - self.since).total_seconds()))
+
+    def after(self, rng, start, mean_seconds):
+        return min(start + datetime.timedelta(seconds=rng.expovariate(1 / mean_seconds)), self.until)
+
+    def text(self, rng, low, high):
+        return ' '.join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize() + '.'
+
+    def count(self, user, field, amount=1):
+        self.stats[field][user - self.first_user] += amount
+
+    def next_id(self, model):
+        return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+    def run(self, progress=None):
+        progress = progress or (lambda label, count: None)
+        with transaction.atomic():
+            self.prepare()
+            steps = [
+                ('users', User, self.user_fields, self.user_rows),
+                ('profiles', Profile, ['user'], self.profile_rows),
+                ('categories', Category, self.category_fields, self.category_rows),
+                ('follows', Follow, self.follow_fields, self.follow_rows),
+                ('posts', Post, self.post_fields, self.post_rows),
+                ('post categories', Post.categories.through, self.post_category_fields, self.post_category_rows),
+                ('likes', PostLike, self.like_fields, self.like_rows),
+                ('comments', Comment, self.comment_fields, self.comment_rows),
+                ('author stats', AuthorStats, self.stats_fields, self.stats_rows),
+            ]
+            for label, model, fields, rows in steps:
+                progress(label, load(model, fields, rows()))
+            self.finish()
+
+    def prepare(self):
+        self.first_user = self.next_id(User)
+        self.first_category = self.next_id(Category)
+        self.first_post = self.next_id(Post)
+        self.first_comment = self.next_id(Comment)
+        self.user_ids = range(self.first_user, self.first_user + self.users_count)
+        self.category_ids = range(self.first_category, self.first_category + CATEGORIES)
+        # AuthorStats columns, indexed by user id - first_user.
+        self.stats = {field: array('q', bytes(8 * self.users_count)) for field in self.stats_fields[1:]}
+
+        rng = self.rng('popularity')
+        # Follow targets are drawn with Zipf-like weights over a shuffled popularity ranking.
+        ranked = list(self.user_ids)
+        rng.shuffle(ranked)
+        self.ranked_users = ranked
+        self.user_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(ranked) + 1)))
+        authors = ranked[:]
+        rng.shuffle(authors)
+        self.authors = sorted(authors[:max(int(len(authors) * AUTHOR_SHARE), 1)])
+        self.category_weights = list(itertools.accumulate(1 / rank for rank in range(1, CATEGORIES + 1)))
+
+        rng = self.rng('bodies')
+        self.bodies = []
+        for _ in range(16):
+            description = ''.join(f'<p>{self.text(rng, 40, 120)}</p>' for _ in range(rng.randint(2, 20)))
+            derived = derive(description)
+            self.bodies.append((description, *(derived[name] for name in DERIVED_FIELDS)))
+
+        spec = self.comment_partitions()
+        if spec is not None:
+            partitioning.ensure_partitions(spec, since=self.since)
+
+    def comment_partitions(self):
+        if connection.vendor != 'postgresql':
+            return None
+        for spec in partitioning.get_specs():
+            if spec.label == Comment._meta.label and spec.strategy == 'range':
+                return spec
+        return None
+
+    user_fields = [
+        'id', 'password', 'phone', 'username', 'full_name', 'email', 'age', 'gender', 'author',
+        'is_active', 'is_staff', 'is_superuser',
+    ]
+
+    def user_rows(self):
+        rng = self.rng('users')
+        authors = set(self.authors)
+        for pk in self.user_ids:
+            yield (
+                pk, self.password, f'09{pk:09d}', f'seed{pk}', f'Seed User {pk}', None, rng.randint(16, 70),
+                rng.choice(('male', 'female', None)), pk in authors, True, False, False,
+            )
+
+    def profile_rows(self):
+        return ((pk,) for pk in self.user_ids)
+
+    category_fields = ['id', 'title', 'slug', 'description', 'posts_count']
+
+    def category_rows(self):
+        for pk in self.category_ids:
+            yield pk, f'Category {pk}', f'seed-category-{pk}', '', 0
+
+    follow_fields = ['from_user', 'to_user', 'created_at']
+
+    def follow_rows(self):
+        rng = self.rng('follows')
+        for pk in self.user_ids:
+            picks = rng.choices(
+                self.ranked_users, cum_weights=self.user_weights,
+                k=self.skewed(rng, FOLLOWS_PER_USER, self.users_count - 1),
+            )
+            for target in sorted(set(picks) - {pk}):
+                self.count(target, 'followers')
+                yield pk, target, self.moment(rng)
+
+    post_fields = [
+        'id', 'title', 'slug', 'image', 'description', *DERIVED_FIELDS, 'status', 'user',
+        'created_at', 'updated_at', 'views_count', 'unique_viewers',
+    ]
+
+    def posts(self):
+        """
+        ``(row, pk, author, created_at, status)`` per post. Every call replays the
+        same ``posts`` stream, so the tables that hang off posts need not keep them.
+        """
+        rng = self.rng('posts')
+        pk = self.first_post
+        statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+        for author in self.authors:
+            for _ in range(self.skewed(rng, POSTS_PER_AUTHOR)):
+                description, *derived = rng.choice(self.bodies)
+                status = rng.choices(statuses, weights)[0]
+                created_at = self.moment(rng)
+                views = self.skewed(rng, VIEWS_PER_POST)
+                row = (
+                    pk, self.text(rng, 3, 10)[:100], f'seed-post-{pk}', f'posts/seed/{pk % 100}.jpg', description,
+                    *derived, status, author, created_at, created_at, views, 0,
+                )
+                yield row, pk, author, created_at, status
+                pk += 1
+
+    def post_rows(self):
+        views_index = self.post_fields.index('views_count')
+        for row, _, author, _, status in self.posts():
+            self.count(author, f'posts_{status}')
+            self.count(author, 'total_views', row[views_index])
+            yield row
+
+    post_category_fields = ['post', 'category']
+
+    def post_category_rows(self):
+        rng = self.rng('post-categories')
+        for _, pk, _, _, _ in self.posts():
+            picks = rng.choices(self.category_ids, cum_weights=self.category_weights, k=rng.randint(1, 3))
+            for category in sorted(set(picks)):
+                yield pk, category
+
+    like_fields = ['post', 'user', 'value', 'created_at']
+
+    def like_rows(self):
+        rng = self.rng('likes')
+        for _, pk, author, created_at, status in self.posts():
+            if status != 'published':
+                continue
+            for user in sorted(rng.sample(self.user_ids, self.skewed(rng, LIKES_PER_POST, self.users_count))):
+                value = 'dislike' if rng.random() < DISLIKE_SHARE else 'like'
+                self.count(author, VOTE_FIELDS[value])
+                yield pk, user, value, self.after(rng, created_at, 86400)
+
+    comment_fields = [
+        'id', 'user', 'post', 'content', 'created_at', 'is_approved', 'parent', 'level', 'moderated_at',
+        'reports_count',
+    ]
+
+    def comment_rows(self):
+        rng = self.rng('comments')
+        pk = self.first_comment
+        for _, post, author, post_created_at, status in self.posts():
+            if status != 'published':
+                continue
+            thread = []
+            for _ in range(self.skewed(rng, COMMENTS_PER_POST)):
+                parent = rng.choice(thread) if thread and rng.random() < REPLY_SHARE else None
+                if parent is not None and parent[1] >= Comment.MAX_LEVEL:
+                    parent = None
+                if parent is None:
+                    level, created_at = 1, self.after(rng, post_created_at, 86400)
+                else:
+                    level, created_at = parent[1] + 1, self.after(rng, parent[2], 7200)
+                approved = rng.random() < APPROVED_SHARE
+                if approved:
+                    self.count(author, 'approved_comments')
+                thread.append((pk, level, created_at))
+                yield (
+                    pk, rng.choice(self.user_ids), post, self.text(rng, 3, 40), created_at, approved,
+                    parent and parent[0], level, created_at if approved else None, 0,
+                )
+                pk += 1
+
+    stats_fields = [
+        'user', 'total_views', 'unique_viewers', 'likes', 'dislikes', 'approved_comments', 'followers',
+        'posts_draft', 'posts_published', 'posts_private',
+    ]
+
+    def stats_rows(self):
+        columns = [self.stats[field] for field in self.stats_fields[1:]]
+        for offset, pk in enumerate(self.user_ids):
+            yield (pk, *(column[offset] for column in columns))
+
+    def finish(self):
+        Category.refresh_post_stats(list(self.category_ids))
+        models = [User, Profile, Category, Post, Comment, Follow, PostLike, Post.categories.through]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
@@ -39,15 +39,20 @@ INSTALLED_APPS = [
     'accounts.apps.AccountsConfig',
     'posts.apps.PostsConfig',
     'comments.apps.CommentsConfig',
+    'analytics.apps.AnalyticsConfig',
+    'notifications.apps.NotificationsConfig',
+    'jobs.apps.JobsConfig',
+    'search.apps.SearchConfig',
+    'blog.apps.BlogConfig',
     'rest_framework',
     'rest_framework_simplejwt',
     'ckeditor',
-    'django_filters',
     'drf_spectacular',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -137,11 +142,10 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'blog.pagination.EstimatedCountPagination',
     'PAGE_SIZE': 10,
-    'DEFAULT_FILTER_BACKENDS': (
-        'django_filters.rest_framework.DjangoFilterBackend',
-    ),
+    # django-filter is opt-in per view; no view declares a filterset yet.
+    'DEFAULT_FILTER_BACKENDS': (),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.UserRateThrottle",
@@ -155,10 +159,27 @@ REST_FRAMEWORK = {
         "comment-create": "20/hour",
         "like": "60/hour",
         "report": "30/hour",
+        "suggest": "120/min",
     },
+    # Reverse proxies in front of the app. Throttling and unique viewers use the
+    # X-Forwarded-For address the nearest trusted one added (None: the whole header).
+    "NUM_PROXIES": int(os.getenv("DJANGO_NUM_PROXIES")) if os.getenv("DJANGO_NUM_PROXIES") else None,
 
 }
 
+# Opt-in fast path: orjson renderer/parser and compiled list serializers.
+FAST_RENDERING = os.getenv("DJANGO_FAST_RENDERING", "0") in ("1", "true", "True", "YES", "yes")
+if FAST_RENDERING:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
+        "blog.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    )
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"] = (
+        "blog.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    )
+
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "Minimal Blog API",
@@ -166,10 +187,48 @@ SPECTACULAR_SETTINGS = {
     "VERSION": "0.1.0",
 }
 
+# "live": introspect views per request (cached in Redis),
+# "cached": generate + validate once per process on first request,
+# "static": serve docs/openapi.* written by `manage.py build_schema`.
+SCHEMA_MODE = os.getenv("DJANGO_SCHEMA_MODE", "live")
+
+# PostgreSQL partitioning applied by `manage.py partitions convert`; range
+# partitions are monthly and kept `months_ahead` ahead by `partitions ensure`
+# (also run after every migrate).
+PARTITIONING = {
+    "posts.PostLike": {"strategy": "hash", "key": "post_id", "partitions": 16},
+    "comments.Comment": {"strategy": "range", "key": "created_at", "months_ahead": 3},
+}
+
+# Background jobs: "redis" in production, "db" for tests and small setups.
+JOBS_BACKEND = os.getenv("DJANGO_JOBS_BACKEND", "redis")
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 CACHE_TTL = 3600
+# Expired cached responses are still served for this long while one request rebuilds them.
+CACHE_STALE_TTL = 300
+# The rebuilding request holds a lock this long at most; others wait up to CACHE_LOCK_WAIT for its result,
+# then build the response themselves.
+CACHE_LOCK_TIMEOUT = 30
+CACHE_LOCK_WAIT = 1
+# Autocomplete answers for a prefix are reused for this long.
+SEARCH_SUGGEST_TTL = 60
+# Items per RSS/Atom feed and posts per sitemap page (the protocol allows 50,000;
+# pages are rendered in memory, about 1 MB per 10,000 posts).
+FEED_SIZE = 50
+SITEMAP_PAGE_SIZE = 10_000
+# Resized variants of uploaded images in post bodies, e.g. from an imgproxy or
+# CDN resizer: "https://img.example.com/{path}?w={width}&fm=webp". Empty keeps
+# the original URLs. Re-run refresh_post_content after changing these.
+CONTENT_IMAGE_URL = os.getenv("DJANGO_CONTENT_IMAGE_URL", "")
+CONTENT_IMAGE_WIDTHS = (480, 960, 1440)
+# The report that brings a comment to this count hides it until a moderator reviews it.
+COMMENT_REPORT_HIDE_THRESHOLD = 5
+# Paginated counts at or above this planner estimate are reported as estimates.
+ESTIMATED_COUNT_THRESHOLD = 100_000
+COMPRESSION_MIN_SIZE = 512
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
@@ -178,5 +237,17 @@ CACHES = {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         },
         "KEY_PREFIX": "mbapi",
-    }
+    },
+    # In-process LRU in front of "default" for cached responses; emptied in every
+    # worker within CHECK_INTERVAL seconds of TwoTierCache.invalidate().
+    "responses": {
+        "BACKEND": "blog.cache_backends.TwoTierCache",
+        "LOCATION": "responses",
+        "OPTIONS": {
+            "L2": "default",
+            "MAX_ENTRIES": 500,
+            "L1_TTL": 30,
+            "CHECK_INTERVAL": 1,
+        },
+    },
 }
\ No newline at end of file
@@ -0,0 +1,211 @@
+import datetime
+import os
+from django.db.models import Count, F, Max, Q
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from blog.query_budget import Budget, format_report, measure, unpaginated
+from blog.seeding import Seeder
+from comments.models import Comment
+from posts.jobs import bust_cache
+from posts.models import Category, Post
+
+# Maximum SQL queries (and optionally cache calls) for one cold GET, per URL
+# name and auth state. "user" is the author with the most posts, "staff" a
+# superuser. Page-number lists allow one query more than SQLite needs for the
+# EXPLAIN behind estimated counts on PostgreSQL. Tighten these as endpoints
+# improve; set QUERY_BUDGET_REPORT to a file path to get the measured counts.
+BUDGETS = {
+    ('post-list-create', 'anonymous'): Budget(queries=4, cache_ops=9),
+    # Builds the shared page, then fills in my_vote: authentication plus one vote lookup.
+    ('post-list-create', 'user'): Budget(queries=6, cache_ops=9),
+    ('post-detail', 'anonymous'): Budget(queries=2),
+    ('post-detail', 'user'): Budget(queries=3),
+    ('author-posts', 'anonymous'): Budget(queries=5),
+    ('my-posts', 'user'): Budget(queries=5),
+    ('category-list', 'anonymous'): Budget(queries=1, cache_ops=9),
+    ('category-posts', 'anonymous'): Budget(queries=5, cache_ops=9),
+    # One prefetch per reply level, bounded by Comment.MAX_LEVEL.
+    ('post-comments', 'anonymous'): Budget(queries=9),
+    ('post-comment-threads', 'anonymous'): Budget(queries=4),
+    ('comment-replies', 'anonymous'): Budget(queries=2),
+    ('comment-moderation-queue', 'staff'): Budget(queries=2),
+    ('public-profile', 'anonymous'): Budget(queries=1),
+    ('user-followers', 'anonymous'): Budget(queries=2),
+    ('user-following', 'anonymous'): Budget(queries=2),
+    ('my-profile', 'user'): Budget(queries=3),
+    ('my-stats', 'user'): Budget(queries=2),
+    ('my-notifications', 'user'): Budget(queries=2),
+    ('my-notifications-unread', 'user'): Budget(queries=2),
+    ('my-follow-suggestions', 'user'): Budget(queries=2),
+    ('my-series', 'user'): Budget(queries=2),
+    ('post-series', 'user'): Budget(queries=3),
+    ('category-series', 'anonymous'): Budget(queries=2),
+    ('search-suggest', 'anonymous'): Budget(queries=3, cache_ops=7),
+    ('posts-rss', 'anonymous'): Budget(queries=3),
+    ('category-atom', 'anonymous'): Budget(queries=4),
+    ('author-rss', 'anonymous'): Budget(queries=4),
+    ('sitemap-index', 'anonymous'): Budget(queries=2),
+    ('sitemap-posts', 'anonymous'): Budget(queries=2),
+}
+
+# URL kwargs, as names of the targets picked from the seeded data.
+URL_KWARGS = {
+    'post-detail': {'slug': 'post'},
+    'author-posts': {'username': 'author'},
+    'category-posts': {'slug': 'category'},
+    'post-comments': {'post_slug': 'post'},
+    'post-comment-threads': {'post_slug': 'post'},
+    'comment-replies': {'comment_id': 'comment'},
+    'public-profile': {'username': 'popular'},
+    'user-followers': {'username': 'popular'},
+    'user-following': {'username': 'author'},
+    'post-series': {'slug': 'own_post'},
+    'category-series': {'slug': 'category'},
+    'category-atom': {'slug': 'category'},
+    'author-rss': {'username': 'author'},
+    'sitemap-posts': {'page': 'sitemap_page'},
+}
+
+QUERY_STRINGS = {
+    'search-suggest': 'q=se&limit=10',
+}
+
+# Seeded on top of each other; the second run multiplies every result set.
+SCALES = (0.01, 0.04)
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser(
+            phone='09999999999', username='budget-staff', age=30, password='x', full_name='Staff',
+        )
+        cls.results = {}
+        for scale in SCALES:
+            Seeder(scale, seed=1, until=datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)).run()
+            targets = cls.pick_targets()
+            clients = {
+                'anonymous': APIClient(),
+                'user': cls.client_for(targets['author_user']),
+                'staff': cls.client_for(cls.staff),
+            }
+            with unpaginated():
+                for (name, auth), budget in BUDGETS.items():
+                    kwargs = {key: targets[target] for key, target in URL_KWARGS.get(name, {}).items()}
+                    # Measure cold: no cached responses, no throttle history.
+                    bust_cache()
+                    url = reverse(name, kwargs=kwargs)
+                    if name in QUERY_STRINGS:
+                        url += '?' + QUERY_STRINGS[name]
+                    cls.results[name, auth, scale] = measure(clients[auth], url)
+
+        path = os.environ.get('QUERY_BUDGET_REPORT')
+        if path:
+            rows = [(name, auth, scale, cls.results[name, auth, scale], budget)
+                    for (name, auth), budget in BUDGETS.items() for scale in SCALES]
+            with open(path, 'w') as report:
+                report.write(format_report(rows) + '\n')
+
+    @classmethod
+    def pick_targets(cls):
+        # The biggest (and deepest) result set of each kind, so a per-row query is hard to miss.
+        post = (
+            Post.objects.filter(status='published')
+            .annotate(
+                depth=Max('comments__level', filter=Q(comments__is_approved=True)),
+                total=Count('comments', filter=Q(comments__is_approved=True)),
+            )
+            .order_by(F('depth').desc(nulls_last=True), '-total', 'pk').first()
+        )
+        author = User.objects.annotate(total=Count('user_posts')).order_by('-total', 'pk').first()
+        comment = (
+            Comment.objects.filter(is_approved=True, parent__isnull=True)
+            .annotate(total=Count('replies')).order_by('-total', 'pk').first()
+        )
+        return {
+            'post': post.slug,
+            'author': author.username,
+            'author_user': author,
+            'own_post': Post.objects.filter(user=author).order_by('pk').first().slug,
+            'popular': User.objects.annotate(total=Count('followers')).order_by('-total', 'pk').first().username,
+            'category': Category.objects.order_by('-posts_count', 'pk').first().slug,
+            'comment': comment.pk,
+            'sitemap_page': 1,
+        }
+
+    @classmethod
+    def client_for(cls, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def test_endpoints_respond(self):
+        for (name, auth, scale), measurement in self.results.items():
+            with self.subTest(endpoint=name, auth=auth, scale=scale):
+                self.assertEqual(measurement.status, 200)
+
+    def test_within_budget(self):
+        for (name, auth, scale), measurement in self.results.items():
+            budget = BUDGETS[name, auth]
+            with self.subTest(endpoint=name, auth=auth, scale=scale):
+                self.assertLessEqual(measurement.queries, budget.queries, '\n'.join(measurement.sql))
+                if budget.cache_ops is not None:
+                    self.assertLessEqual(measurement.cache_ops, budget.cache_ops)
+
+    def test_queries_do_not_grow_with_result_size(self):
+        small, large = SCALES
+        for name, auth in BUDGETS:
+            with self.subTest(endpoint=name, auth=auth):
+                self.assertLessEqual(
+                    self.results[name, auth, large].queries, self.results[name, auth, small].queries,
+                    '\n'.join(self.results[name, auth, large].sql),
+                )
+
+
+def rendering(fast):
+    """Settings for the compiled/orjson path, or for plain DRF serializers and JSONRenderer."""
+    renderer = 'blog.renderers.FastJSONRenderer' if fast else 'rest_framework.renderers.JSONRenderer'
+    return override_settings(
+        FAST_RENDERING=fast,
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_RENDERER_CLASSES': (renderer, 'rest_framework.renderers.BrowsableAPIRenderer'),
+        },
+    )
+
+
+class FastRenderingOutputTests(TestCase):
+    """FAST_RENDERING must not change a byte of the lists it speeds up."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Seeder(0.01, seed=2, until=datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)).run()
+        cls.post = (
+            Post.objects.filter(status='published')
+            .annotate(total=Count('comments', filter=Q(comments__is_approved=True)))
+            .order_by('-total', 'pk').first()
+        )
+
+    def render(self, url, fast):
+        bust_cache()
+        with rendering(fast):
+            response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_same_bytes_with_and_without_fast_rendering(self):
+        urls = [
+            reverse('post-list-create'),
+            reverse('post-list-create') + '?page=2',
+            reverse('post-list-create') + '?fields=title,excerpt,image',
+            reverse('category-posts', kwargs={'slug': self.post.categories.first().slug}),
+            reverse('post-comments', kwargs={'post_slug': self.post.slug}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.render(url, fast=True), self.render(url, fast=False))
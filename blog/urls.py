@@ -18,7 +18,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from .cache import cache_response
+from .lazy import lazy_view
+from posts.feeds import cached, published_posts, sitemap_index, sitemap_page, sitemap_posts
+
+if settings.SCHEMA_MODE == 'live':
+    schema_view = cache_response(key_prefix='schema', public=True)(lazy_view('drf_spectacular.views.SpectacularAPIView'))
+else:
+    schema_view = lazy_view('blog.views.CachedSchemaView')
 
 
 urlpatterns = [
@@ -26,10 +33,15 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
     path('comments/', include('comments.urls')),
     path('posts/', include('posts.urls')),
+    path('analytics/', include('analytics.urls')),
+    path('search/', include('search.urls')),
+    path('sitemap.xml', cached(sitemap_index, published_posts), name='sitemap-index'),
+    path('sitemap-posts-<int:page>.xml', cached(sitemap_page, sitemap_posts), name='sitemap-posts'),
 
     # drf-spectacular
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('api/schema/', schema_view, name='schema'),
+    path('api/schema/openapi.<str:fmt>', lazy_view('blog.views.openapi_document'), name='openapi-document'),
+    path('api/schema/swagger-ui/', lazy_view('drf_spectacular.views.SpectacularSwaggerView', url_name='schema'), name='swagger-ui'),
+    path('api/schema/redoc/', lazy_view('drf_spectacular.views.SpectacularRedocView', url_name='schema'), name='redoc'),
 ]
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
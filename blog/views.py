@@ -0,0 +1,24 @@
+from django.http import Http404
+from django.views.decorators.http import require_safe
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+from .cache import entry_response
+from .schema import SCHEMA_FORMATS, get_schema_documents
+
+
+# SpectacularAPIView serving the prebuilt schema instead of introspecting per request.
+class CachedSchemaView(SpectacularAPIView):
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        renderer, _ = self.perform_content_negotiation(request, force=True)
+        response = entry_response(request, get_schema_documents()[renderer.format])
+        if response.status_code == 200:
+            response['Content-Type'] = renderer.media_type
+        return response
+
+
+@require_safe
+def openapi_document(request, fmt):
+    if fmt not in SCHEMA_FORMATS:
+        raise Http404
+    return entry_response(request, get_schema_documents()[fmt])
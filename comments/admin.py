@@ -1,3 +1,63 @@
+from collections import Counter, defaultdict
 from django.contrib import admin
+from django.db.models import F
+from django.db.models.functions import Greatest
+from blog.admin_filters import AutocompleteFilter
+from blog.pagination import EstimatedCountAdminMixin
+from .models import Comment, CommentReport
 
-# Register your models here.
+
+@admin.register(Comment)
+class CommentAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
+    list_display = ('__str__', 'post', 'level', 'is_approved', 'reports_count', 'moderated_at', 'created_at')
+    list_filter = ('is_approved', 'created_at', ('user', AutocompleteFilter), ('post', AutocompleteFilter))
+    list_select_related = ('user', 'post')
+    autocomplete_fields = ('user', 'post')
+    raw_id_fields = ('parent',)
+    search_fields = ('^user__username', '^post__title')
+    ordering = ('-created_at',)
+    actions = ('approve_comments', 'reject_comments')
+
+    def delete_model(self, request, obj):
+        Comment.delete_comments(Comment.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        Comment.delete_comments(queryset)
+
+    @admin.action(description='Approve selected comments', permissions=('change',))
+    def approve_comments(self, request, queryset):
+        self.message_user(request, f'{Comment.moderate(queryset, approved=True)} comments approved.')
+
+    @admin.action(description='Reject selected comments', permissions=('change',))
+    def reject_comments(self, request, queryset):
+        self.message_user(request, f'{Comment.moderate(queryset, approved=False)} comments rejected.')
+
+
+@admin.register(CommentReport)
+class CommentReportAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
+    list_display = ('comment', 'reporter', 'reason', 'created_at')
+    list_filter = ('created_at', ('reporter', AutocompleteFilter))
+    list_select_related = ('comment__user', 'reporter')
+    autocomplete_fields = ('reporter',)
+    raw_id_fields = ('comment',)
+    search_fields = ('^reporter__username',)
+    ordering = ('-created_at',)
+    actions = ('reject_comments', 'dismiss_reports')
+
+    @admin.action(description='Reject the reported comments', permissions=('change',))
+    def reject_comments(self, request, queryset):
+        rejected = Comment.moderate(Comment.objects.filter(pk__in=queryset.values('comment_id')), approved=False)
+        self.message_user(request, f'{rejected} comments rejected.')
+
+    @admin.action(description='Dismiss selected reports', permissions=('delete',))
+    def dismiss_reports(self, request, queryset):
+        reports = CommentReport.objects.filter(pk__in=queryset.values('pk'))
+        per_comment = Counter(reports.values_list('comment_id', flat=True))
+        deleted, _ = reports.delete()
+        # One UPDATE per distinct number of dismissed reports.
+        by_count = defaultdict(list)
+        for comment_id, count in per_comment.items():
+            by_count[count].append(comment_id)
+        for count, comment_ids in by_count.items():
+            Comment.objects.filter(pk__in=comment_ids).update(reports_count=Greatest(F('reports_count') - count, 0))
+        self.message_user(request, f'{deleted} reports dismissed.')
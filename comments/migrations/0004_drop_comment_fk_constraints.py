@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_commentreport'),
+    ]
+
+    # State only: the database constraints stay until "manage.py partitions
+    # convert" partitions comments_comment and drops them (see
+    # blog.partitioning.drop_incoming_foreign_keys), so deployments that never
+    # partition keep referential integrity.
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='comment',
+                name='parent',
+                field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='comments.comment'),
+            ),
+            migrations.AlterField(
+                model_name='commentreport',
+                name='comment',
+                field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='comments.comment'),
+            ),
+        ]),
+    ]
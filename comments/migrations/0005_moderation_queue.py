@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:55
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Func, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_reports_count(apps, schema_editor):
+    Comment = apps.get_model('comments', 'Comment')
+    CommentReport = apps.get_model('comments', 'CommentReport')
+    reports = CommentReport.objects.filter(comment=OuterRef('pk')).order_by()
+    Comment.objects.filter(reports__isnull=False).update(
+        reports_count=Coalesce(Subquery(reports.annotate(total=Func('pk', function='COUNT')).values('total')[:1]), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0004_drop_comment_fk_constraints'),
+        ('posts', '0006_admin_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='moderated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reports_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('is_approved', False), ('moderated_at__isnull', True)), fields=['created_at', 'id'], name='comment_moderation_queue'),
+        ),
+        migrations.RunPython(backfill_reports_count, migrations.RunPython.noop),
+    ]
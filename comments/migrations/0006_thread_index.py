@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0005_moderation_queue'),
+        ('posts', '0007_unique_viewers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['post', 'parent', 'created_at', 'id'], name='comment_thread_idx'),
+        ),
+    ]
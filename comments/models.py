@@ -1,17 +1,36 @@
+from collections import Counter
+from functools import reduce
+from operator import or_
+from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
-from accounts.models import User
+from django.db import models, transaction
+from django.db.models import Count, F, Func, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from accounts.models import AuthorStats, User
+from posts.jobs import bust_cache
 from posts.models import Post
 
 
 class Comment(models.Model):
+    MAX_LEVEL = 5
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     is_approved = models.BooleanField(default=False)
-    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
-    level = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1), MaxValueValidator(5)])
+    # Comments may be range-partitioned (settings.PARTITIONING), which rules out
+    # database-level foreign keys to comment.id; "partitions convert" drops them
+    # when it partitions the table. Django cascades deletes either way.
+    parent = models.ForeignKey(
+        'self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies', db_constraint=False
+    )
+    level = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1), MaxValueValidator(MAX_LEVEL)])
+    # Unapproved comments wait in the moderation queue until moderated_at is set;
+    # rejected ones keep is_approved=False with a moderated_at.
+    moderated_at = models.DateTimeField(null=True, blank=True)
+    reports_count = models.PositiveIntegerField(default=0, editable=False)
 
     def save(self, *args, **kwargs):
         if self.parent:
@@ -20,15 +39,109 @@ class Comment(models.Model):
             self.level = 1
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_approved = instance.__dict__.get('is_approved')
+        return instance
+
+    @classmethod
+    def moderate(cls, queryset, approved):
+        """
+        Approve or reject ``queryset`` with one UPDATE, adjusting AuthorStats
+        the way the per-comment signals would. Returns the number changed.
+        """
+        changes = Q(is_approved=False) if approved else Q(is_approved=True) | Q(moderated_at__isnull=True)
+        with transaction.atomic():
+            rows = list(
+                cls.objects.filter(changes, pk__in=queryset.values('pk'))
+                .select_for_update(of=('self',))
+                .values_list('pk', 'post__user_id', 'is_approved')
+            )
+            cls.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+                is_approved=approved, moderated_at=timezone.now()
+            )
+            flipped = Counter(user_id for _, user_id, was_approved in rows if was_approved != approved)
+            for user_id, count in flipped.items():
+                AuthorStats.bump(user_id, approved_comments=count if approved else -count)
+            if flipped:
+                # Cached post lists carry approved comment counts.
+                bust_cache.delay()
+        return len(rows)
+
+    @classmethod
+    def delete_comments(cls, queryset):
+        """
+        Delete ``queryset`` and the replies under it, adjusting AuthorStats once
+        per post author. Returns the number of comments deleted.
+        """
+        with transaction.atomic():
+            pks = list(cls.objects.filter(pk__in=queryset.values('pk')).select_for_update().values_list('pk', flat=True))
+            approved = list(
+                cls.objects.filter(in_threads('pk__in', pks), is_approved=True)
+                .values_list('post__user_id').annotate(total=Count('pk')).order_by()
+            )
+            _, deleted = cls.objects.filter(pk__in=pks).delete()
+            for user_id, total in approved:
+                AuthorStats.bump(user_id, rebuild=False, approved_comments=-total)
+            if approved:
+                bust_cache.delay()
+        return deleted.get(cls._meta.label, 0)
+
+    def record_report(self):
+        """
+        Count a new report. The report that reaches COMMENT_REPORT_HIDE_THRESHOLD
+        unapproves the comment and sends it back to the moderation queue.
+        """
+        comments = Comment.objects.filter(pk=self.pk, created_at=self.created_at)
+        with transaction.atomic():
+            comments.update(reports_count=F('reports_count') + 1)
+            hidden = comments.filter(
+                reports_count=settings.COMMENT_REPORT_HIDE_THRESHOLD, is_approved=True
+            ).update(is_approved=False, moderated_at=None)
+            if hidden:
+                AuthorStats.bump(self.post.user_id, approved_comments=-1)
+                bust_cache.delay()
+        return bool(hidden)
+
     def __str__(self):
         return f'{self.user.username} - {self.content[:30]}'
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['created_at', 'id'], name='comment_moderation_queue',
+                condition=Q(is_approved=False, moderated_at__isnull=True),
+            ),
+            # Thread pages: top-level comments (parent IS NULL) or one comment's
+            # replies, in created_at order.
+            models.Index(
+                fields=['post', 'parent', 'created_at', 'id'], name='comment_thread_idx',
+                condition=Q(is_approved=True),
+            ),
+        ]
+
+
+def in_threads(lookup, value):
+    """Comments matching ``lookup=value``, and every reply under them (what deleting them cascades to)."""
+    return reduce(or_, (Q(**{'parent__' * depth + lookup: value}) for depth in range(Comment.MAX_LEVEL)))
+
+
+def reply_counts():
+    """
+    ``reply_count`` annotation: approved direct replies per comment, counted
+    on comment_thread_idx. Replies share the parent's post and are never
+    older than it, which keeps the lookup partition-prunable.
+    """
+    replies = Comment.objects.filter(
+        post=OuterRef('post'), parent=OuterRef('pk'), is_approved=True, created_at__gte=OuterRef('created_at')
+    ).order_by()
+    return Coalesce(Subquery(replies.annotate(total=Func('pk', function='COUNT')).values('total')[:1]), 0)
 
 
 class CommentReport(models.Model):
-    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name="reports")
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name="reports", db_constraint=False)
     reporter = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comment_reports")
     reason = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
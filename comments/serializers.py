@@ -1,10 +1,12 @@
+from collections import defaultdict
 from rest_framework import serializers
 from .models import Comment, CommentReport
+from blog.compiled import CompiledSerializer
 
 
 class RecursiveField(serializers.Serializer):
     def to_representation(self, value):
-        serializer = self.parent.__class__(value, context=self.context)
+        serializer = self.parent.parent.__class__(value, context=self.context)
         return serializer.data
 
 
@@ -25,12 +27,77 @@ class CommentSerializer(serializers.ModelSerializer):
             'parent',
             'comment_author',
         ]
-        read_only_fields = ['id', 'created_at', 'replies', 'level', 'is_approved']
+        read_only_fields = ['id', 'user', 'post', 'created_at', 'replies', 'level', 'is_approved']
 
     def get_comment_author(self, obj):
         return obj.user.full_name or obj.user.username
 
+
+class CompiledCommentSerializer(CompiledSerializer):
+    serializer_class = CommentSerializer
+
+    def compile_comment_author(self, field):
+        self.columns += ['user__full_name', 'user__username']
+        return lambda row: row['user__full_name'] or row['user__username']
+
+    def compile_replies(self, field):
+        return lambda row: [self.represent(child) for child in self.children[row['id']]]
+
+    def prepare(self, rows):
+        super().prepare(rows)
+        self.children = defaultdict(list)
+        seen = {row['id'] for row in rows}
+        frontier = list(rows)
+        while frontier:
+            # Replies share their parent's post and are never older than it,
+            # which keeps the lookup partition-prunable.
+            replies = self.values(Comment.objects.filter(
+                parent_id__in=[row['id'] for row in frontier],
+                post_id__in={row['post'] for row in frontier},
+                created_at__gte=min(row['created_at'] for row in frontier),
+            ))
+            frontier = []
+            for reply in replies:
+                self.children[reply['parent']].append(reply)
+                if reply['id'] not in seen:
+                    seen.add(reply['id'])
+                    frontier.append(reply)
+
+
+class ReplySerializer(serializers.ModelSerializer):
+    comment_author = serializers.SerializerMethodField()
+    reply_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'user', 'post', 'parent', 'level', 'content', 'created_at', 'comment_author', 'reply_count']
+
+    def get_comment_author(self, obj):
+        return obj.user.full_name or obj.user.username
+
+
+class ThreadSerializer(ReplySerializer):
+    replies = ReplySerializer(many=True, read_only=True, source='first_replies')
+
+    class Meta(ReplySerializer.Meta):
+        fields = ReplySerializer.Meta.fields + ['replies']
+
+
 class CommentReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = CommentReport
-        fields = ["reason"]
\ No newline at end of file
+        fields = ["reason"]
+
+
+class ModerationCommentSerializer(serializers.ModelSerializer):
+    user = serializers.CharField(source='user.username', read_only=True)
+    post = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'user', 'post', 'parent', 'content', 'created_at', 'reports_count']
+
+
+class BulkModerationSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=10000)
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
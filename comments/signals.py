@@ -0,0 +1,35 @@
+from django.db.models import Count
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+from accounts.models import AuthorStats, User
+from posts.models import Post
+from posts.signals import deleted_with
+from .models import Comment, in_threads
+
+@receiver(post_save, sender=Comment)
+def update_author_stats_on_comment_save(sender, instance, created, **kwargs):
+    previous = False if created else getattr(instance, '_loaded_is_approved', None)
+    if previous is None:
+        if instance.post.user_id:
+            AuthorStats.rebuild(instance.post.user_id)
+    elif previous != instance.is_approved:
+        AuthorStats.bump(instance.post.user_id, approved_comments=1 if instance.is_approved else -1)
+    instance._loaded_is_approved = instance.is_approved
+
+# Per post and per user rather than per comment; see posts.signals.
+@receiver(pre_delete, sender=Post)
+def update_author_stats_on_post_delete(sender, instance, origin=None, **kwargs):
+    if not instance.user_id or deleted_with(origin, User):
+        return
+    approved = Comment.objects.filter(post=instance, is_approved=True, created_at__gte=instance.created_at).count()
+    AuthorStats.bump(instance.user_id, rebuild=False, approved_comments=-approved)
+
+@receiver(pre_delete, sender=User)
+def update_author_stats_on_commenter_delete(sender, instance, **kwargs):
+    # Replies to the user's comments go with them.
+    approved = (
+        Comment.objects.filter(in_threads('user', instance), is_approved=True).exclude(post__user=instance)
+        .values_list('post__user_id').annotate(total=Count('pk')).order_by()
+    )
+    for author_id, total in approved:
+        AuthorStats.bump(author_id, rebuild=False, approved_comments=-total)
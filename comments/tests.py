@@ -1,3 +1,146 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from accounts.models import AuthorStats, User
+from posts.jobs import bust_cache
+from posts.models import Post
+from .models import Comment
+
+
+def make_user(number, **extra):
+    return User.objects.create_user(
+        phone=f'0910000{number:04d}', username=f'user{number}', age=30, password='x', **extra
+    )
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+class ModerationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user(1)
+        cls.commenter = make_user(2)
+        cls.staff = make_user(3, is_staff=True)
+        cls.post = Post.objects.create(
+            title='Post', description='<p>Body</p>', status='published', user=cls.author, image='posts/x.jpg',
+        )
+
+    def setUp(self):
+        # Clears throttle history along with cached responses.
+        bust_cache()
+
+    def comment(self, **fields):
+        return Comment.objects.create(post=self.post, user=self.commenter, content='Hi', **fields)
+
+    def approved_comments(self):
+        return AuthorStats.objects.get(user=self.author).approved_comments
+
+    def queued(self):
+        response = client_for(self.staff).get(reverse('comment-moderation-queue'))
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()['results']]
+
+
+@override_settings(COMMENT_REPORT_HIDE_THRESHOLD=3)
+class ReportThresholdTests(ModerationTestCase):
+    def report(self, comment, number):
+        return client_for(make_user(100 + number)).post(
+            reverse('comment-report', kwargs={'comment_id': comment.pk}), {'reason': 'spam'}, format='json',
+        )
+
+    def test_threshold_report_hides_once(self):
+        comment = self.comment(is_approved=True)
+        self.assertEqual(self.approved_comments(), 1)
+
+        for number in range(2):
+            self.assertEqual(self.report(comment, number).status_code, 201)
+        comment.refresh_from_db()
+        self.assertTrue(comment.is_approved)
+
+        self.report(comment, 2)
+        comment.refresh_from_db()
+        self.assertFalse(comment.is_approved)
+        self.assertIsNone(comment.moderated_at)
+        self.assertEqual(self.approved_comments(), 0)
+        self.assertEqual(self.queued(), [comment.pk])
+
+        self.report(comment, 3)
+        comment.refresh_from_db()
+        self.assertEqual(comment.reports_count, 4)
+        self.assertEqual(self.approved_comments(), 0)
+
+    def test_reapproved_comment_stays_visible(self):
+        comment = self.comment(is_approved=True)
+        for number in range(3):
+            self.report(comment, number)
+        Comment.moderate(Comment.objects.filter(pk=comment.pk), approved=True)
+        self.assertEqual(self.approved_comments(), 1)
+
+        self.report(comment, 3)
+        comment.refresh_from_db()
+        self.assertTrue(comment.is_approved)
+        self.assertEqual(self.approved_comments(), 1)
+
+    def test_repeated_report_is_not_counted(self):
+        comment = self.comment(is_approved=True)
+        reporter = make_user(200)
+        url = reverse('comment-report', kwargs={'comment_id': comment.pk})
+        self.assertEqual(client_for(reporter).post(url, {'reason': 'spam'}, format='json').status_code, 201)
+        self.assertEqual(client_for(reporter).post(url, {'reason': 'rude'}, format='json').status_code, 200)
+        comment.refresh_from_db()
+        self.assertEqual(comment.reports_count, 1)
+
+
+class BulkModerationTests(ModerationTestCase):
+    def moderate(self, user, ids, action):
+        return client_for(user).post(
+            reverse('comment-moderation-bulk'), {'ids': ids, 'action': action}, format='json',
+        )
+
+    def test_approve_and_reject_adjust_author_stats(self):
+        pending = [self.comment().pk for _ in range(3)]
+        approved = self.comment(is_approved=True).pk
+        self.assertEqual(self.approved_comments(), 1)
+        self.assertEqual(self.queued(), pending)
+
+        response = self.moderate(self.staff, pending, 'approve')
+        self.assertEqual(response.json(), {'updated': 3})
+        self.assertEqual(self.approved_comments(), 4)
+        self.assertEqual(self.queued(), [])
+
+        # Already approved comments are not counted twice.
+        response = self.moderate(self.staff, [*pending, approved], 'approve')
+        self.assertEqual(response.json(), {'updated': 0})
+        self.assertEqual(self.approved_comments(), 4)
+
+        response = self.moderate(self.staff, [pending[0], approved], 'reject')
+        self.assertEqual(response.json(), {'updated': 2})
+        self.assertEqual(self.approved_comments(), 2)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).approved_comments,
+            Comment.objects.filter(post__user=self.author, is_approved=True).count(),
+        )
+
+    def test_rejecting_a_pending_comment_leaves_the_queue(self):
+        pending = self.comment().pk
+        response = self.moderate(self.staff, [pending], 'reject')
+        self.assertEqual(response.json(), {'updated': 1})
+        self.assertEqual(self.queued(), [])
+        self.assertEqual(self.approved_comments(), 0)
+
+    def test_staff_only(self):
+        pending = self.comment().pk
+        for client, status in ((APIClient(), 401), (client_for(self.author), 403)):
+            with self.subTest(status=status):
+                self.assertEqual(client.get(reverse('comment-moderation-queue')).status_code, status)
+                response = client.post(
+                    reverse('comment-moderation-bulk'), {'ids': [pending], 'action': 'approve'}, format='json',
+                )
+                self.assertEqual(response.status_code, status)
+        self.assertFalse(Comment.objects.get(pk=pending).is_approved)
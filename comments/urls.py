@@ -2,6 +2,10 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    path("moderation/queue/", views.ModerationQueueView.as_view(), name="comment-moderation-queue"),
+    path("moderation/bulk/", views.BulkModerationView.as_view(), name="comment-moderation-bulk"),
     path("<slug:post_slug>/", views.CommentView.as_view(), name="post-comments"),
+    path("<slug:post_slug>/threads/", views.CommentThreadsView.as_view(), name="post-comment-threads"),
+    path("<int:comment_id>/replies/", views.CommentRepliesView.as_view(), name="comment-replies"),
     path("<int:comment_id>/report/", views.ReportCommentView.as_view(), name="comment-report"),
 ]
@@ -1,19 +1,36 @@
 from rest_framework.views import APIView
-from rest_framework.generics import ListCreateAPIView
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.generics import ListAPIView, ListCreateAPIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly, IsAuthenticated
+from django.db import connection
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
 from django.shortcuts import get_object_or_404
 from rest_framework.throttling import ScopedRateThrottle
-from .models import Comment, CommentReport
+from .models import Comment, CommentReport, reply_counts
 from posts.models import Post
 from accounts.models import UserBlock
 from rest_framework.exceptions import PermissionDenied
-from . serializers import CommentReportSerializer, CommentSerializer
+from . serializers import (
+    BulkModerationSerializer, CommentReportSerializer, CommentSerializer, CompiledCommentSerializer,
+    ModerationCommentSerializer, ReplySerializer, ThreadSerializer,
+)
+from blog.compiled import CompiledListMixin
 from rest_framework.response import Response
 from rest_framework import status
-from drf_spectacular.utils import extend_schema, OpenApiExample
+from drf_spectacular.utils import extend_schema, inline_serializer, OpenApiExample, OpenApiParameter
+from rest_framework import serializers
 from drf_spectacular.types import OpenApiTypes
 
 
+def reply_tree(depth):
+    """Prefetch for ``depth`` levels of CommentSerializer's nested ``replies``."""
+    queryset = Comment.objects.select_related('user')
+    if depth > 1:
+        queryset = queryset.prefetch_related(reply_tree(depth - 1))
+    return Prefetch('replies', queryset=queryset)
+
+
 @extend_schema(
     summary="Create comment",
     tags=["comments"],
@@ -30,17 +47,21 @@ from drf_spectacular.types import OpenApiTypes
         ),
     ],
 )
-class CommentView(ListCreateAPIView):
+class CommentView(CompiledListMixin, ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
     throttle_classes = [ScopedRateThrottle]
     throttle_scope = "comment-create"
     serializer_class = CommentSerializer
+    compiled_serializer_class = CompiledCommentSerializer
     queryset = Comment.objects.none()
 
     def get_queryset(self):
         post_slug = self.kwargs.get('post_slug')
         post = get_object_or_404(Post, slug=post_slug)
-        comments = Comment.objects.select_related('user').filter(post=post, is_approved=True)
+        # created_at can't predate the post; the bound prunes older partitions.
+        comments = Comment.objects.select_related('user').filter(
+            post=post, is_approved=True, created_at__gte=post.created_at
+        ).prefetch_related(reply_tree(Comment.MAX_LEVEL))
         return comments
 
     def perform_create(self, serializer):
@@ -52,6 +73,95 @@ class CommentView(ListCreateAPIView):
         serializer.save(user=self.request.user, post=post, is_approved=False)
 
 
+def approved_comments():
+    return Comment.objects.filter(is_approved=True).select_related('user').annotate(reply_count=reply_counts())
+
+
+def preload_replies(comments, limit):
+    """
+    Attach the first ``limit`` approved replies of each comment as
+    ``first_replies``, with one LIMITed index lookup per comment that has any.
+    """
+    for comment in comments:
+        comment.first_replies = []
+    parents = [comment for comment in comments if comment.reply_count]
+    if not parents or not limit:
+        return
+
+    bounds = {
+        'post_id__in': {comment.post_id for comment in parents},
+        'created_at__gte': min(comment.created_at for comment in parents),
+    }
+    if connection.features.supports_slicing_ordering_in_compound:
+        heads = [
+            Comment.objects.filter(
+                post_id=comment.post_id, parent_id=comment.pk, is_approved=True, created_at__gte=comment.created_at
+            ).order_by('created_at', 'id').values_list('pk', flat=True)[:limit]
+            for comment in parents
+        ]
+        ids = list(heads[0].union(*heads[1:], all=True))
+    else:
+        ids = list(
+            Comment.objects.filter(parent_id__in=[comment.pk for comment in parents], is_approved=True, **bounds)
+            .annotate(rank=Window(RowNumber(), partition_by=F('parent_id'), order_by=[F('created_at'), F('id')]))
+            .filter(rank__lte=limit)
+            .values_list('pk', flat=True)
+        )
+
+    by_id = {comment.pk: comment for comment in parents}
+    for reply in approved_comments().filter(pk__in=ids, **bounds).order_by('created_at', 'id'):
+        by_id[reply.parent_id].first_replies.append(reply)
+
+
+class ThreadCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 20
+
+
+class ReplyCursorPagination(CursorPagination):
+    ordering = ('created_at', 'id')
+    page_size = 20
+
+
+@extend_schema(
+    summary="Top-level comments with their first replies (newest first, cursor paginated)",
+    tags=["comments"],
+    parameters=[OpenApiParameter("replies", int, description="Replies preloaded per comment, at most 10 (default 3).")],
+)
+class CommentThreadsView(ListAPIView):
+    serializer_class = ThreadSerializer
+    pagination_class = ThreadCursorPagination
+    preview_size = 3
+    max_preview_size = 10
+
+    def get_queryset(self):
+        post = get_object_or_404(Post, slug=self.kwargs['post_slug'])
+        return approved_comments().filter(post=post, parent__isnull=True, created_at__gte=post.created_at)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        try:
+            limit = min(max(int(self.request.query_params.get('replies', self.preview_size)), 0), self.max_preview_size)
+        except ValueError:
+            limit = self.preview_size
+        preload_replies(page, limit)
+        return page
+
+
+@extend_schema(summary="Replies to a comment (oldest first, cursor paginated)", tags=["comments"])
+class CommentRepliesView(ListAPIView):
+    serializer_class = ReplySerializer
+    pagination_class = ReplyCursorPagination
+
+    def get_queryset(self):
+        parent = get_object_or_404(
+            Comment.objects.only('post_id', 'created_at'), pk=self.kwargs['comment_id'], is_approved=True
+        )
+        return approved_comments().filter(
+            post_id=parent.post_id, parent=parent, created_at__gte=parent.created_at
+        )
+
+
 @extend_schema(
     summary="Report a comment",
     tags=["moderation"],
@@ -64,7 +174,7 @@ class ReportCommentView(APIView):
     throttle_scope = "report"
 
     def post(self, request, comment_id):
-        comment = get_object_or_404(Comment, id=comment_id)
+        comment = get_object_or_404(Comment.objects.select_related('post'), id=comment_id)
 
         ser_data = CommentReportSerializer(data=request.data)
         if ser_data.is_valid():
@@ -77,4 +187,46 @@ class ReportCommentView(APIView):
                 obj.reason = ser_data.validated_data["reason"]
                 obj.save(update_fields=["reason"])
                 return Response({"message": "Report updated"}, status=status.HTTP_200_OK)
-            return Response({"message": "Report submitted"}, status=status.HTTP_201_CREATED)
\ No newline at end of file
+            comment.record_report()
+            return Response({"message": "Report submitted"}, status=status.HTTP_201_CREATED)
+
+
+class ModerationCursorPagination(CursorPagination):
+    ordering = ('created_at', 'id')
+    page_size = 50
+
+
+@extend_schema(summary="Comments awaiting moderation (oldest first, cursor paginated)", tags=["moderation"])
+class ModerationQueueView(ListAPIView):
+    permission_classes = [IsAdminUser]
+    serializer_class = ModerationCommentSerializer
+    pagination_class = ModerationCursorPagination
+
+    def get_queryset(self):
+        return (
+            Comment.objects.filter(is_approved=False, moderated_at__isnull=True)
+            .select_related('user', 'post')
+            .only('id', 'user__username', 'post__slug', 'parent_id', 'content', 'created_at', 'reports_count')
+        )
+
+
+BulkModerationResultSerializer = inline_serializer("BulkModerationResult", fields={"updated": serializers.IntegerField()})
+
+
+@extend_schema(
+    summary="Approve or reject comments in bulk",
+    tags=["moderation"],
+    request=BulkModerationSerializer,
+    responses={200: BulkModerationResultSerializer},
+)
+class BulkModerationView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        ser_data = BulkModerationSerializer(data=request.data)
+        ser_data.is_valid(raise_exception=True)
+        updated = Comment.moderate(
+            Comment.objects.filter(pk__in=ser_data.validated_data["ids"]),
+            approved=ser_data.validated_data["action"] == "approve",
+        )
+        return Response({"updated": updated})
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_at', 'enqueued_at', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'dedup_key', 'error')
+    ordering = ('-enqueued_at',)
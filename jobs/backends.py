@@ -0,0 +1,339 @@
+import datetime
+import json
+import os
+import socket
+import time
+import uuid
+from collections import defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .models import Job
+
+
+class RedisBackend:
+    """
+    Ready jobs live in a list, retries in a sorted set scored by due time, and
+    per-job counters in one hash per job name.
+
+    Claimed jobs are moved (LMOVE) into the worker's own processing list and
+    only leave it once acked, retried or failed. Workers renew a lease every
+    loop; the processing list of a worker whose lease expired (it crashed or
+    hung for VISIBILITY_TIMEOUT) is moved back to the queue by any other
+    worker's janitor pass, so delivery is at least once.
+    """
+    QUEUE_KEY = 'jobs:queue'
+    DELAYED_KEY = 'jobs:delayed'
+    FAILED_KEY = 'jobs:failed'
+    DEDUP_KEY = 'jobs:dedup:{}'
+    STATS_KEY = 'jobs:stats:{}'
+    WORKERS_KEY = 'jobs:workers'
+    PROCESSING_KEY = 'jobs:processing:{}'
+    LEASE_KEY = 'jobs:lease:{}'
+    DEDUP_TTL = 3600
+    FAILED_KEEP = 1000
+    VISIBILITY_TIMEOUT = 60
+    JANITOR_INTERVAL = 30
+
+    def __init__(self):
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.processing_key = self.PROCESSING_KEY.format(self.worker_id)
+        # Raw queue items of claimed jobs by payload id, to remove them from the processing list.
+        self.claimed = {}
+        self.janitor_at = 0
+
+    @cached_property
+    def conn(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+
+    def enqueue(self, payload):
+        item = json.dumps(payload)
+        key = payload['dedup_key'] and self.DEDUP_KEY.format(payload['dedup_key'])
+        if not key:
+            self.conn.lpush(self.QUEUE_KEY, item)
+            return True
+
+        # The dedup key and the job are written together, or neither is.
+        def push(pipe):
+            if pipe.exists(key):
+                return False
+            pipe.multi()
+            pipe.set(key, payload['id'], ex=self.DEDUP_TTL)
+            pipe.lpush(self.QUEUE_KEY, item)
+            return True
+        return self.conn.transaction(push, key, value_from_callable=True)
+
+    def promote_due(self):
+        # Removed from the set and queued in one transaction; a worker racing us retries and finds nothing due.
+        def promote(pipe):
+            due = pipe.zrangebyscore(self.DELAYED_KEY, 0, time.time(), start=0, num=100)
+            pipe.multi()
+            if due:
+                pipe.zrem(self.DELAYED_KEY, *due)
+                pipe.lpush(self.QUEUE_KEY, *due)
+        self.conn.transaction(promote, self.DELAYED_KEY)
+
+    def heartbeat(self):
+        pipe = self.conn.pipeline()
+        pipe.sadd(self.WORKERS_KEY, self.worker_id)
+        pipe.set(self.LEASE_KEY.format(self.worker_id), 1, ex=self.VISIBILITY_TIMEOUT)
+        pipe.execute()
+
+    def requeue_abandoned(self):
+        """Move the jobs of workers whose lease expired back to the queue; returns how many."""
+        requeued = 0
+        for worker_id in (member.decode() for member in self.conn.smembers(self.WORKERS_KEY)):
+            if worker_id == self.worker_id or self.conn.exists(self.LEASE_KEY.format(worker_id)):
+                continue
+            processing = self.PROCESSING_KEY.format(worker_id)
+            while self.conn.lmove(processing, self.QUEUE_KEY, 'RIGHT', 'RIGHT') is not None:
+                requeued += 1
+            self.conn.srem(self.WORKERS_KEY, worker_id)
+        return requeued
+
+    def claim(self, limit, timeout=0):
+        if time.monotonic() - self.janitor_at >= self.JANITOR_INTERVAL:
+            self.janitor_at = time.monotonic()
+            self.requeue_abandoned()
+        self.promote_due()
+        items = []
+        if timeout:
+            item = self.conn.blmove(self.QUEUE_KEY, self.processing_key, int(timeout), 'RIGHT', 'LEFT')
+            if item is not None:
+                items.append(item)
+        while len(items) < limit:
+            item = self.conn.lmove(self.QUEUE_KEY, self.processing_key, 'RIGHT', 'LEFT')
+            if item is None:
+                break
+            items.append(item)
+
+        payloads = []
+        for item in items:
+            payload = json.loads(item)
+            self.claimed[payload['id']] = item
+            payloads.append(payload)
+            # A started job no longer stands in for later ones with the same key.
+            key = payload['dedup_key'] and self.DEDUP_KEY.format(payload['dedup_key'])
+            if key and self.conn.get(key) == payload['id'].encode():
+                self.conn.delete(key)
+        return payloads
+
+    def release(self, pipe, payload):
+        item = self.claimed.pop(payload['id'], None)
+        if item is not None:
+            pipe.lrem(self.processing_key, 1, item)
+
+    def record(self, name, **counters):
+        pipe = self.conn.pipeline()
+        for field, value in counters.items():
+            if isinstance(value, float):
+                pipe.hincrbyfloat(self.STATS_KEY.format(name), field, value)
+            else:
+                pipe.hincrby(self.STATS_KEY.format(name), field, value)
+        pipe.execute()
+
+    def ack(self, payload, latency, duration):
+        pipe = self.conn.pipeline()
+        self.release(pipe, payload)
+        pipe.execute()
+        self.record(payload['name'], processed=1, latency_total=latency, duration_total=duration)
+
+    def retry(self, payload, error, delay, count_attempt=True):
+        retried = {
+            **payload,
+            'attempts': payload['attempts'] + count_attempt,
+            'ready_at': time.time() + delay,
+            'error': error,
+        }
+        pipe = self.conn.pipeline()
+        pipe.zadd(self.DELAYED_KEY, {json.dumps(retried): retried['ready_at']})
+        self.release(pipe, payload)
+        pipe.execute()
+        if count_attempt:
+            self.record(payload['name'], retried=1)
+
+    def fail(self, payload, error):
+        pipe = self.conn.pipeline()
+        pipe.lpush(self.FAILED_KEY, json.dumps({**payload, 'error': error, 'failed_at': time.time()}))
+        pipe.ltrim(self.FAILED_KEY, 0, self.FAILED_KEEP - 1)
+        self.release(pipe, payload)
+        pipe.execute()
+        self.record(payload['name'], failed=1)
+
+    def stats(self):
+        oldest = self.conn.lindex(self.QUEUE_KEY, -1)
+        jobs = {}
+        for key in self.conn.scan_iter(self.STATS_KEY.format('*')):
+            counters = {field.decode(): float(value) for field, value in self.conn.hgetall(key).items()}
+            processed = counters.get('processed', 0)
+            jobs[key.decode()[len(self.STATS_KEY.format('')):]] = {
+                'processed': int(processed),
+                'retried': int(counters.get('retried', 0)),
+                'failed': int(counters.get('failed', 0)),
+                'avg_latency': counters.get('latency_total', 0) / processed if processed else None,
+                'avg_duration': counters.get('duration_total', 0) / processed if processed else None,
+            }
+        return {
+            'queued': self.conn.llen(self.QUEUE_KEY),
+            'running': sum(
+                self.conn.llen(self.PROCESSING_KEY.format(worker_id.decode()))
+                for worker_id in self.conn.smembers(self.WORKERS_KEY)
+            ),
+            'delayed': self.conn.zcard(self.DELAYED_KEY),
+            'failed': self.conn.llen(self.FAILED_KEY),
+            'oldest_wait': time.time() - json.loads(oldest)['ready_at'] if oldest else None,
+            'jobs': jobs,
+        }
+
+
+class DatabaseBackend:
+    """
+    Job rows claimed with SELECT ... FOR UPDATE SKIP LOCKED; meant for tests and
+    small deployments. As with RedisBackend, claimed rows carry a lease the
+    worker renews every loop; running rows whose lease expired are queued again
+    by the next janitor pass, counting the attempt.
+    """
+    POLL_INTERVAL = 1
+    VISIBILITY_TIMEOUT = 60
+    JANITOR_INTERVAL = 30
+
+    def __init__(self):
+        # Ids of the running jobs this worker holds leases on.
+        self.claimed = set()
+        self.janitor_at = 0
+
+    def lease(self):
+        return timezone.now() + datetime.timedelta(seconds=self.VISIBILITY_TIMEOUT)
+
+    def enqueue(self, payload):
+        try:
+            with transaction.atomic():
+                Job.objects.create(
+                    name=payload['name'], args=payload['args'], kwargs=payload['kwargs'],
+                    dedup_key=payload['dedup_key'], run_at=timezone.now(),
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    def heartbeat(self):
+        if self.claimed:
+            Job.objects.filter(pk__in=self.claimed, status='running').update(lease_expires_at=self.lease())
+
+    def requeue_abandoned(self):
+        """Queue running jobs whose lease expired again; returns how many."""
+        now = timezone.now()
+        requeued = 0
+        with transaction.atomic():
+            abandoned = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status='running')
+                .filter(
+                    Q(lease_expires_at__lt=now)
+                    # Claimed before leases existed.
+                    | Q(lease_expires_at__isnull=True, started_at__lt=now - datetime.timedelta(seconds=self.VISIBILITY_TIMEOUT))
+                )
+                .values_list('pk', flat=True)
+            )
+            for pk in abandoned:
+                try:
+                    with transaction.atomic():
+                        Job.objects.filter(pk=pk).update(
+                            status='queued', attempts=F('attempts') + 1, run_at=now, lease_expires_at=None,
+                            error='Worker lease expired',
+                        )
+                    requeued += 1
+                except IntegrityError:
+                    # A job with the same dedup key is already queued and covers this one.
+                    Job.objects.filter(pk=pk).update(status='done', finished_at=now, error='Worker lease expired')
+        return requeued
+
+    def claim(self, limit, timeout=0):
+        if time.monotonic() - self.janitor_at >= self.JANITOR_INTERVAL:
+            self.janitor_at = time.monotonic()
+            self.requeue_abandoned()
+        jobs = self.claim_rows(limit)
+        if not jobs and timeout:
+            time.sleep(min(timeout, self.POLL_INTERVAL))
+            jobs = self.claim_rows(limit)
+        return [
+            {
+                'id': job.pk, 'name': job.name, 'args': job.args, 'kwargs': job.kwargs,
+                'attempts': job.attempts, 'ready_at': job.run_at.timestamp(), 'dedup_key': job.dedup_key,
+            }
+            for job in jobs
+        ]
+
+    def claim_rows(self, limit):
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status='queued', run_at__lte=now)
+                .order_by('run_at', 'pk')[:limit]
+            )
+            Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status='running', started_at=now, lease_expires_at=self.lease(),
+            )
+        self.claimed.update(job.pk for job in jobs)
+        return jobs
+
+    def ack(self, payload, latency, duration):
+        self.claimed.discard(payload['id'])
+        Job.objects.filter(pk=payload['id']).update(status='done', finished_at=timezone.now(), error='')
+
+    def retry(self, payload, error, delay, count_attempt=True):
+        self.claimed.discard(payload['id'])
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                Job.objects.filter(pk=payload['id']).update(
+                    status='queued', attempts=F('attempts') + int(count_attempt),
+                    run_at=now + datetime.timedelta(seconds=delay), error=error,
+                )
+        except IntegrityError:
+            # A newer job with the same dedup key is already queued and covers this one.
+            Job.objects.filter(pk=payload['id']).update(status='done', finished_at=now, error=error)
+
+    def fail(self, payload, error):
+        self.claimed.discard(payload['id'])
+        Job.objects.filter(pk=payload['id']).update(status='failed', finished_at=timezone.now(), error=error)
+
+    def stats(self):
+        now = timezone.now()
+        queued = Job.objects.filter(status='queued')
+        oldest = queued.filter(run_at__lte=now).order_by('run_at').values_list('run_at', flat=True).first()
+        rows = (
+            Job.objects.values('name')
+            .annotate(
+                processed=Count('pk', filter=Q(status='done')),
+                retried=Sum('attempts'),
+                failed=Count('pk', filter=Q(status='failed')),
+                avg_latency=Avg(
+                    ExpressionWrapper(F('started_at') - F('run_at'), output_field=DurationField()),
+                    filter=Q(status='done'),
+                ),
+                avg_duration=Avg(
+                    ExpressionWrapper(F('finished_at') - F('started_at'), output_field=DurationField()),
+                    filter=Q(status='done'),
+                ),
+            )
+            .order_by()
+        )
+        jobs = defaultdict(dict)
+        for row in rows:
+            name = row.pop('name')
+            for field in ('avg_latency', 'avg_duration'):
+                row[field] = row[field].total_seconds() if row[field] is not None else None
+            jobs[name] = row
+        return {
+            'queued': queued.filter(run_at__lte=now).count(),
+            'running': Job.objects.filter(status='running').count(),
+            'delayed': queued.filter(run_at__gt=now).count(),
+            'failed': Job.objects.filter(status='failed').count(),
+            'oldest_wait': (now - oldest).total_seconds() if oldest else None,
+            'jobs': dict(jobs),
+        }
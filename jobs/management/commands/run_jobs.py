@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import autodiscover, get_backend
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run background jobs queued with Task.delay(), or print queue depth and latency metrics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is ready.")
+        parser.add_argument("--stats", action="store_true", help="Print queue metrics and exit.")
+
+    def handle(self, *args, **options):
+        autodiscover()
+        backend = get_backend()
+        if options["stats"]:
+            self.print_stats(backend.stats())
+            return
+
+        log = self.stdout.write if options["verbosity"] > 1 else None
+        Worker(backend, options["concurrency"], options["pool"], log=log).run(burst=options["burst"])
+
+    def print_stats(self, stats):
+        wait = stats["oldest_wait"]
+        self.stdout.write(
+            f"queued={stats['queued']} running={stats['running']} delayed={stats['delayed']} failed={stats['failed']} "
+            f"oldest_wait={'-' if wait is None else f'{wait:.1f}s'}"
+        )
+        for name, job in sorted(stats["jobs"].items()):
+            latency, duration = job["avg_latency"], job["avg_duration"]
+            self.stdout.write(
+                f"{name}: processed={job['processed']} retried={job['retried']} failed={job['failed']} "
+                f"avg_latency={'-' if latency is None else f'{latency * 1000:.1f}ms'} "
+                f"avg_duration={'-' if duration is None else f'{duration * 1000:.1f}ms'}"
+            )
@@ -0,0 +1,73 @@
+import random
+import time
+import uuid
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import autodiscover_modules, import_string
+
+BACKENDS = {
+    'redis': 'jobs.backends.RedisBackend',
+    'db': 'jobs.backends.DatabaseBackend',
+}
+MAX_BACKOFF = 600
+
+REGISTRY = {}
+_backend = None
+
+
+class Task:
+    def __init__(self, func, name, retries, backoff, dedup_key, concurrency):
+        self.func = func
+        self.name = name
+        self.retries = retries
+        self.backoff = backoff
+        self.dedup_key = dedup_key
+        self.concurrency = concurrency
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        self.dispatch(args, kwargs)
+
+    def dispatch(self, args=(), kwargs=None, dedup_key=None):
+        """Queue the job once the current transaction commits (immediately outside one)."""
+        payload = {
+            'id': uuid.uuid4().hex,
+            'name': self.name,
+            'args': list(args),
+            'kwargs': kwargs or {},
+            'attempts': 0,
+            'ready_at': time.time(),
+            'dedup_key': dedup_key or self.dedup_key,
+        }
+        transaction.on_commit(lambda: get_backend().enqueue(payload))
+
+    def retry_delay(self, attempt):
+        delay = min(self.backoff * 2 ** (attempt - 1), MAX_BACKOFF)
+        return delay * random.uniform(0.9, 1.1)
+
+
+def job(name=None, retries=3, backoff=2.0, dedup_key=None, concurrency=None):
+    """
+    Register ``func`` as a background job; call ``func.delay(...)`` to queue it.
+
+    ``dedup_key`` collapses jobs queued under the same key until one of them
+    starts, and ``concurrency`` caps how many run at once in a worker.
+    """
+    def decorator(func):
+        task = Task(func, name or f'{func.__module__}.{func.__name__}', retries, backoff, dedup_key, concurrency)
+        REGISTRY[task.name] = task
+        return task
+    return decorator
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(BACKENDS[settings.JOBS_BACKEND])()
+    return _backend
+
+
+def autodiscover():
+    autodiscover_modules('jobs')
@@ -0,0 +1,132 @@
+import datetime
+from unittest import mock
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from .backends import DatabaseBackend
+from .models import Job
+from .queue import job
+from .worker import Worker
+
+calls = []
+
+
+@job(name='jobs.tests.record')
+def record(value):
+    calls.append(value)
+
+
+@job(name='jobs.tests.collapse', dedup_key='jobs.tests.collapse')
+def collapse():
+    calls.append('collapse')
+
+
+@job(name='jobs.tests.broken', retries=2, backoff=10)
+def broken():
+    calls.append('broken')
+    raise ValueError('boom')
+
+
+class DatabaseBackendTestCase(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.backend = DatabaseBackend()
+        patcher = mock.patch('jobs.queue._backend', self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_worker(self):
+        Worker(self.backend, concurrency=2).run(burst=True, poll_timeout=0.1)
+
+    def make_due(self):
+        Job.objects.filter(status='queued').update(run_at=timezone.now())
+
+
+class DispatchTests(DatabaseBackendTestCase):
+    def test_queued_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record.delay(1)
+            self.assertFalse(Job.objects.exists())
+        job_row = Job.objects.get()
+        self.assertEqual((job_row.name, job_row.args, job_row.status), ('jobs.tests.record', [1], 'queued'))
+
+        self.run_worker()
+        self.assertEqual(calls, [1])
+        self.assertEqual(Job.objects.get().status, 'done')
+
+    def test_rolled_back_transaction_queues_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                record.delay(1)
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertFalse(Job.objects.exists())
+
+    def test_dedup_key_collapses_until_started(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            collapse.delay()
+            collapse.delay()
+        self.assertEqual(Job.objects.count(), 1)
+
+        [claimed] = self.backend.claim(10)
+        # A running job no longer stands in for new ones.
+        with self.captureOnCommitCallbacks(execute=True):
+            collapse.delay()
+            collapse.delay()
+        self.assertEqual(Job.objects.filter(status='queued').count(), 1)
+        self.assertEqual(Job.objects.get(pk=claimed['id']).status, 'running')
+
+
+class RetryTests(DatabaseBackendTestCase):
+    def test_retries_with_backoff_then_fails(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            broken.delay()
+
+        for attempt in (1, 2):
+            started = timezone.now()
+            self.run_worker()
+            job_row = Job.objects.get()
+            self.assertEqual((job_row.status, job_row.attempts), ('queued', attempt))
+            self.assertIn('ValueError: boom', job_row.error)
+            # backoff * 2 ** (attempt - 1), with 10% jitter.
+            delay = (job_row.run_at - started).total_seconds()
+            self.assertGreaterEqual(delay, 10 * 2 ** (attempt - 1) * 0.9 - 1)
+            self.assertLessEqual(delay, 10 * 2 ** (attempt - 1) * 1.1 + 1)
+            # Not due yet: a burst run leaves it alone.
+            self.run_worker()
+            self.assertEqual(len(calls), attempt)
+            self.make_due()
+
+        self.run_worker()
+        self.assertEqual(calls, ['broken'] * 3)
+        job_row = Job.objects.get()
+        self.assertEqual(job_row.status, 'failed')
+        self.assertIsNotNone(job_row.finished_at)
+
+
+class LeaseTests(DatabaseBackendTestCase):
+    def test_abandoned_job_is_requeued(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record.delay(1)
+        self.backend.claim(10)
+        other = DatabaseBackend()
+        self.assertEqual(other.requeue_abandoned(), 0)
+
+        # The claiming worker died: its lease runs out.
+        Job.objects.update(lease_expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertEqual(other.requeue_abandoned(), 1)
+        job_row = Job.objects.get()
+        self.assertEqual((job_row.status, job_row.attempts), ('queued', 1))
+
+        Worker(other, concurrency=1).run(burst=True, poll_timeout=0.1)
+        self.assertEqual(calls, [1])
+
+    def test_heartbeat_renews_the_lease(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record.delay(1)
+        self.backend.claim(10)
+        Job.objects.update(lease_expires_at=timezone.now() + datetime.timedelta(seconds=1))
+        self.backend.heartbeat()
+        lease = Job.objects.get().lease_expires_at
+        self.assertGreater(lease, timezone.now() + datetime.timedelta(seconds=self.backend.VISIBILITY_TIMEOUT - 5))
@@ -0,0 +1,84 @@
+import multiprocessing
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from django.db import close_old_connections, connections
+from .queue import REGISTRY
+
+
+def execute(payload):
+    """Run one job inside the pool and report ``(ok, error, started, duration)``."""
+    close_old_connections()
+    started = time.time()
+    try:
+        REGISTRY[payload['name']].func(*payload['args'], **payload['kwargs'])
+    except Exception:
+        return False, traceback.format_exc(limit=5), started, time.time() - started
+    finally:
+        close_old_connections()
+    return True, '', started, time.time() - started
+
+
+class Worker:
+    def __init__(self, backend, concurrency=4, pool='thread', log=None):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.pool = pool
+        self.log = log or (lambda message: None)
+        self.running = {}
+        self.active = Counter()
+
+    def make_executor(self):
+        if self.pool == 'process':
+            # Children are forked so they inherit the configured Django and the job registry.
+            connections.close_all()
+            return ProcessPoolExecutor(self.concurrency, mp_context=multiprocessing.get_context('fork'))
+        return ThreadPoolExecutor(self.concurrency)
+
+    def run(self, burst=False, poll_timeout=5):
+        """Process jobs until interrupted, or until the queue is empty with ``burst``."""
+        with self.make_executor() as executor:
+            while True:
+                # Keeps the claimed jobs ours while they run, however long that takes.
+                self.backend.heartbeat()
+                claimed = []
+                free = self.concurrency - len(self.running)
+                if free:
+                    claimed = self.backend.claim(free, timeout=0 if (self.running or burst) else poll_timeout)
+                    for payload in claimed:
+                        self.submit(executor, payload)
+                if self.running:
+                    done, _ = wait(self.running, timeout=poll_timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.finish(self.running.pop(future), *future.result())
+                elif burst and not claimed:
+                    return
+
+    def submit(self, executor, payload):
+        task = REGISTRY.get(payload['name'])
+        if task is None:
+            self.backend.fail(payload, f"Unknown job {payload['name']!r}")
+            return
+        if task.concurrency and self.active[task.name] >= task.concurrency:
+            self.backend.retry(payload, 'concurrency limit reached', delay=1, count_attempt=False)
+            return
+        self.active[task.name] += 1
+        self.running[executor.submit(execute, payload)] = payload
+
+    def finish(self, payload, ok, error, started, duration):
+        task = REGISTRY[payload['name']]
+        self.active[task.name] -= 1
+        latency = max(started - payload['ready_at'], 0.0)
+        if ok:
+            self.backend.ack(payload, latency, duration)
+            self.log(f"{task.name} done in {duration * 1000:.1f}ms (waited {latency * 1000:.1f}ms)")
+            return
+        attempt = payload['attempts'] + 1
+        if attempt <= task.retries:
+            delay = task.retry_delay(attempt)
+            self.backend.retry(payload, error, delay)
+            self.log(f"{task.name} failed (attempt {attempt}), retrying in {delay:.1f}s")
+        else:
+            self.backend.fail(payload, error)
+            self.log(f"{task.name} failed permanently:\n{error}")
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'verb', 'actor', 'post', 'count', 'is_read', 'updated_at')
+    list_filter = ('verb', 'is_read')
+    raw_id_fields = ('recipient', 'actor', 'post', 'comment')
+    ordering = ('-updated_at',)
@@ -0,0 +1,107 @@
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+from accounts.models import User, UserBlock
+from comments.models import Comment
+from posts.models import Post
+from .models import Notification
+from .queue import store_unread_counts
+
+
+def fan_out(events):
+    """
+    Turn a batch of queued ``[verb, actor, post, comment, recipient]`` events
+    into notifications with a fixed number of queries, coalescing likes per
+    (recipient, post) into one unread notification. Returns the recipients.
+    """
+    post_ids = {post_id for _, _, post_id, _, _ in events if post_id}
+    authors = dict(Post.objects.filter(pk__in=post_ids, user__isnull=False).values_list('pk', 'user_id'))
+
+    resolved = []
+    for verb, actor_id, post_id, comment_id, recipient_id in events:
+        recipient_id = recipient_id or authors.get(post_id)
+        if recipient_id and recipient_id != actor_id:
+            resolved.append((verb, actor_id, recipient_id, post_id, comment_id))
+    if not resolved:
+        return set()
+
+    users = {pk for pk in User.objects.filter(
+        pk__in={user_id for _, actor_id, recipient_id, _, _ in resolved for user_id in (actor_id, recipient_id)}
+    ).values_list('pk', flat=True)}
+    blocked = set(UserBlock.objects.filter(
+        user_id__in={recipient_id for _, _, recipient_id, _, _ in resolved},
+        blocked_user_id__in={actor_id for _, actor_id, _, _, _ in resolved},
+    ).values_list('user_id', 'blocked_user_id'))
+    comments = set(Comment.objects.filter(
+        pk__in={comment_id for _, _, _, _, comment_id in resolved if comment_id}
+    ).values_list('pk', flat=True))
+
+    likes = {}
+    created = []
+    for verb, actor_id, recipient_id, post_id, comment_id in resolved:
+        if actor_id not in users or recipient_id not in users or (recipient_id, actor_id) in blocked:
+            continue
+        if comment_id and comment_id not in comments:
+            continue
+        if verb == Notification.LIKE:
+            count, _ = likes.get((recipient_id, post_id), (0, None))
+            likes[(recipient_id, post_id)] = (count + 1, actor_id)
+        else:
+            created.append(Notification(
+                recipient_id=recipient_id, actor_id=actor_id, verb=verb, post_id=post_id, comment_id=comment_id,
+            ))
+
+    with transaction.atomic():
+        Notification.objects.bulk_create(created)
+        upsert_likes(likes)
+
+    recipients = {recipient_id for recipient_id, _ in likes} | {n.recipient_id for n in created}
+    refresh_unread_counts(recipients)
+    return recipients
+
+
+def upsert_likes(likes):
+    """
+    Add ``{(recipient, post): (count, last actor)}`` to each pair's unread like
+    notification, creating it when there is none. The upsert goes through the
+    partial unique constraint, so overlapping fan-outs add up instead of
+    creating duplicates; bulk_create(update_conflicts=True) can neither add to
+    ``count`` nor name the constraint's condition.
+    """
+    if not likes:
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(Notification._meta.db_table)
+    columns = ('recipient_id', 'actor_id', 'verb', 'post_id', 'count', 'is_read', 'created_at', 'updated_at')
+    sql = (
+        f"INSERT INTO {table} ({', '.join(map(qn, columns))}) VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON CONFLICT (recipient_id, post_id) WHERE NOT is_read AND verb = {Notification.LIKE} "
+        f"DO UPDATE SET {qn('count')} = {table}.{qn('count')} + EXCLUDED.{qn('count')}, "
+        f"actor_id = EXCLUDED.actor_id, updated_at = EXCLUDED.updated_at"
+    )
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    # Sorted keys give concurrent fan-outs a consistent lock order.
+    params = [
+        (recipient_id, actor_id, Notification.LIKE, post_id, count, False, now, now)
+        for (recipient_id, post_id), (count, actor_id) in sorted(likes.items())
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def refresh_unread_counts(user_ids):
+    """
+    Recount the unread notifications of ``user_ids`` into their Redis counters:
+    one grouped COUNT over notification_unread_idx per batch. Recounting
+    rather than INCRBY/DECRBY keeps the counters exact when fan-out, marking
+    as read and a reader refilling a missing counter interleave.
+    """
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update(
+        Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+        .values_list('recipient_id')
+        .annotate(total=Count('pk'))
+        .order_by()
+    )
+    store_unread_counts(counts)
@@ -0,0 +1,35 @@
+from jobs.queue import job
+
+
+@job(dedup_key='notifications.fan_out', retries=5)
+def fan_out_events(batch_size=500):
+    """Drain the event queue into notifications; see ``drain``."""
+    drain(batch_size)
+
+
+def drain(batch_size=500):
+    """
+    Fan queued events out in batches until the queue is empty. Returns
+    ``(events, recipients)``, or None when another drain is running: it
+    queues a new job on release if events arrived meanwhile.
+    """
+    from .fanout import fan_out
+    from .queue import ack_batch, acquire_drain, pop_batch, queue_length, release_drain
+
+    token = acquire_drain()
+    if token is None:
+        return None
+    events = recipients = 0
+    try:
+        while True:
+            batch = pop_batch(batch_size, token)
+            if not batch:
+                break
+            recipients += len(fan_out(batch))
+            ack_batch()
+            events += len(batch)
+    finally:
+        release_drain(token)
+    if queue_length():
+        fan_out_events.delay(batch_size)
+    return events, recipients
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.jobs import drain
+
+
+class Command(BaseCommand):
+    help = (
+        "Fan out queued like/comment/follow events into notifications in batches. "
+        "run_jobs does this as events arrive; this drains the queue directly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--interval", type=float, default=0,
+            help="Keep running, draining the queue every N seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            drained = drain(options["batch_size"])
+            if drained is None:
+                self.stdout.write("Another drain is running.")
+            elif drained[0]:
+                self.stdout.write(f"{drained[0]} events -> {drained[1]} recipients")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
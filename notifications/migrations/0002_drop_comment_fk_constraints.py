@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0004_drop_comment_fk_constraints'),
+        ('notifications', '0001_initial'),
+    ]
+
+    # State only: the database constraints stay until "manage.py partitions
+    # convert" partitions comments_comment and drops them (see
+    # blog.partitioning.drop_incoming_foreign_keys), so deployments that never
+    # partition keep referential integrity.
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='notification',
+                name='comment',
+                field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='comments.comment'),
+            ),
+        ]),
+    ]
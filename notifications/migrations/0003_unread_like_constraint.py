@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:54
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def merge_duplicate_likes(apps, schema_editor):
+    """Fold duplicate unread like notifications into the newest one, so the constraint can be added."""
+    Notification = apps.get_model('notifications', 'Notification')
+    unread_likes = Notification.objects.filter(verb=1, is_read=False)
+    duplicates = (
+        unread_likes.values('recipient_id', 'post_id').order_by()
+        .annotate(rows=Count('pk'), total=Sum('count'), newest=Max('pk')).filter(rows__gt=1)
+    )
+    for row in duplicates.iterator():
+        unread_likes.filter(pk=row['newest']).update(count=row['total'])
+        unread_likes.filter(recipient_id=row['recipient_id'], post_id=row['post_id']).exclude(pk=row['newest']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0006_thread_index'),
+        ('notifications', '0002_drop_comment_fk_constraints'),
+        ('posts', '0010_description_derivatives'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_likes, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_unread_like_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient'], name='notification_unread_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_read', False), ('verb', 1)), fields=('recipient', 'post'), name='notification_unread_like_uniq'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import models
+from accounts.models import User
+from posts.models import Post
+from comments.models import Comment
+
+
+class Notification(models.Model):
+    LIKE = 1
+    COMMENT = 2
+    FOLLOW = 3
+    VERB_CHOICES = [
+        (LIKE, 'like'),
+        (COMMENT, 'comment'),
+        (FOLLOW, 'follow'),
+    ]
+
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    verb = models.PositiveSmallIntegerField(choices=VERB_CHOICES)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    comment = models.ForeignKey(
+        Comment, on_delete=models.CASCADE, null=True, blank=True, related_name='+', db_constraint=False
+    )
+    # Likes on one post are coalesced into a single unread notification.
+    count = models.PositiveIntegerField(default=1)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['recipient', '-updated_at'], name='notification_feed_idx'),
+            # Unread counts are recounted from these rows.
+            models.Index(fields=['recipient'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+        ]
+        constraints = [
+            # At most one unread like notification per post: fan-out adds to it (see fanout.upsert_likes).
+            models.UniqueConstraint(
+                fields=['recipient', 'post'], condition=models.Q(is_read=False, verb=1), name='notification_unread_like_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_verb_display()}({self.actor_id}->{self.recipient_id}) x{self.count}"
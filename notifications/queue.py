@@ -0,0 +1,87 @@
+import json
+import uuid
+from django.db import transaction
+
+QUEUE_KEY = 'notifications:events'
+# The batch being fanned out; it is dropped only after its notifications commit.
+PROCESSING_KEY = 'notifications:processing'
+DRAIN_LOCK_KEY = 'notifications:drain'
+DRAIN_LOCK_TTL = 300
+UNREAD_KEY = 'notifications:unread:{}'
+UNREAD_TTL = 7 * 24 * 3600
+
+
+def get_connection():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def enqueue(verb, actor_id, post_id=None, comment_id=None, recipient_id=None):
+    """
+    Queue an event once the current transaction commits, and the job that fans
+    events out (deduplicated, so a burst of events shares one job).
+    """
+    from .jobs import fan_out_events
+
+    event = json.dumps([verb, actor_id, post_id, comment_id, recipient_id])
+
+    def push():
+        get_connection().rpush(QUEUE_KEY, event)
+        fan_out_events.delay()
+    transaction.on_commit(push)
+
+
+def acquire_drain():
+    token = uuid.uuid4().hex
+    return token if get_connection().set(DRAIN_LOCK_KEY, token, nx=True, ex=DRAIN_LOCK_TTL) else None
+
+
+def release_drain(token):
+    conn = get_connection()
+    if conn.get(DRAIN_LOCK_KEY) == token.encode():
+        conn.delete(DRAIN_LOCK_KEY)
+
+
+def pop_batch(size, token):
+    """
+    The next ``size`` events, moved to the processing list in one transaction.
+    A batch left there by a drain that died before ``ack_batch`` comes first.
+    """
+    conn = get_connection()
+    if conn.get(DRAIN_LOCK_KEY) == token.encode():
+        conn.expire(DRAIN_LOCK_KEY, DRAIN_LOCK_TTL)
+    events = conn.lrange(PROCESSING_KEY, 0, -1)
+    if not events:
+        pipe = conn.pipeline()
+        for _ in range(size):
+            pipe.lmove(QUEUE_KEY, PROCESSING_KEY, 'LEFT', 'RIGHT')
+        events = [event for event in pipe.execute() if event is not None]
+    return [json.loads(event) for event in events]
+
+
+def ack_batch():
+    get_connection().delete(PROCESSING_KEY)
+
+
+def queue_length():
+    return get_connection().llen(QUEUE_KEY)
+
+
+def store_unread_counts(counts):
+    pipe = get_connection().pipeline()
+    for user_id, count in counts.items():
+        pipe.set(UNREAD_KEY.format(user_id), count, ex=UNREAD_TTL)
+    pipe.execute()
+
+
+def unread_count(user_id):
+    """Unread notifications for ``user_id``; a missing counter is recounted from the database."""
+    cached = get_connection().get(UNREAD_KEY.format(user_id))
+    if cached is not None:
+        return int(cached)
+    from .models import Notification
+
+    count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+    store_unread_counts({user_id: count})
+    return count
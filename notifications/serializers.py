@@ -0,0 +1,16 @@
+from rest_framework import serializers
+from .models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    verb = serializers.CharField(source='get_verb_display', read_only=True)
+    actor = serializers.CharField(source='actor.username', read_only=True)
+    post = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+
+    class Meta:
+        model = Notification
+        fields = ['id', 'verb', 'actor', 'post', 'comment', 'count', 'is_read', 'created_at', 'updated_at']
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=500)
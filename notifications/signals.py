@@ -0,0 +1,27 @@
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from accounts.models import Follow
+from comments.models import Comment
+from posts.models import PostLike
+from .models import Notification
+from .queue import enqueue
+
+@receiver(pre_save, sender=PostLike)
+def check_new_like(sender, instance, **kwargs):
+    # Checked before save: the AuthorStats receiver resets _loaded_value in post_save.
+    instance._is_new_like = instance.value == 'like' and getattr(instance, '_loaded_value', None) != 'like'
+
+@receiver(post_save, sender=PostLike)
+def notify_on_like(sender, instance, **kwargs):
+    if getattr(instance, '_is_new_like', False):
+        enqueue(Notification.LIKE, instance.user_id, post_id=instance.post_id)
+
+@receiver(post_save, sender=Comment)
+def notify_on_comment(sender, instance, created, **kwargs):
+    if created:
+        enqueue(Notification.COMMENT, instance.user_id, post_id=instance.post_id, comment_id=instance.pk)
+
+@receiver(post_save, sender=Follow)
+def notify_on_follow(sender, instance, created, **kwargs):
+    if created:
+        enqueue(Notification.FOLLOW, instance.from_user_id, recipient_id=instance.to_user_id)
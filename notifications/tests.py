@@ -0,0 +1,75 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from posts.models import Post
+from .fanout import fan_out
+from .models import Notification
+from .queue import UNREAD_KEY, get_connection
+
+
+def like(actor, post):
+    return [Notification.LIKE, actor.pk, post.pk, None, None]
+
+
+class LikeCoalescingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, *cls.fans = [
+            User.objects.create_user(phone=f'0920000{number:04d}', username=f'user{number}', age=30, password='x')
+            for number in range(4)
+        ]
+        cls.post = Post.objects.create(
+            title='Post', description='<p>Body</p>', status='published', user=cls.author, image='posts/x.jpg',
+        )
+
+    def setUp(self):
+        get_connection().delete(UNREAD_KEY.format(self.author.pk))
+
+    def unread_likes(self):
+        return Notification.objects.filter(recipient=self.author, verb=Notification.LIKE, is_read=False)
+
+    def assertCounterMatchesRecount(self):
+        counter = get_connection().get(UNREAD_KEY.format(self.author.pk))
+        self.assertIsNotNone(counter)
+        self.assertEqual(int(counter), Notification.objects.filter(recipient=self.author, is_read=False).count())
+
+    def test_likes_on_one_post_share_an_unread_notification(self):
+        fan_out([like(self.fans[0], self.post), like(self.fans[1], self.post)])
+        # A later batch adds to the same row through the ON CONFLICT upsert.
+        fan_out([like(self.fans[2], self.post)])
+
+        notification = self.unread_likes().get()
+        self.assertEqual(notification.count, 3)
+        self.assertEqual(notification.actor, self.fans[2])
+        self.assertCounterMatchesRecount()
+
+    def test_other_verbs_are_not_coalesced(self):
+        fan_out([like(self.fans[0], self.post), [Notification.FOLLOW, self.fans[1].pk, None, None, self.author.pk]])
+        fan_out([like(self.fans[1], self.post)])
+
+        self.assertEqual(self.unread_likes().get().count, 2)
+        self.assertEqual(Notification.objects.filter(recipient=self.author).count(), 2)
+        self.assertCounterMatchesRecount()
+
+    def test_like_after_mark_read_starts_a_new_notification(self):
+        fan_out([like(self.fans[0], self.post), like(self.fans[1], self.post)])
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.author)}')
+        response = client.post(reverse('my-notifications-read'), {}, format='json')
+        self.assertEqual(response.json(), {'unread': 0})
+
+        fan_out([like(self.fans[2], self.post)])
+
+        fresh = self.unread_likes().get()
+        self.assertEqual(fresh.count, 1)
+        self.assertEqual(fresh.actor, self.fans[2])
+        read = Notification.objects.get(recipient=self.author, is_read=True)
+        self.assertEqual(read.count, 2)
+        self.assertCounterMatchesRecount()
+
+    def test_own_likes_are_not_notified(self):
+        self.assertEqual(fan_out([like(self.author, self.post)]), set())
+        self.assertFalse(Notification.objects.exists())
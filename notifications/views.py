@@ -0,0 +1,61 @@
+from rest_framework.generics import ListAPIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_spectacular.utils import extend_schema, inline_serializer
+from rest_framework import serializers
+from .fanout import refresh_unread_counts
+from .models import Notification
+from .queue import unread_count
+from .serializers import NotificationSerializer, MarkReadSerializer
+
+
+class NotificationCursorPagination(CursorPagination):
+    ordering = ('-updated_at', '-id')
+    page_size = 20
+
+
+@extend_schema(summary="My notifications (newest first, cursor paginated)", tags=["notifications"])
+class MyNotificationsView(ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = NotificationSerializer
+    pagination_class = NotificationCursorPagination
+
+    def get_queryset(self):
+        return (
+            Notification.objects.filter(recipient=self.request.user)
+            .select_related('actor', 'post')
+            .only('id', 'verb', 'actor__username', 'post__slug', 'comment_id', 'count', 'is_read', 'created_at', 'updated_at')
+        )
+
+
+UnreadCountSerializer = inline_serializer("UnreadCount", fields={"unread": serializers.IntegerField()})
+
+
+@extend_schema(summary="My unread notification count", tags=["notifications"], responses={200: UnreadCountSerializer})
+class UnreadCountView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread": unread_count(request.user.pk)})
+
+
+@extend_schema(
+    summary="Mark notifications as read (all when no ids are given)",
+    tags=["notifications"],
+    request=MarkReadSerializer,
+    responses={200: UnreadCountSerializer},
+)
+class MarkReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ser_data = MarkReadSerializer(data=request.data)
+        ser_data.is_valid(raise_exception=True)
+        notifications = Notification.objects.filter(recipient=request.user, is_read=False)
+        if "ids" in ser_data.validated_data:
+            notifications = notifications.filter(pk__in=ser_data.validated_data["ids"])
+        notifications.update(is_read=True)
+        refresh_unread_counts({request.user.pk})
+        return Response({"unread": unread_count(request.user.pk)})
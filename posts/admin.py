@@ -1,18 +1,44 @@
 from django.contrib import admin
-from .models import Post, Category
+from blog.admin_filters import AutocompleteFilter
+from blog.pagination import EstimatedCountAdminMixin
+from .models import Post, Category, PostLike
 
 
 @admin.register(Post)
-class PostsAdmin(admin.ModelAdmin):
-    list_display = ('title', 'user', 'status', 'created_at', 'updated_at', 'views_count')
-    search_fields = ('title', 'description', 'excerpt')
-    list_filter = ('status', 'created_at', 'user')
+class PostsAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
+    list_display = ('title', 'user', 'status', 'created_at', 'updated_at', 'views_count', 'unique_viewers')
+    search_fields = ('^title', '^slug')
+    list_filter = ('status', 'created_at', ('user', AutocompleteFilter))
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
     prepopulated_fields = {'slug': ('title',)}
     ordering = ['-created_at']
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('title',)
+    list_display = ('title', 'posts_count', 'last_post_at')
     search_fields = ('title', 'description', 'slug')
-    prepopulated_fields = {'slug': ('title',)}
\ No newline at end of file
+    prepopulated_fields = {'slug': ('title',)}
+
+
+@admin.register(PostLike)
+class PostLikeAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
+    list_display = ('user', 'post', 'value', 'created_at')
+    list_filter = ('value', ('user', AutocompleteFilter), ('post', AutocompleteFilter))
+    list_select_related = ('user', 'post')
+    autocomplete_fields = ('user', 'post')
+    search_fields = ('^user__username', '^post__title')
+    ordering = ('-created_at',)
+    actions = ('delete_votes',)
+
+    def delete_model(self, request, obj):
+        PostLike.delete_votes(PostLike.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        PostLike.delete_votes(queryset)
+
+    @admin.action(description='Delete selected votes (single query)', permissions=('delete',))
+    def delete_votes(self, request, queryset):
+        deleted = PostLike.delete_votes(queryset)
+        self.message_user(request, f'{deleted} votes deleted.')
@@ -0,0 +1,204 @@
+"""
+Save-time derivatives of ``Post.description`` (raw CKEditor HTML).
+
+``derive`` parses the HTML once and returns the columns stored next to it:
+allowlist-sanitized HTML with image URLs pointed at resized variants, the
+plain text, and the excerpt and reading time computed from that text.
+``refresh_content`` recomputes them for existing posts, in parallel chunks.
+"""
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from html.parser import HTMLParser
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Max
+
+from .utils import compute_excerpt, compute_reading_time
+
+DERIVED_FIELDS = ('description_html', 'description_text', 'excerpt', 'reading_time')
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'code', 'del', 'div', 'em', 'figcaption', 'figure',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'ins', 'li', 'ol', 'p', 'pre', 's', 'small', 'span',
+    'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'abbr': {'title'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan', 'scope'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'http', 'https', 'mailto'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Dropped together with everything inside them.
+DROPPED_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript', 'svg', 'math', 'textarea'}
+# Tags that separate words in the plain text.
+BLOCK_TAGS = {
+    'blockquote', 'br', 'caption', 'div', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr',
+    'li', 'ol', 'p', 'pre', 'table', 'td', 'th', 'tr', 'ul',
+}
+# Open tags that a start tag closes implicitly, as HTML parsers do: "<li>a<li>b".
+IMPLIED_END = {
+    'li': {'li'},
+    'td': {'td', 'th'},
+    'th': {'td', 'th'},
+    'tr': {'tr', 'td', 'th'},
+    **{tag: {'p'} for tag in BLOCK_TAGS - {'br', 'caption', 'figcaption', 'li', 'td', 'th', 'tr'}},
+}
+
+SCHEME = re.compile(r'^([a-z][a-z0-9+.-]*):')
+# Browsers ignore these anywhere in a URL, e.g. "java\tscript:".
+URL_IGNORED = re.compile(r'[\x00-\x20\x7f]+')
+
+
+def safe_url(value):
+    scheme = SCHEME.match(URL_IGNORED.sub('', value).lower())
+    return scheme is None or scheme.group(1) in ALLOWED_SCHEMES
+
+
+def image_variants(src):
+    """
+    ``src`` and ``srcset`` for an uploaded image, served through
+    ``CONTENT_IMAGE_URL``; None for other images or when it is not set.
+    """
+    template = settings.CONTENT_IMAGE_URL
+    if not template or not src.startswith(settings.MEDIA_URL):
+        return None
+    path = src[len(settings.MEDIA_URL):]
+    widths = settings.CONTENT_IMAGE_WIDTHS
+    srcset = ', '.join(f'{template.format(path=path, width=width)} {width}w' for width in widths)
+    return template.format(path=path, width=widths[-1]), srcset
+
+
+class ContentParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open = []
+        self.dropping = None
+        self.depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.dropping:
+            if tag == self.dropping:
+                self.depth += 1
+            return
+        if tag in DROPPED_TAGS:
+            self.dropping, self.depth = tag, 1
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in ALLOWED_TAGS:
+            return
+
+        allowed = ALLOWED_ATTRIBUTES.get(tag, ())
+        kept = {}
+        for name, value in attrs:
+            if name in allowed and value is not None and (name not in URL_ATTRIBUTES or safe_url(value)):
+                kept[name] = value
+        if tag == 'a' and 'href' in kept:
+            kept['rel'] = 'nofollow noopener'
+        if tag == 'img':
+            if 'src' not in kept:
+                return
+            variants = image_variants(kept['src'])
+            if variants:
+                kept['src'], kept['srcset'] = variants
+                kept['sizes'] = '100vw'
+            kept['loading'] = 'lazy'
+            kept['decoding'] = 'async'
+
+        while self.open and self.open[-1] in IMPLIED_END.get(tag, ()):
+            self.html.append(f'</{self.open.pop()}>')
+        rendered = ''.join(f' {name}="{escape(value)}"' for name, value in kept.items())
+        self.html.append(f'<{tag}{rendered}>')
+        if tag not in VOID_TAGS:
+            self.open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.dropping:
+            if tag == self.dropping:
+                self.depth -= 1
+                if not self.depth:
+                    self.dropping = None
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in self.open:
+            return
+        # Close whatever was left open inside it, so the output stays balanced.
+        while True:
+            name = self.open.pop()
+            self.html.append(f'</{name}>')
+            if name == tag:
+                return
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        while self.open:
+            self.html.append(f'</{self.open.pop()}>')
+
+
+def derive(description):
+    """The ``DERIVED_FIELDS`` values for a raw description."""
+    parser = ContentParser()
+    parser.feed(description or '')
+    parser.close()
+    text = ' '.join(''.join(parser.text).split())
+    return {
+        'description_html': ''.join(parser.html),
+        'description_text': text,
+        'excerpt': compute_excerpt(text),
+        'reading_time': compute_reading_time(text),
+    }
+
+
+def refresh_chunk(lo, hi):
+    """Recompute the derived columns of posts with ids in ``(lo, hi]``; returns the posts updated."""
+    from .models import Post
+
+    with transaction.atomic():
+        posts = [
+            Post(pk=pk, **derive(description))
+            for pk, description in (
+                # Locked, so a concurrent save's fresh values are not overwritten with stale ones.
+                Post.objects.select_for_update().filter(pk__gt=lo, pk__lte=hi).values_list('pk', 'description')
+            )
+        ]
+        # bulk_update leaves updated_at alone: the text itself did not change.
+        Post.objects.bulk_update(posts, DERIVED_FIELDS)
+    return len(posts)
+
+
+def refresh_content(chunk_size=500, workers=1):
+    """
+    Recompute every post's derived columns in id-range chunks. Parsing is CPU
+    bound, so with ``workers`` > 1 the chunks run in forked processes.
+    """
+    from .models import Post
+
+    hi = Post.objects.aggregate(hi=Max('pk'))['hi'] or 0
+    chunks = [(lo, min(lo + chunk_size, hi)) for lo in range(0, hi, chunk_size)]
+    if workers > 1:
+        # Children are forked so they inherit the configured Django; none may share our connection.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            return sum(pool.map(refresh_chunk, *zip(*chunks))) if chunks else 0
+    return sum(refresh_chunk(lo, hi) for lo, hi in chunks)
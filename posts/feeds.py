@@ -0,0 +1,209 @@
+"""
+RSS/Atom feeds (all posts, per category, per author) and the post sitemap.
+
+Every view sits behind ``cache_response`` and ``condition()``: Last-Modified
+and the ETag come from the newest ``updated_at`` and the row count of the
+posts it lists, and cached copies are dropped by the ``bust_cache`` job that
+posts/signals.py queues on every post and category change.
+"""
+import hashlib
+from io import BytesIO
+from itertools import chain
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.db.models import Count, F, Max
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.decorators.http import condition
+
+from accounts.models import User
+from blog.cache import cache_response
+from .models import Category, Post
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def published_posts():
+    return Post.objects.filter(status='published')
+
+
+def cached(view, posts):
+    """
+    Wrap ``view`` in the response cache and in conditional GET handling based
+    on ``posts(**url_kwargs)``, the queryset the view lists.
+    """
+    def stamp(request, *args, **kwargs):
+        if not hasattr(request, '_posts_stamp'):
+            request._posts_stamp = posts(*args, **kwargs).order_by().aggregate(
+                latest=Max('updated_at'), total=Count('pk')
+            )
+        return request._posts_stamp
+
+    def last_modified(request, *args, **kwargs):
+        return stamp(request, *args, **kwargs)['latest']
+
+    def etag(request, *args, **kwargs):
+        row = stamp(request, *args, **kwargs)
+        return hashlib.md5(f"{request.path}|{row['latest']}|{row['total']}".encode()).hexdigest()
+
+    return cache_response(key_prefix='feeds', public=True)(condition(etag_func=etag, last_modified_func=last_modified)(view))
+
+
+def latest(posts):
+    return (
+        posts.select_related('user')
+        .prefetch_related('categories')
+        .only('title', 'slug', 'excerpt', 'created_at', 'updated_at', 'user__username', 'user__full_name')
+        .order_by('-created_at')[:settings.FEED_SIZE]
+        .iterator(chunk_size=settings.FEED_SIZE)
+    )
+
+
+class PostsFeed(Feed):
+    title = "Latest posts"
+    description = "Newest published posts."
+
+    def posts(self):
+        return published_posts()
+
+    def link(self):
+        return reverse('post-list-create')
+
+    def items(self):
+        return latest(self.posts())
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_link(self, item):
+        return reverse('post-detail', kwargs={'slug': item.slug})
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.user and (item.user.full_name or item.user.username)
+
+    def item_categories(self, item):
+        return [category.title for category in item.categories.all()]
+
+
+class CategoryPostsFeed(PostsFeed):
+    def posts(self, slug):
+        return published_posts().filter(categories__slug=slug)
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Category, slug=slug)
+
+    def title(self, obj):
+        return f"Latest posts in {obj.title}"
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('category-posts', kwargs={'slug': obj.slug})
+
+    def items(self, obj):
+        return latest(self.posts(obj.slug))
+
+
+class AuthorPostsFeed(PostsFeed):
+    def posts(self, username):
+        return published_posts().filter(user__username=username)
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f"Latest posts by {obj.full_name or obj.username}"
+
+    def description(self, obj):
+        return f"Newest published posts by {obj.username}."
+
+    def link(self, obj):
+        return reverse('author-posts', kwargs={'username': obj.username})
+
+    def items(self, obj):
+        return latest(self.posts(obj.username))
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+def feed_views(feed_class):
+    """RSS and Atom views of ``feed_class``."""
+    atom_class = type(f'Atom{feed_class.__name__}', (AtomFeedMixin, feed_class), {})
+    rss, atom = feed_class(), atom_class()
+    return cached(rss, rss.posts), cached(atom, atom.posts)
+
+
+def sitemap_posts(page):
+    # Pages are pk ranges, so each one is a bounded primary key range scan
+    # however deep it is; pages hold at most SITEMAP_PAGE_SIZE posts.
+    size = settings.SITEMAP_PAGE_SIZE
+    return published_posts().filter(pk__gt=(page - 1) * size, pk__lte=page * size)
+
+
+def render_xml(write):
+    # Buffered rather than streamed: cache_response stores (and precompresses)
+    # whole bodies, and CompressionMiddleware leaves streaming responses alone.
+    # SITEMAP_PAGE_SIZE bounds the buffer instead. Encoded as it is written, so
+    # the document is held once, as bytes.
+    stream = BytesIO()
+    xml = SimplerXMLGenerator(stream, 'utf-8')
+    xml.startDocument()
+    write(xml)
+    xml.endDocument()
+    return HttpResponse(stream.getvalue(), content_type='application/xml; charset=utf-8')
+
+
+def sitemap_index(request):
+    pages = (
+        published_posts().order_by()
+        .annotate(page=(F('pk') - 1) / settings.SITEMAP_PAGE_SIZE + 1)
+        .values('page').annotate(lastmod=Max('updated_at')).order_by('page')
+    )
+
+    def write(xml):
+        xml.startElement('sitemapindex', {'xmlns': SITEMAP_NS})
+        for row in pages:
+            xml.startElement('sitemap', {})
+            xml.addQuickElement('loc', request.build_absolute_uri(reverse('sitemap-posts', kwargs={'page': row['page']})))
+            xml.addQuickElement('lastmod', row['lastmod'].isoformat())
+            xml.endElement('sitemap')
+        xml.endElement('sitemapindex')
+    return render_xml(write)
+
+
+def sitemap_page(request, page):
+    rows = sitemap_posts(page).order_by('pk').values_list('slug', 'updated_at').iterator(chunk_size=2000)
+    first = next(rows, None)
+    if first is None:
+        raise Http404("No such sitemap page.")
+
+    # One reverse() per page rather than per post.
+    location = request.build_absolute_uri(reverse('post-detail', kwargs={'slug': 'SLUG'}))
+
+    def write(xml):
+        xml.startElement('urlset', {'xmlns': SITEMAP_NS})
+        for slug, updated_at in chain([first], rows):
+            xml.startElement('url', {})
+            xml.addQuickElement('loc', location.replace('SLUG', slug))
+            xml.addQuickElement('lastmod', updated_at.isoformat())
+            xml.endElement('url')
+        xml.endElement('urlset')
+    return render_xml(write)
@@ -0,0 +1,12 @@
+from django.core.cache import caches
+from jobs.queue import job
+
+
+@job(dedup_key='posts.bust_cache', retries=5)
+def bust_cache():
+    from django_redis import get_redis_connection
+
+    conn = get_redis_connection("default")
+    for key in conn.scan_iter("mbapi:*"):
+        conn.delete(key)
+    caches["responses"].invalidate()
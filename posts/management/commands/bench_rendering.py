@@ -0,0 +1,124 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import User
+from blog.renderers import FastJSONRenderer
+from comments.models import Comment
+from comments.views import CommentView
+from posts.models import Post, Category, PostLike
+from posts.utils import compute_excerpt
+from posts.views import PostListCreateAPIView
+
+
+class Command(BaseCommand):
+    help = "Benchmark DRF serialization + JSON rendering against the compiled/orjson fast path."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument(
+            "--create", type=int, default=0,
+            help="Create this many sample posts (with comments and likes) in a transaction that is rolled back.",
+        )
+
+    def handle(self, *args, **options):
+        # APIRequestFactory requests come from "testserver"; absolute image URLs need it allowed.
+        with override_settings(ALLOWED_HOSTS=["testserver"]), transaction.atomic():
+            if options["create"]:
+                self.create_sample_data(options["create"])
+            self.bench_posts(options)
+            self.bench_comments(options)
+            transaction.set_rollback(True)
+
+    def build_view(self, view_class, path, **kwargs):
+        request = APIRequestFactory().get(path)
+        view = view_class()
+        view.setup(request, **kwargs)
+        view.request = view.initialize_request(request)
+        view.format_kwarg = None
+        return view
+
+    def bench_posts(self, options):
+        view = self.build_view(PostListCreateAPIView, "/posts/")
+        queryset = view.filter_queryset(view.get_queryset()).order_by("-created_at")[: options["page_size"]]
+        self.compare("posts", view, queryset, options["iterations"])
+
+    def bench_comments(self, options):
+        # The post with the most approved comments, so runs are comparable.
+        post = (
+            Post.objects.annotate(total=Count("comments", filter=Q(comments__is_approved=True)))
+            .filter(total__gt=0).order_by("-total", "pk").first()
+        )
+        if post is None:
+            self.stdout.write("comments: no approved comments, skipped")
+            return
+        view = self.build_view(CommentView, f"/comments/{post.slug}/", post_slug=post.slug)
+        queryset = view.filter_queryset(view.get_queryset())[: options["page_size"]]
+        self.compare("comments", view, queryset, options["iterations"])
+
+    def compare(self, label, view, queryset, iterations):
+        serializer_class = view.get_serializer_class()
+        compiled_class = view.compiled_serializer_class
+        context = view.get_serializer_context()
+        renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+
+        # Both sides query on every call: list(queryset) alone would be served from its result cache.
+        def baseline():
+            return renderer.render(serializer_class(list(queryset.all()), many=True, context=context).data)
+
+        def fast():
+            compiled = compiled_class(context=context)
+            return fast_renderer.render(compiled.to_representation(compiled.values(queryset)))
+
+        expected, actual = baseline(), fast()
+        if expected != actual:
+            raise CommandError(f"{label}: fast path output differs from DRF output")
+
+        baseline_ms = self.timeit(baseline, iterations)
+        fast_ms = self.timeit(fast, iterations)
+        self.stdout.write(
+            f"{label}: {len(expected)} bytes, drf {baseline_ms:.2f} ms, fast {fast_ms:.2f} ms, "
+            f"speedup x{baseline_ms / fast_ms:.1f} (output identical)"
+        )
+
+    def timeit(self, func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) * 1000 / iterations
+
+    def create_sample_data(self, count):
+        users = User.objects.bulk_create(
+            User(phone=f"09{9000000 + i:09d}", username=f"bench-{i}", full_name=f"Bench {i}", age=30)
+            for i in range(max(count // 5, 2))
+        )
+        category = Category.objects.create(title="Bench", slug="bench-rendering", description="")
+        description = "<p>" + "lorem ipsum dolor sit amet " * 80 + "</p>"
+        posts = Post.objects.bulk_create(
+            Post(
+                title=f"Bench post {i}", slug=f"bench-post-{i}", image=f"posts/bench/{i}.jpg",
+                description=description, excerpt=compute_excerpt(description), status="published",
+                user=users[i % len(users)],
+            )
+            for i in range(count)
+        )
+        Post.categories.through.objects.bulk_create(
+            Post.categories.through(post=post, category=category) for post in posts
+        )
+        PostLike.objects.bulk_create(
+            PostLike(post=post, user=user, value="like") for post in posts for user in users[:3]
+        )
+        top = Comment.objects.bulk_create(
+            Comment(post=posts[0], user=users[i % len(users)], content=f"comment {i}", is_approved=True)
+            for i in range(count)
+        )
+        Comment.objects.bulk_create(
+            Comment(post=posts[0], user=users[0], content="reply", is_approved=True, parent=parent, level=2)
+            for parent in top
+        )
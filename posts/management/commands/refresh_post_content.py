@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.content import refresh_content
+from posts.jobs import bust_cache
+
+
+class Command(BaseCommand):
+    help = "Recompute the sanitized HTML, plain text, excerpt and reading time of every post."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Posts per transaction.")
+        parser.add_argument("--workers", type=int, default=1, help="Parallel processes.")
+
+    def handle(self, *args, **options):
+        updated = refresh_content(options["chunk_size"], options["workers"])
+        bust_cache()
+        self.stdout.write(f"{updated} posts refreshed")
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from posts.utils import html_to_text, compute_excerpt, compute_reading_time
+
+
+def backfill_post_summary(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    batch = []
+    for post in Post.objects.only('id', 'description').iterator(chunk_size=500):
+        text = html_to_text(post.description)
+        post.excerpt = compute_excerpt(text)
+        post.reading_time = compute_reading_time(text)
+        batch.append(post)
+        if len(batch) >= 500:
+            Post.objects.bulk_update(batch, ['excerpt', 'reading_time'])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ['excerpt', 'reading_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_postlike'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_post_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:30
+
+from django.db import migrations, models
+from django.db.models import Func, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_category_post_stats(apps, schema_editor):
+    Category = apps.get_model('posts', 'Category')
+    Post = apps.get_model('posts', 'Post')
+    published = Post.objects.filter(categories=OuterRef('pk'), status='published').order_by()
+    Category.objects.update(
+        posts_count=Coalesce(
+            Subquery(published.annotate(total=Func('pk', function='COUNT')).values('total')[:1]), 0
+        ),
+        last_post_at=Subquery(published.order_by('-created_at').values('created_at')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_backfill_post_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='last_post_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_category_post_stats, migrations.RunPython.noop),
+    ]
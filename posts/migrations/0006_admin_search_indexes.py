@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Admin prefix searches compile to UPPER("col"::text) LIKE UPPER('term%');
+# these expression indexes serve them on PostgreSQL.
+INDEXES = [
+    ('posts_post_title_upper_like', 'title'),
+    ('posts_post_slug_upper_like', 'slug'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('posts', 'Post')._meta.db_table)
+    for name, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+            f'ON {table} ((UPPER({schema_editor.quote_name(column)}::text)) text_pattern_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('posts', '0005_category_post_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='unique_viewers',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# /search/suggest/ matches category titles with UPPER("title"::text) LIKE
+# UPPER('term%'), like the post title index from 0006.
+INDEX = 'posts_category_title_upper_like'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('posts', 'Category')._meta.db_table)
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX} '
+        f'ON {table} ((UPPER({schema_editor.quote_name("title")}::text)) text_pattern_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('posts', '0007_unique_viewers'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from posts.content import DERIVED_FIELDS, derive
+
+
+def backfill_description_derivatives(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    batch = []
+    for post in Post.objects.only('id', 'description').iterator(chunk_size=500):
+        for field, value in derive(post.description).items():
+            setattr(post, field, value)
+        batch.append(post)
+        if len(batch) >= 500:
+            Post.objects.bulk_update(batch, DERIVED_FIELDS)
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, DERIVED_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_description_derivatives'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_description_derivatives, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# /search/suggest/ returns the first titles in UPPER("title") COLLATE "C" order.
+# A C-collation expression index serves that ORDER BY as well as the
+# UPPER("title"::text) LIKE UPPER('term%') range scan, so it replaces the
+# text_pattern_ops indexes from 0006 and 0008 (which can't serve the ordering).
+INDEXES = [
+    ('Post', 'posts_post_title_upper_c', 'posts_post_title_upper_like'),
+    ('Category', 'posts_category_title_upper_c', 'posts_category_title_upper_like'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model, name, replaced in INDEXES:
+        table = schema_editor.quote_name(apps.get_model('posts', model)._meta.db_table)
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+            f'ON {table} ((UPPER({schema_editor.quote_name("title")}::text)) COLLATE "C")'
+        )
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {replaced}')
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model, name, replaced in INDEXES:
+        table = schema_editor.quote_name(apps.get_model('posts', model)._meta.db_table)
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {replaced} '
+            f'ON {table} ((UPPER({schema_editor.quote_name("title")}::text)) text_pattern_ops)'
+        )
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('posts', '0011_backfill_description_derivatives'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,33 @@
+from blog.compiled import CompiledListMixin
+from .serializers import PostSummarySerializer, CompiledPostSummarySerializer
+from .utils import parse_fields_param
+
+
+class PostSummaryListMixin(CompiledListMixin):
+    summary_serializer_class = PostSummarySerializer
+    compiled_serializer_class = CompiledPostSummarySerializer
+    summary_required_columns = ('id', 'slug', 'user')
+
+    def get_serializer_class(self):
+        request = getattr(self, 'request', None)
+        if request is not None and request.method == 'GET':
+            return self.summary_serializer_class
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method != 'GET':
+            return queryset
+        return self.apply_sparse_fieldset(queryset)
+
+    def apply_sparse_fieldset(self, queryset):
+        fields = parse_fields_param(self.request)
+        if not fields or 'categories' in fields:
+            # One query for the whole page instead of one per post.
+            queryset = queryset.prefetch_related('categories')
+        if not fields:
+            return queryset.defer('description')
+        columns = {f.name for f in queryset.model._meta.concrete_fields}
+        allowed = set(self.summary_serializer_class.Meta.fields)
+        selected = (fields & allowed & columns) | set(self.summary_required_columns)
+        return queryset.only(*selected)
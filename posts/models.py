@@ -1,7 +1,11 @@
-from django.db import models
-from accounts.models import User
+from collections import Counter
+from django.db import models, transaction
+from django.db.models import Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from accounts.models import AuthorStats, User
 from ckeditor.fields import RichTextField
 from django.utils.text import slugify
+from .content import DERIVED_FIELDS, derive
 
 
 class Post(models.Model):
@@ -15,6 +19,9 @@ class Post(models.Model):
     slug = models.SlugField(unique=True)
     image = models.ImageField(upload_to='posts/%Y/%m/%d/')
     description = RichTextField()
+    # Derived from description on save (posts/content.py).
+    description_html = models.TextField(blank=True, default='', editable=False)
+    description_text = models.TextField(blank=True, default='', editable=False)
     reading_time = models.PositiveSmallIntegerField(default=1)
     categories = models.ManyToManyField('Category', related_name='posts')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
@@ -23,25 +30,74 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     views_count = models.PositiveIntegerField(default=0)
+    # Approximate distinct viewers (HyperLogLog), refreshed by the daily rollup.
+    unique_viewers = models.PositiveIntegerField(default=0, editable=False)
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'description' in update_fields:
+            self.refresh_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *DERIVED_FIELDS}
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def refresh_content(self):
+        for name, value in derive(self.description).items():
+            setattr(self, name, value)
+
     class Meta:
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
         ordering = ['-created_at']
+        indexes = [
+            # Newest published posts first: feeds and the post list.
+            models.Index(fields=['-created_at'], name='post_published_created_idx', condition=Q(status='published')),
+        ]
 
     def __str__(self):
         return self.title
 
 
+def engagement_counts():
+    """
+    ``comments_count`` / ``likes_count`` annotations as per-post correlated
+    subqueries. Unlike JOIN + COUNT(DISTINCT) they don't multiply rows, and
+    each lookup is keyed by post_id (plus a created_at lower bound for
+    comments), so partitioned PostLike/Comment tables are pruned at run time.
+    """
+    from comments.models import Comment
+
+    comments = Comment.objects.filter(
+        post=OuterRef('pk'), is_approved=True, created_at__gte=OuterRef('created_at')
+    ).order_by()
+    likes = PostLike.objects.filter(post=OuterRef('pk'), value='like').order_by()
+    return {
+        'comments_count': Coalesce(Subquery(comments.annotate(total=Func('pk', function='COUNT')).values('total')[:1]), 0),
+        'likes_count': Coalesce(Subquery(likes.annotate(total=Func('pk', function='COUNT')).values('total')[:1]), 0),
+    }
+
+
+def viewer_vote(user):
+    """``my_vote`` annotation: the viewer's 'like'/'dislike' on each post, NULL for anonymous users."""
+    if not user.is_authenticated:
+        return Value(None, output_field=models.CharField())
+    return Subquery(PostLike.objects.filter(post=OuterRef('pk'), user=user).order_by().values('value')[:1])
+
+
 class Category(models.Model):
     title = models.CharField(max_length=50)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+    last_post_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = 'Category'
@@ -52,10 +108,24 @@ class Category(models.Model):
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
 
+    @classmethod
+    def refresh_post_stats(cls, pks):
+        published = Post.objects.filter(categories=OuterRef('pk'), status='published').order_by()
+        cls.objects.filter(pk__in=pks).update(
+            posts_count=Coalesce(
+                Subquery(published.annotate(total=Func('pk', function='COUNT')).values('total')[:1]), 0
+            ),
+            last_post_at=Subquery(published.order_by('-created_at').values('created_at')[:1]),
+        )
+
     def __str__(self):
         return self.title
 
 
+# The AuthorStats counter of each vote value.
+VOTE_FIELDS = {'like': 'likes', 'dislike': 'dislikes'}
+
+
 class PostLike(models.Model):
     VALUE_CHOICES = [
         ('like', 'Like'),
@@ -73,5 +143,30 @@ class PostLike(models.Model):
             models.UniqueConstraint(fields=['user', 'post'], name='unique_user_post_vote')
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_value = instance.__dict__.get('value')
+        return instance
+
+    @classmethod
+    def delete_votes(cls, queryset):
+        """
+        Delete ``queryset`` with one DELETE instead of per-vote signals, adjusting
+        AuthorStats once per author. Returns the number deleted.
+        """
+        with transaction.atomic():
+            rows = list(
+                cls.objects.filter(pk__in=queryset.values('pk'))
+                .select_for_update(of=('self',))
+                .values_list('pk', 'post__user_id', 'value')
+            )
+            # Nothing listens for PostLike deletes (posts/signals.py), so this is a fast delete.
+            cls.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+            deltas = Counter((user_id, value) for _, user_id, value in rows)
+            for (user_id, value), count in deltas.items():
+                AuthorStats.bump(user_id, rebuild=False, **{VOTE_FIELDS[value]: -count})
+        return len(rows)
+
     def __str__(self):
         return f"{self.user.username} - {self.post.title} - {self.value}"
\ No newline at end of file
@@ -8,3 +8,10 @@ class IsOwnerOrReadOnly(BasePermission):
             getattr(obj, "user_id", None) == getattr(request.user, "id", None)
             or getattr(request.user, "is_staff", False)
         )
+
+
+class IsOwnerOrStaff(BasePermission):
+    message = "Only the author can view this post's analytics."
+
+    def has_object_permission(self, request, view, obj):
+        return obj.user_id == request.user.id or request.user.is_staff
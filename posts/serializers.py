@@ -1,15 +1,28 @@
 from rest_framework import serializers
-from .models import Post
+from .models import Post, Category, PostLike
+from .utils import parse_fields_param
+from blog.compiled import CompiledSerializer
 from accounts.models import User, Follow
 
 
+class SparseFieldsetMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = parse_fields_param(self.context.get('request'))
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
 class PostSerializer(serializers.ModelSerializer):
     comments_count = serializers.IntegerField(read_only=True)
     likes_count = serializers.IntegerField(read_only=True)
+    my_vote = serializers.ChoiceField(choices=PostLike.VALUE_CHOICES, read_only=True, allow_null=True)
 
     class Meta:
         model = Post
-        exclude = ('user',)
+        exclude = ('user', 'description_text')
+        read_only_fields = ('excerpt', 'reading_time', 'description_html')
 
     def create(self, validated_data):
         user = self.context['request'].user
@@ -17,6 +30,35 @@ class PostSerializer(serializers.ModelSerializer):
         return Post.objects.create(**validated_data)
 
 
+class PostSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    comments_count = serializers.IntegerField(read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
+    my_vote = serializers.ChoiceField(choices=PostLike.VALUE_CHOICES, read_only=True, allow_null=True)
+
+    class Meta:
+        model = Post
+        fields = (
+            'id', 'title', 'slug', 'image', 'excerpt', 'reading_time', 'status',
+            'categories', 'created_at', 'updated_at', 'views_count',
+            'comments_count', 'likes_count', 'my_vote',
+        )
+        read_only_fields = fields
+
+
+class CategorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ('id', 'title', 'slug', 'description', 'posts_count', 'last_post_at')
+
+
+class CompiledPostSerializer(CompiledSerializer):
+    serializer_class = PostSerializer
+
+
+class CompiledPostSummarySerializer(CompiledSerializer):
+    serializer_class = PostSummarySerializer
+
+
 class AuthorSerializer(serializers.ModelSerializer):
     followers_count = serializers.SerializerMethodField()
 
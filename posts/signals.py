@@ -1,23 +1,108 @@
-from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.db.models import Count, Q
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from django_redis import get_redis_connection
-from .models import Post, Category
-
-def bust_cache():
-    conn = get_redis_connection("default")
-    for key in conn.scan_iter("mbapi:*"):
-        conn.delete(key)
+from .models import Post, Category, PostLike, VOTE_FIELDS
+from .jobs import bust_cache
+from accounts.models import AuthorStats, User
 
 @receiver(post_save, sender=Post)
 @receiver(post_delete, sender=Post)
 def clear_cache_on_post_change(sender, instance, **kwargs):
-    bust_cache()
+    bust_cache.delay()
 
 @receiver(m2m_changed, sender=Post.categories.through)
 def clear_cache_on_category_change(sender, instance, **kwargs):
-    bust_cache()
+    bust_cache.delay()
 
 @receiver(post_save, sender=Category)
 @receiver(post_delete, sender=Category)
 def clear_cache_on_category_update(sender, instance, **kwargs):
-    bust_cache()
+    bust_cache.delay()
+
+
+@receiver(post_save, sender=Post)
+def update_category_stats_on_post_save(sender, instance, created, **kwargs):
+    # Category stats only count published posts, so edits that keep the status skip
+    # the recount. Connected before update_author_stats_on_post_save, which moves
+    # _loaded_status on to the saved status.
+    if not created and getattr(instance, '_loaded_status', None) != instance.status:
+        Category.refresh_post_stats(instance.categories.values('pk'))
+
+@receiver(pre_delete, sender=Post)
+def remember_post_categories(sender, instance, **kwargs):
+    instance._category_pks = list(instance.categories.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=Post)
+def update_category_stats_on_post_delete(sender, instance, **kwargs):
+    Category.refresh_post_stats(getattr(instance, '_category_pks', []))
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def update_category_stats_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        instance._category_pks = [instance.pk] if reverse else list(instance.categories.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        Category.refresh_post_stats([instance.pk] if reverse else pk_set)
+    elif action == 'post_clear':
+        Category.refresh_post_stats(getattr(instance, '_category_pks', []))
+
+
+def deleted_with(origin, model):
+    """Whether a delete started from ``model`` instances (``origin`` is the instance or queryset deleted)."""
+    return isinstance(origin, model) or getattr(origin, 'model', None) is model
+
+@receiver(post_save, sender=Post)
+def update_author_stats_on_post_save(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_status', None)
+    if not created and previous is None:
+        if instance.user_id:
+            AuthorStats.rebuild(instance.user_id)
+    elif previous != instance.status:
+        deltas = {f'posts_{instance.status}': 1}
+        if previous:
+            deltas[f'posts_{previous}'] = -1
+        AuthorStats.bump(instance.user_id, **deltas)
+    instance._loaded_status = instance.status
+
+# Deletes adjust the counters once per post or user, from pre_delete: receivers on
+# PostLike or Comment themselves would run per row and stop Django from
+# fast-deleting them. Single votes and comments are deleted through
+# PostLike.delete_votes and Comment.delete_comments (the admin does), which
+# rely on those fast deletes: add no PostLike or Comment delete receivers.
+@receiver(pre_delete, sender=Post)
+def update_author_stats_on_post_delete(sender, instance, origin=None, **kwargs):
+    # The author's own row goes with the author.
+    if not instance.user_id or deleted_with(origin, User):
+        return
+    # Read back rather than taken from the instance, which may be stale.
+    row = (
+        Post.objects.filter(pk=instance.pk)
+        .annotate(**{field: Count('postlike', filter=Q(postlike__value=value)) for value, field in VOTE_FIELDS.items()})
+        .values('status', 'views_count', *VOTE_FIELDS.values())
+        .first()
+    )
+    if row is None:
+        return
+    AuthorStats.bump(
+        instance.user_id, rebuild=False,
+        total_views=-row.pop('views_count'), **{f"posts_{row.pop('status')}": -1},
+        **{field: -total for field, total in row.items()},
+    )
+
+@receiver(pre_delete, sender=User)
+def update_author_stats_on_voter_delete(sender, instance, **kwargs):
+    votes = (
+        PostLike.objects.filter(user=instance).exclude(post__user=instance)
+        .values_list('post__user_id', 'value').annotate(total=Count('pk')).order_by()
+    )
+    for author_id, value, total in votes:
+        AuthorStats.bump(author_id, rebuild=False, **{VOTE_FIELDS[value]: -total})
+
+@receiver(post_save, sender=PostLike)
+def update_author_stats_on_vote(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_value', None)
+    if previous != instance.value:
+        deltas = {VOTE_FIELDS[instance.value]: 1}
+        if previous:
+            deltas[VOTE_FIELDS[previous]] = -1
+        AuthorStats.bump(instance.post.user_id, **deltas)
+    instance._loaded_value = instance.value
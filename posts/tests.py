@@ -1,3 +1,109 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from accounts.models import User
+from .jobs import bust_cache
+from .models import Category, Post, PostLike
+
+
+class CachedPostListVoteTests(TestCase):
+    """The shared /posts/ entry is filled in per user and never leaks a vote."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(phone='09000000001', username='author', age=30, password='x')
+        cls.liker = User.objects.create_user(phone='09000000002', username='liker', age=30, password='x')
+        cls.disliker = User.objects.create_user(phone='09000000003', username='disliker', age=30, password='x')
+        cls.post = Post.objects.create(
+            title='Hot post', description='<p>Body</p>', status='published', user=cls.author, image='posts/x.jpg',
+        )
+        PostLike.objects.create(post=cls.post, user=cls.liker, value='like')
+        PostLike.objects.create(post=cls.post, user=cls.disliker, value='dislike')
+
+    def setUp(self):
+        bust_cache()
+
+    def client_for(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def get_vote(self, user=None):
+        response = self.client_for(user).get(reverse('post-list-create'))
+        self.assertEqual(response.status_code, 200)
+        [row] = [row for row in response.json()['results'] if row['id'] == self.post.pk]
+        return response, row['my_vote']
+
+    def test_each_user_gets_their_own_vote(self):
+        response, vote = self.get_vote()
+        self.assertIsNone(vote)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        response, vote = self.get_vote(self.liker)
+        self.assertEqual(vote, 'like')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        response, vote = self.get_vote(self.disliker)
+        self.assertEqual(vote, 'dislike')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        response, vote = self.get_vote(self.author)
+        self.assertIsNone(vote)
+
+        response, vote = self.get_vote()
+        self.assertIsNone(vote)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_personalized_responses_are_not_reused(self):
+        self.get_vote()
+        response, _ = self.get_vote(self.liker)
+        cache_control = {part.strip() for part in response['Cache-Control'].split(',')}
+        self.assertIn('private', cache_control)
+        self.assertIn('no-cache', cache_control)
+        self.assertFalse(any(part.startswith('max-age') for part in cache_control))
+        self.assertFalse(response.has_header('Expires'))
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIn('Authorization', response['Vary'])
+
+
+class CategoryStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(phone='09000000011', username='writer', age=30, password='x')
+        cls.category = Category.objects.create(title='News')
+        cls.post = Post.objects.create(
+            title='Post', description='<p>Body</p>', status='draft', user=cls.author, image='posts/x.jpg',
+        )
+        cls.post.categories.add(cls.category)
+
+    def save(self, post):
+        table = Category._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+        return [query['sql'] for query in queries if query['sql'].startswith(f'UPDATE "{table}"')]
+
+    def test_status_change_refreshes_counts(self):
+        post = Post.objects.get(pk=self.post.pk)
+        post.status = 'published'
+        self.assertTrue(self.save(post))
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.posts_count, 1)
+
+        post.status = 'private'
+        self.assertTrue(self.save(post))
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.posts_count, 0)
+
+    def test_other_edits_skip_the_recount(self):
+        post = Post.objects.get(pk=self.post.pk)
+        post.status = 'published'
+        post.save()
+        post.description = '<p>Edited</p>'
+        self.assertEqual(self.save(post), [])
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.posts_count, 1)
@@ -1,14 +1,25 @@
 from django.urls import path
 from . import views
-from django.views.decorators.cache import cache_page
-from django.conf import settings
+from .feeds import AuthorPostsFeed, CategoryPostsFeed, PostsFeed, feed_views
+from blog.cache import cache_response
+
+posts_rss, posts_atom = feed_views(PostsFeed)
+category_rss, category_atom = feed_views(CategoryPostsFeed)
+author_rss, author_atom = feed_views(AuthorPostsFeed)
 
 urlpatterns = [
     path("my-posts/", views.MyPostsListAPIView.as_view(), name="my-posts"),
+    path("feed/rss/", posts_rss, name="posts-rss"),
+    path("feed/atom/", posts_atom, name="posts-atom"),
+    path("category/<slug:slug>/feed/rss/", category_rss, name="category-rss"),
+    path("category/<slug:slug>/feed/atom/", category_atom, name="category-atom"),
+    path("author/<str:username>/feed/rss/", author_rss, name="author-rss"),
+    path("author/<str:username>/feed/atom/", author_atom, name="author-atom"),
     path("author/<str:username>/", views.AuthorPostsAPIView.as_view(), name="author-posts"),
-    path("category/<slug:slug>/", cache_page(settings.CACHE_TTL)(views.CategoryPostsAPIView.as_view()), name="category-posts"),
+    path("categories/", cache_response(public=True)(views.CategoryListAPIView.as_view()), name="category-list"),
+    path("category/<slug:slug>/", cache_response(personalize=views.fill_my_vote)(views.CategoryPostsAPIView.as_view()), name="category-posts"),
     path("<slug:slug>/like/", views.LikePostView.as_view(), name="post-like"),
-    path("", cache_page(settings.CACHE_TTL)(views.PostListCreateAPIView.as_view()), name="post-list-create"),
+    path("", cache_response(personalize=views.fill_my_vote)(views.PostListCreateAPIView.as_view()), name="post-list-create"),
     path("<slug:slug>/", views.PostDetailAPIView.as_view(), name="post-detail"),
 
 ]
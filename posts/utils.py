@@ -0,0 +1,31 @@
+import math
+from html import unescape
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 300
+
+
+def html_to_text(html):
+    text = unescape(strip_tags(html or ""))
+    return " ".join(text.split())
+
+
+def compute_reading_time(text):
+    words = len(text.split())
+    return max(1, math.ceil(words / WORDS_PER_MINUTE))
+
+
+def compute_excerpt(text, length=EXCERPT_LENGTH):
+    return Truncator(text).chars(length)
+
+
+def parse_fields_param(request, param="fields"):
+    if request is None:
+        return None
+    raw = request.query_params.get(param)
+    if not raw:
+        return None
+    fields = {name.strip() for name in raw.split(",") if name.strip()}
+    return fields or None
@@ -5,10 +5,11 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Count, Q
-from .serializers import PostSerializer, AuthorPostsSerializer
-from .models import Post, PostLike, Category
+from .serializers import PostSerializer, PostSummarySerializer, AuthorPostsSerializer, CategorySerializer
+from .mixins import PostSummaryListMixin
+from .models import Post, PostLike, Category, engagement_counts, viewer_vote
 from accounts.models import User, UserBlock
+from analytics.rollups import record_view, viewer_id
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from .permissions import IsOwnerOrReadOnly
@@ -20,7 +21,7 @@ from rest_framework import serializers
 
 
 
-class MyPostsListAPIView(ListAPIView):
+class MyPostsListAPIView(PostSummaryListMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = PostSerializer
     queryset = Post.objects.none()
@@ -28,20 +29,36 @@ class MyPostsListAPIView(ListAPIView):
     def get_queryset(self):
         return (
             Post.objects.filter(user=self.request.user)
-            .annotate(
-                comments_count=Count("comments", filter=Q(comments__is_approved=True), distinct=True),
-                likes_count=Count("postlike", filter=Q(postlike__value="like"), distinct=True),
-            )
+            .annotate(**engagement_counts(), my_vote=viewer_vote(self.request.user))
             .select_related("user")
         )
 
 
+def fill_my_vote(user, data):
+    """
+    ``cache_response`` hook for cached post lists: the user's ``my_vote`` on
+    each post of the page, with one lookup over the page's ids.
+    """
+    posts = data["results"] if isinstance(data, dict) else data
+    voted = [post for post in posts if "my_vote" in post]
+    if not voted:
+        return data
+    if any("id" not in post for post in voted):
+        return None
+    votes = dict(
+        PostLike.objects.filter(user=user, post_id__in=[post["id"] for post in voted]).values_list("post_id", "value")
+    )
+    for post in voted:
+        post["my_vote"] = votes.get(post["id"])
+    return data
+
 
 @extend_schema_view(
     get=extend_schema(
         summary="List published posts (public)",
+        description="Returns post summaries. Use `?fields=title,excerpt,image` to select a sparse fieldset.",
         tags=["posts"],
-        responses={200: PostSerializer(many=True)},
+        responses={200: PostSummarySerializer(many=True)},
     ),
     post=extend_schema(
         summary="Create a post (auth)",
@@ -50,17 +67,14 @@ class MyPostsListAPIView(ListAPIView):
         responses={201: PostSerializer, 400: OpenApiTypes.OBJECT},
     ),
 )
-class PostListCreateAPIView(ListCreateAPIView):
+class PostListCreateAPIView(PostSummaryListMixin, ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
     serializer_class = PostSerializer
     queryset = Post.objects.none()
 
     def get_queryset(self):
         qs = Post.objects.filter(status="published")
-        qs = qs.annotate(
-            comments_count=Count("comments", filter=Q(comments__is_approved=True), distinct=True),
-            likes_count=Count("postlike", filter=Q(postlike__value="like"), distinct=True),
-        ).select_related("user")
+        qs = qs.annotate(**engagement_counts(), my_vote=viewer_vote(self.request.user)).select_related("user")
         return qs
 
     def perform_create(self, serializer):
@@ -74,17 +88,21 @@ class PostDetailAPIView(RetrieveUpdateDestroyAPIView):
     queryset = Post.objects.none()
 
     def get_queryset(self):
-        return Post.objects.annotate(
-            comments_count=Count("comments", filter=Q(comments__is_approved=True), distinct=True),
-            likes_count=Count("postlike", filter=Q(postlike__value="like"), distinct=True),
-        ).select_related("user")
+        return Post.objects.annotate(**engagement_counts(), my_vote=viewer_vote(self.request.user)).select_related("user")
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        # Counted into views_count and the author's total_views by rollup_analytics.
+        record_view(instance.pk, instance.user_id, viewer_id(request))
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
 
 
 @extend_schema(
     summary="List published posts by author username (public)",
-    description="Supports search (title/description) and ordering (created_at/updated_at/comments_count/likes_count).",
+    description="Supports search (title/description), ordering (created_at/updated_at/comments_count/likes_count) and sparse fieldsets (`?fields=`).",
     tags=["posts"],
-    responses={200: PostSerializer(many=True), 404: None},
+    responses={200: PostSummarySerializer(many=True), 404: None},
     examples=[
         OpenApiExample(
             "Example request",
@@ -94,11 +112,11 @@ class PostDetailAPIView(RetrieveUpdateDestroyAPIView):
         ),
     ],
 )
-class AuthorPostsAPIView(ListAPIView):
+class AuthorPostsAPIView(PostSummaryListMixin, ListAPIView):
     permission_classes = [AllowAny]
     serializer_class = PostSerializer
     filter_backends = (SearchFilter, OrderingFilter)
-    search_fields = ["title", "description"]
+    search_fields = ["title", "description_text"]
     ordering_fields = ["updated_at", "created_at", "comments_count", "likes_count"]
     ordering = ["-updated_at"]
 
@@ -107,10 +125,7 @@ class AuthorPostsAPIView(ListAPIView):
         get_object_or_404(User, username=username)
         return (
             Post.objects.filter(user__username=username, status="published")
-            .annotate(
-                comments_count=Count("comments", filter=Q(comments__is_approved=True), distinct=True),
-                likes_count=Count("postlike", filter=Q(postlike__value="like"), distinct=True),
-            )
+            .annotate(**engagement_counts(), my_vote=viewer_vote(self.request.user))
             .select_related("user")
         )
 
@@ -155,9 +170,9 @@ class LikePostView(APIView):
 
 @extend_schema(
     summary="List posts by category slug (public)",
-    description="Supports search (title/description) and ordering (created_at/updated_at/comments_count/likes_count).",
+    description="Supports search (title/description), ordering (created_at/updated_at/comments_count/likes_count) and sparse fieldsets (`?fields=`).",
     tags=["posts"],
-    responses={200: PostSerializer(many=True), 404: None},
+    responses={200: PostSummarySerializer(many=True), 404: None},
     examples=[
         OpenApiExample(
             "Example request",
@@ -167,11 +182,11 @@ class LikePostView(APIView):
         ),
     ],
 )
-class CategoryPostsAPIView(ListAPIView):
+class CategoryPostsAPIView(PostSummaryListMixin, ListAPIView):
     permission_classes = [AllowAny]
     serializer_class = PostSerializer
     filter_backends = (SearchFilter, OrderingFilter)
-    search_fields = ["title", "description"]
+    search_fields = ["title", "description_text"]
     ordering_fields = ["updated_at", "created_at", "comments_count", "likes_count"]
     ordering = ["-updated_at"]
 
@@ -180,10 +195,18 @@ class CategoryPostsAPIView(ListAPIView):
         get_object_or_404(Category, slug=slug)
         return (
             Post.objects.filter(categories__slug=slug, status="published")
-            .annotate(
-                comments_count=Count("comments", filter=Q(comments__is_approved=True), distinct=True),
-                likes_count=Count("postlike", filter=Q(postlike__value="like"), distinct=True),
-            )
+            .annotate(**engagement_counts(), my_vote=viewer_vote(self.request.user))
             .select_related("user")
-            .prefetch_related("categories")
         )
+
+
+@extend_schema(
+    summary="List categories with published post counts (public)",
+    tags=["posts"],
+    responses={200: CategorySerializer(many=True)},
+)
+class CategoryListAPIView(ListAPIView):
+    permission_classes = [AllowAny]
+    serializer_class = CategorySerializer
+    pagination_class = None
+    queryset = Category.objects.order_by("title")
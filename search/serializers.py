@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+
+class TitleSuggestionSerializer(serializers.Serializer):
+    title = serializers.CharField()
+    slug = serializers.CharField()
+
+
+class UserSuggestionSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    full_name = serializers.CharField()
+
+
+class SuggestionsSerializer(serializers.Serializer):
+    posts = TitleSuggestionSerializer(many=True)
+    categories = TitleSuggestionSerializer(many=True)
+    users = UserSuggestionSerializer(many=True)
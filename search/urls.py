@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.urls import path
+from blog.cache import cache_response
+from . import views
+
+urlpatterns = [
+    # Hot prefixes are answered from the in-process response cache.
+    path(
+        "suggest/",
+        cache_response(timeout=settings.SEARCH_SUGGEST_TTL, key_prefix="suggest", public=True)(views.SuggestView.as_view()),
+        name="search-suggest",
+    ),
+]
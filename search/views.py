@@ -0,0 +1,63 @@
+from django.db import connection
+from django.db.models.functions import Collate, Upper
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+
+from accounts.models import User
+from posts.models import Category, Post
+from .serializers import SuggestionsSerializer
+
+
+def sort_key(column):
+    """UPPER(column) in byte order: COLLATE "C" on PostgreSQL, SQLite's default BINARY elsewhere."""
+    key = Upper(column)
+    return Collate(key, 'C') if connection.vendor == 'postgresql' else key
+
+
+def suggest(prefix, limit):
+    """
+    The first ``limit`` prefix matches per kind, in case-insensitive byte order.
+    istartswith compiles to UPPER(col) LIKE UPPER('prefix%'); on PostgreSQL the
+    UPPER(col) COLLATE "C" indexes serve both that range and the ORDER BY, so
+    each kind is an index scan that stops after ``limit`` rows.
+    """
+    matches = {
+        'posts': (Post.objects.filter(title__istartswith=prefix, status='published'), 'title', 'slug'),
+        'categories': (Category.objects.filter(title__istartswith=prefix), 'title', 'slug'),
+        'users': (User.objects.filter(username__istartswith=prefix, is_active=True), 'username', 'full_name'),
+    }
+    return {
+        kind: list(queryset.order_by(sort_key(column), 'pk').values(column, other)[:limit])
+        for kind, (queryset, column, other) in matches.items()
+    }
+
+
+@extend_schema(
+    summary="Autocomplete post titles, category titles and usernames by prefix (public)",
+    tags=["search"],
+    parameters=[
+        OpenApiParameter("q", str, required=True, description="At least 2 characters."),
+        OpenApiParameter("limit", int, description="Matches per kind, at most 10 (default 5)."),
+    ],
+    responses={200: SuggestionsSerializer},
+)
+class SuggestView(APIView):
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = "suggest"
+    min_length = 2
+    max_limit = 10
+
+    def get(self, request):
+        prefix = request.query_params.get("q", "").strip()
+        if len(prefix) < self.min_length:
+            raise ValidationError({"q": f"Enter at least {self.min_length} characters."})
+        try:
+            limit = min(max(int(request.query_params.get("limit", 5)), 1), self.max_limit)
+        except ValueError:
+            limit = 5
+        return Response(SuggestionsSerializer(suggest(prefix, limit)).data)